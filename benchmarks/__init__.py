@@ -0,0 +1,4 @@
+"""
+The :mod:`benchmarks` module to
+measure the performance of pipeline hot paths.
+"""
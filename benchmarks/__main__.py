@@ -0,0 +1,47 @@
+"""Command line interface of the benchmark suite.
+
+Usage:
+    python -m benchmarks run --output results.json
+    python -m benchmarks compare baseline.json results.json
+"""
+
+# Author: Christian Gerloff <christian.gerloff@rwth-aachen.de>
+# License: see repository LICENSE file
+
+
+import sys
+import argparse
+
+from . import bench_etl, bench_generators, bench_nireject  # noqa: F401
+from . import bench_lookup, bench_sketches  # noqa: F401
+from .suite import DEFAULT_SIZES, run, save, compare
+
+
+if __name__ == "__main__":
+    """Run or compare benchmarks."""
+    parser = argparse.ArgumentParser(prog='python -m benchmarks')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = commands.add_parser('run')
+    run_parser.add_argument('--sizes', type=int, nargs='+',
+                            default=DEFAULT_SIZES)
+    run_parser.add_argument('--filter', type=str, default=None)
+    run_parser.add_argument('--repeats', type=int, default=5)
+    run_parser.add_argument('--output', type=str,
+                            default='benchmark_results.json')
+
+    compare_parser = commands.add_parser('compare')
+    compare_parser.add_argument('baseline', type=str)
+    compare_parser.add_argument('current', type=str)
+    compare_parser.add_argument('--threshold', type=float, default=0.1)
+    args = parser.parse_args()
+
+    if args.command == 'run':
+        save(run(args.sizes, args.filter, args.repeats), args.output)
+    else:
+        comparison = compare(args.baseline, args.current, args.threshold)
+        print(comparison.to_string(index=False))
+        if comparison.regression.any():
+            print(f'{comparison.regression.sum()} regressions above '
+                  f'{args.threshold:.0%}')
+            sys.exit(1)
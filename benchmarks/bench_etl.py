@@ -0,0 +1,108 @@
+"""Benchmarks of the subsampling, annotation and artifacts of the ETL.
+
+Subsampling requires the detection module of the pipeline and is
+skipped without it, splits and annotation only depend on utils.
+"""
+
+# Author: Christian Gerloff <christian.gerloff@rwth-aachen.de>
+# License: see repository LICENSE file
+
+
+import tempfile
+import numpy as np
+
+from utils import dump_artifact, load_artifact, IndexedSplits
+from utils.python.artifacts import ARTIFACT_FORMATS
+from utils.python.annotations import annotate_batch
+
+from .suite import benchmark
+from .data import FEATURES, feature_frame
+
+# subsampling modes with and without augmentation
+SUBSAMPLING_CASES = {
+    f'mode{mode}{"_aug" if augmentation else ""}':
+        {'mode': mode, 'augmentation': augmentation}
+    for mode in (0, 1, 2) for augmentation in (None, ['AAFT'])
+}
+
+
+def _subsampling_benchmark(name: str, params: dict):
+    """Registers a subsampling benchmark."""
+    @benchmark(f'etl.subsampling.{name}')
+    def _bench(n_rows: int):
+        from detection.detection import subsampling
+        data = feature_frame(n_rows)
+        return lambda: subsampling(data, FEATURES, test_size=0.6,
+                                   seed=42, **params)
+
+
+for _name, _params in SUBSAMPLING_CASES.items():
+    _subsampling_benchmark(_name, _params)
+
+
+def _datasets(data, n_seeds: int = 5) -> list:
+    """Random halves shaped like the output of subsampling per seed."""
+    rng = np.random.default_rng(42)
+    datasets = []
+    for seed in range(n_seeds):
+        order = rng.permutation(len(data))
+        train, test = (data.iloc[i] for i in np.array_split(order, 2))
+        datasets.append((seed, (train[FEATURES], test[FEATURES],
+                                train.labels, test.labels,
+                                train.index, test.index) + (None,) * 6))
+    return datasets
+
+
+@benchmark('etl.annotate')
+def _bench_annotate(n_rows: int):
+    data = feature_frame(n_rows)
+    datasets = _datasets(data)
+    return lambda: annotate_batch(data, datasets, ['labels'])
+
+
+@benchmark('etl.splits.index')
+def _bench_splits_index(n_rows: int):
+    data = feature_frame(n_rows)
+    datasets = _datasets(data)
+
+    def _index():
+        splits = IndexedSplits(data)
+        for seed, samples in datasets:
+            splits.append(seed, samples)
+        return splits
+    return _index
+
+
+@benchmark('etl.splits.materialize')
+def _bench_splits_materialize(n_rows: int):
+    data = feature_frame(n_rows)
+    splits = IndexedSplits(data)
+    for seed, samples in _datasets(data):
+        splits.append(seed, samples)
+    return lambda: [splits.get(i, 'train') for i in range(len(splits))]
+
+
+def _artifact_benchmark(artifact_format: str):
+    """Registers dump and load benchmarks of an artifact format."""
+    @benchmark(f'etl.artifact.dump.{artifact_format}')
+    def _bench_dump(n_rows: int):
+        data = feature_frame(n_rows)
+        output_path = tempfile.TemporaryDirectory()
+
+        def _dump():
+            dump_artifact(data, output_path.name, 'data', artifact_format)
+        return _dump
+
+    @benchmark(f'etl.artifact.load.{artifact_format}')
+    def _bench_load(n_rows: int):
+        data = feature_frame(n_rows)
+        output_path = tempfile.TemporaryDirectory()
+        dump_artifact(data, output_path.name, 'data', artifact_format)
+
+        def _load():
+            return output_path, load_artifact(output_path.name, 'data')
+        return _load
+
+
+for _format in ARTIFACT_FORMATS:
+    _artifact_benchmark(_format)
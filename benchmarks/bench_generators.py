@@ -0,0 +1,132 @@
+"""Benchmark of the label shuffling generators."""
+
+# Author: Christian Gerloff <christian.gerloff@rwth-aachen.de>
+# License: see repository LICENSE file
+
+
+import timeit
+import argparse
+import numpy as np
+
+from detection.genertators import binary_label_shuffling
+from detection.genertators import preserving_badchannel_label_shuffling
+from detection.genertators import preserving_binary_label_shuffling
+from detection.genertators import set_perc_rated, set_contamination_rate
+from detection.genertators import _apply_swaps, _lookup_arrays
+
+from .suite import benchmark
+
+
+def _labels(n_rows: int) -> np.ndarray:
+    """Binary labels with 20% badchannels."""
+    rng = np.random.default_rng(20211001)
+    return (rng.random(n_rows) < 0.2).astype(int)
+
+
+@benchmark('generators.binary_label_shuffling')
+def _bench_binary_label_shuffling(n_rows: int):
+    labels = _labels(n_rows)
+    return lambda: binary_label_shuffling(
+        np.copy(labels), noise_ratio=0.1, seed=42)
+
+
+@benchmark('generators.preserving_badchannel_label_shuffling')
+def _bench_preserving_badchannel_label_shuffling(n_rows: int):
+    labels = _labels(n_rows)
+    return lambda: preserving_badchannel_label_shuffling(
+        np.copy(labels), noise_ratio=0.1, seed=42)
+
+
+@benchmark('generators.preserving_binary_label_shuffling')
+def _bench_preserving_binary_label_shuffling(n_rows: int):
+    labels = _labels(n_rows)
+    return lambda: preserving_binary_label_shuffling(
+        labels, noise_ratio=0.1, seed=42)
+
+
+@benchmark('generators.set_perc_rated')
+def _bench_set_perc_rated(n_rows: int):
+    labels = _labels(n_rows)
+    data = np.random.default_rng(0).random((n_rows, 5))
+    return lambda: set_perc_rated(
+        data, labels, np.arange(n_rows), gamma=0.5, seed=42)
+
+
+@benchmark('generators.set_contamination_rate')
+def _bench_set_contamination_rate(n_rows: int):
+    labels = _labels(n_rows)
+    data = np.random.default_rng(0).random((n_rows, 5))
+    return lambda: set_contamination_rate(
+        data, labels, np.arange(n_rows), contamination=0.4, seed=42)
+
+
+@benchmark('generators.set_contamination_rate.selection')
+def _bench_set_contamination_rate_selection(n_rows: int):
+    labels = _labels(n_rows)
+    data = np.random.default_rng(0).random((n_rows, 5))
+    return lambda: set_contamination_rate(
+        data, labels, np.arange(n_rows), contamination=0.4, seed=42,
+        return_selection=True)
+
+
+def _loop_swaps(labels: np.ndarray, shuffling_lookup: dict) -> np.ndarray:
+    """Sequential dictionary based swaps as used before vectorization."""
+    shuffled_labels = np.copy(labels)
+    for key, value in shuffling_lookup.items():
+        shuffled_labels[key] = labels[value]
+        shuffled_labels[value] = labels[key]
+    return shuffled_labels
+
+
+def bench_preserving_binary_label_shuffling(n_labels: int,
+                                            noise_ratio: float = 0.1,
+                                            repeats: int = 5) -> dict:
+    """Times swaps of dictionary loop and paired arrays.
+
+    Args:
+        n_labels (int): number of labels.
+        noise_ratio (float, optional): percentage of labels to be
+            shuffled. Defaults to 0.1.
+        repeats (int, optional): number of repetitions. Defaults to 5.
+
+    Returns:
+        dict: best time in seconds per variant.
+    """
+    labels = _labels(n_labels)
+    _, lookup = preserving_binary_label_shuffling(
+        labels, noise_ratio=noise_ratio, seed=42)
+    lookup_dict = dict(zip(*lookup))
+    src, dst = _lookup_arrays(lookup)
+
+    assert np.array_equal(_loop_swaps(labels, lookup_dict),
+                          _apply_swaps(labels, src, dst))
+
+    def _best(stmt):
+        return min(timeit.repeat(stmt, number=1, repeat=repeats))
+
+    return {
+        'n_labels': n_labels,
+        'loop_swaps': _best(lambda: _loop_swaps(labels, lookup_dict)),
+        'array_swaps': _best(lambda: _apply_swaps(labels, src, dst)),
+        'generate_and_swap': _best(
+            lambda: preserving_binary_label_shuffling(
+                labels, noise_ratio=noise_ratio, seed=42))
+    }
+
+
+if __name__ == "__main__":
+    """Run benchmark."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--n_labels', type=int, nargs='+',
+                        default=[10**5, 10**6])
+    parser.add_argument('--noise_ratio', type=float, default=0.1)
+    args = parser.parse_args()
+
+    for n_labels in args.n_labels:
+        result = bench_preserving_binary_label_shuffling(
+            n_labels, args.noise_ratio)
+        print(f"n={n_labels:>9d}  "
+              f"loop={result['loop_swaps']:.4f}s  "
+              f"array={result['array_swaps']:.4f}s  "
+              f"speedup={result['loop_swaps'] / result['array_swaps']:.1f}x  "
+              f"generate_and_swap={result['generate_and_swap']:.4f}s")
@@ -0,0 +1,72 @@
+"""Benchmark of compiled score tables against exact score transforms."""
+
+# Author: Christian Gerloff <christian.gerloff@rwth-aachen.de>
+# License: see repository LICENSE file
+
+
+import numpy as np
+
+from detection.lookup_tables import compile_model
+
+from .suite import benchmark
+from .data import FEATURES, feature_frame
+
+
+def _transforms(train) -> dict:
+    """Two-sided tail score of a Gaussian kernel density per feature."""
+    def _transform(reference):
+        reference = np.sort(reference)[::max(1, len(reference) // 256)]
+        bandwidth = 1.06 * reference.std() * len(reference) ** -0.2
+
+        def _score(x):
+            z = (np.asarray(x)[:, np.newaxis] - reference) / bandwidth
+            # tanh approximation of the normal cdf
+            cdf = (1 + np.tanh(0.7978845608 * (z + 0.044715 * z ** 3))).mean(axis=1) / 2
+            return np.abs(2 * cdf - 1)
+        return _score
+    return {f: _transform(train[f].to_numpy()) for f in FEATURES}
+
+
+def _setup(n_rows: int) -> tuple:
+    train = feature_frame(10000, seed=1)
+    transforms = _transforms(train)
+    bounds = {f: (train[f].min(), train[f].max()) for f in FEATURES}
+    X = feature_frame(n_rows)[FEATURES]
+    X = X.clip(lower=[bounds[f][0] for f in FEATURES],
+               upper=[bounds[f][1] for f in FEATURES], axis=1)
+    return transforms, bounds, X
+
+
+@benchmark('lookup.exact', max_rows=10**4)
+def _bench_exact(n_rows: int):
+    transforms, _, X = _setup(n_rows)
+    return lambda: np.mean([transforms[f](X[f].to_numpy()) for f in FEATURES],
+                           axis=0)
+
+
+@benchmark('lookup.table')
+def _bench_table(n_rows: int):
+    transforms, bounds, X = _setup(n_rows)
+    model, _ = compile_model(transforms, bounds, tol=1e-4)
+    return lambda: model.decision_function(X)
+
+
+if __name__ == "__main__":
+    """Report deviation and speedup of the compiled tables."""
+    import timeit
+
+    transforms, bounds, X = _setup(10**4)
+    model, report = compile_model(transforms, bounds, tol=1e-4)
+    exact = np.mean([transforms[f](X[f].to_numpy()) for f in FEATURES], axis=0)
+    table = model.decision_function(X)
+    exact_time = min(timeit.repeat(
+        lambda: [transforms[f](X[f].to_numpy()) for f in FEATURES],
+        number=1, repeat=3))
+    table_time = min(timeit.repeat(lambda: model.decision_function(X),
+                                   number=1, repeat=3))
+    for feature, r in report.items():
+        print(f"{feature:<20s} points={r['points']:>5d}  "
+              f"max_deviation={r['max_deviation']:.2e}")
+    print(f'n={len(X)}  exact={exact_time:.3f}s  table={table_time:.4f}s  '
+          f'speedup={exact_time / table_time:.0f}x  '
+          f'max_score_deviation={np.abs(exact - table).max():.2e}')
@@ -0,0 +1,34 @@
+"""Benchmarks of fitting and scoring the Nireject detector.
+
+Skipped unless the detection.nireject module of the pipeline is present.
+"""
+
+# Author: Christian Gerloff <christian.gerloff@rwth-aachen.de>
+# License: see repository LICENSE file
+
+
+from .suite import benchmark
+from .data import FEATURES, feature_frame
+
+
+def _split(n_rows: int) -> tuple:
+    """Original signals split into fit and scoring halves."""
+    data = feature_frame(n_rows)
+    data = data.loc[data.augmentation == 'None', FEATURES]
+    return data.iloc[::2], data.iloc[1::2]
+
+
+@benchmark('nireject.fit')
+def _bench_fit(n_rows: int):
+    from detection.nireject import Nireject
+    train, _ = _split(n_rows)
+    return lambda: Nireject(task='unsupervised', seed=20211001).fit(train)
+
+
+@benchmark('nireject.decision_function')
+def _bench_decision_function(n_rows: int):
+    from detection.nireject import Nireject
+    train, test = _split(n_rows)
+    detector = Nireject(task='unsupervised', seed=20211001)
+    detector.fit(train)
+    return lambda: detector.decision_function(test)
@@ -0,0 +1,91 @@
+"""Benchmark of sketch based against exact feature distributions."""
+
+# Author: Christian Gerloff <christian.gerloff@rwth-aachen.de>
+# License: see repository LICENSE file
+
+
+import time
+import argparse
+import numpy as np
+
+from detection.sketches import FeatureSketches
+
+from .suite import benchmark
+from .data import FEATURES, feature_frame
+
+
+@benchmark('sketches.partial_fit')
+def _bench_partial_fit(n_rows: int):
+    X = feature_frame(n_rows)[FEATURES].to_numpy()
+    return lambda: FeatureSketches(len(FEATURES), eps=0.01,
+                                   seed=42).partial_fit(X)
+
+
+def _auc(scores: np.ndarray, labels: np.ndarray) -> float:
+    """Area under the ROC curve by the rank statistic."""
+    ranks = np.empty(len(scores))
+    ranks[np.argsort(scores, kind='stable')] = np.arange(1, len(scores) + 1)
+    n_pos = labels.sum()
+    n_neg = len(labels) - n_pos
+    return (ranks[labels == 1].sum() - n_pos * (n_pos + 1) / 2) / (n_pos * n_neg)
+
+
+def _tail_scores(cdf: np.ndarray) -> np.ndarray:
+    """Mean two-sided tail probability of the features."""
+    return np.abs(2 * cdf - 1).mean(axis=1)
+
+
+def bench_sketch_fit(n_rows: int,
+                     eps: float = 0.01,
+                     batch_size: int = 100000) -> dict:
+    """Compares an exact and a streamed sketch fit of tail scores.
+
+    Args:
+        n_rows (int): number of rows.
+        eps (float, optional): rank error of the sketches.
+            Defaults to 0.01.
+        batch_size (int, optional): rows per streamed batch.
+            Defaults to 100000.
+
+    Returns:
+        dict: runtime, memory and AUC of both fits.
+    """
+    data = feature_frame(n_rows)
+    X = data[FEATURES].to_numpy()
+    labels = data.labels.to_numpy()
+
+    start = time.perf_counter()
+    exact = np.sort(X, axis=0)
+    exact_cdf = np.stack([np.searchsorted(exact[:, i], X[:, i], side='right')
+                          for i in range(X.shape[1])], axis=1) / len(X)
+    exact_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    sketches = FeatureSketches(len(FEATURES), eps=eps, seed=42)
+    for batch in np.array_split(X, max(1, len(X) // batch_size)):
+        sketches.partial_fit(batch)
+    sketch_time = time.perf_counter() - start
+
+    return {'n_rows': len(X),
+            'exact_time': exact_time,
+            'sketch_time': sketch_time,
+            'exact_items': exact.size,
+            'sketch_items': sum(s.size for s in sketches.sketches),
+            'exact_auc': _auc(_tail_scores(exact_cdf), labels),
+            'sketch_auc': _auc(_tail_scores(sketches.cdf(X)), labels)}
+
+
+if __name__ == "__main__":
+    """Run benchmark."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--n_rows', type=int, nargs='+',
+                        default=[10**5, 10**6, 10**7])
+    parser.add_argument('--eps', type=float, default=0.01)
+    args = parser.parse_args()
+
+    for n_rows in args.n_rows:
+        result = bench_sketch_fit(n_rows, args.eps)
+        print(f"n={result['n_rows']:>9d}  "
+              f"exact={result['exact_time']:.3f}s/{result['exact_items']} items  "
+              f"sketch={result['sketch_time']:.3f}s/{result['sketch_items']} items  "
+              f"auc={result['exact_auc']:.4f}/{result['sketch_auc']:.4f}")
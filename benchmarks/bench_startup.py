@@ -0,0 +1,72 @@
+"""Benchmark of the import time and memory of the pipeline entry points."""
+
+# Author: Christian Gerloff <christian.gerloff@rwth-aachen.de>
+# License: see repository LICENSE file
+
+
+import sys
+import json
+import argparse
+import subprocess
+
+from pathlib import Path
+
+ENTRY_POINTS = ['etl_stage', 'main', 'experiments', 'detection', 'utils', 'config']
+
+# backends whose import dominates the startup of a stage
+HEAVY_MODULES = ['tensorflow', 'keras', 'xgboost', 'pyod', 'sklearn', 'mlflow']
+
+_PROBE = """
+import sys, json, time, resource
+start = time.perf_counter()
+error = None
+try:
+    import {module}
+except Exception as e:
+    error = repr(e)
+print(json.dumps({{
+    'import_time': time.perf_counter() - start,
+    'max_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    'heavy_modules': [m for m in {heavy} if m in sys.modules],
+    'error': error
+}}))
+"""
+
+
+def bench_startup(module: str, repeats: int = 3) -> dict:
+    """Measures the cold import of a module in fresh interpreters.
+
+    Args:
+        module (str): name of the module to import.
+        repeats (int, optional): number of interpreters. Defaults to 3.
+
+    Returns:
+        dict: best import time, peak RSS and loaded heavy modules.
+    """
+    root = Path(__file__).resolve().parents[1]
+    results = []
+    for _ in range(repeats):
+        output = subprocess.run(
+            [sys.executable, '-c',
+             _PROBE.format(module=module, heavy=HEAVY_MODULES)],
+            cwd=root, capture_output=True, text=True, check=True)
+        results.append(json.loads(output.stdout.strip().splitlines()[-1]))
+    best = min(results, key=lambda r: r['import_time'])
+    best['module'] = module
+    return best
+
+
+if __name__ == "__main__":
+    """Run benchmark."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--modules', type=str, nargs='+', default=ENTRY_POINTS)
+    parser.add_argument('--repeats', type=int, default=3)
+    args = parser.parse_args()
+
+    for module in args.modules:
+        result = bench_startup(module, args.repeats)
+        print(f"{module:<12s} "
+              f"import={result['import_time']:.3f}s  "
+              f"rss={result['max_rss_mb']:.0f}MB  "
+              f"heavy={','.join(result['heavy_modules']) or '-'}"
+              + (f"  error={result['error']}" if result['error'] else ''))
@@ -0,0 +1,31 @@
+"""Synthetic inputs of the benchmark suite."""
+
+# Author: Christian Gerloff <christian.gerloff@rwth-aachen.de>
+# License: see repository LICENSE file
+
+
+import pandas as pd
+
+from utils import synthetic_features
+
+# features of the detector tests
+FEATURES = ['diff_cov',
+            'hr_freq_od_wave1',
+            'hr_power_od_wave1',
+            'flatline',
+            'sci']
+
+
+def feature_frame(n_rows: int, seed: int = 20211001) -> pd.DataFrame:
+    """Feature table with paired original and AAFT augmented signals.
+
+    Args:
+        n_rows (int): number of rows, half of them augmented.
+        seed (int, optional): random seed. Defaults to 20211001.
+
+    Returns:
+        pd.DataFrame: feature table in the layout of the data loader.
+    """
+    n_signals = max(n_rows // 2, 1)
+    return synthetic_features(n_signals, n_probes=min(100, n_signals),
+                              contamination=0.2, seed=seed)
@@ -0,0 +1,93 @@
+"""Validation report of the compact dtype policy against float64.
+
+Usage:
+    python -m benchmarks.dtype_report --n_signals 1000000
+"""
+
+# Author: Christian Gerloff <christian.gerloff@rwth-aachen.de>
+# License: see repository LICENSE file
+
+
+import json
+import argparse
+import tempfile
+import timeit
+import numpy as np
+
+from detection.sketches import FeatureSketches
+from utils import apply_dtype_policy, synthetic_features
+from utils import dump_artifact, load_artifact
+from utils.python.dtype_policy import memory_usage
+
+from .data import FEATURES
+from .bench_sketches import _auc, _tail_scores
+
+
+def _zscores(X: np.ndarray) -> np.ndarray:
+    """Euclidean norm of the standardized features in the input dtype."""
+    center = X.mean(axis=0)
+    scale = X.std(axis=0)
+    return np.sqrt((((X - center) / scale) ** 2).sum(axis=1))
+
+
+def _best(func, repeats: int = 3) -> float:
+    return min(timeit.repeat(func, number=1, repeat=repeats))
+
+
+def dtype_report(n_signals: int, seed: int = 20211001) -> dict:
+    """Compares memory, throughput and scores of both dtype policies.
+
+    Args:
+        n_signals (int): number of synthetic signals (rows are doubled
+            by the AAFT augmentation).
+        seed (int, optional): random seed. Defaults to 20211001.
+
+    Returns:
+        dict: report per policy and score differences.
+    """
+    data = synthetic_features(n_signals, seed=seed)
+    labels = data.labels.to_numpy()
+    report = {'n_rows': len(data)}
+    scores = {}
+    for policy in ('float64', 'compact'):
+        frame = apply_dtype_policy(data, policy)
+        X = frame[FEATURES].to_numpy()
+        with tempfile.TemporaryDirectory() as output_path:
+            dump_time = _best(lambda: dump_artifact(
+                frame, output_path, 'data', 'columnar'), 1)
+            load_time = _best(lambda: load_artifact(
+                output_path, 'data', mmap=False))
+        sketches = FeatureSketches(len(FEATURES), eps=0.001, seed=seed)
+        sketches.partial_fit(X)
+        scores[policy] = {'zscore': _zscores(X).astype(np.float64),
+                          'tail': _tail_scores(sketches.cdf(X))}
+        report[policy] = {
+            'memory_mb': memory_usage(frame) / 2**20,
+            'zscore_rows_per_s': len(X) / _best(lambda: _zscores(X)),
+            'sketch_rows_per_s': len(X) / _best(
+                lambda: FeatureSketches(len(FEATURES), seed=seed).partial_fit(X)),
+            'columnar_dump_s': dump_time,
+            'columnar_load_s': load_time
+        }
+
+    for score in ('zscore', 'tail'):
+        exact, compact = scores['float64'][score], scores['compact'][score]
+        threshold = np.quantile(exact, 0.9)
+        report[score] = {
+            'max_abs_diff': float(np.abs(exact - compact).max()),
+            'max_rel_diff': float(np.max(np.abs(exact - compact) /
+                                         np.maximum(np.abs(exact), 1e-12))),
+            'auc_float64': _auc(exact, labels),
+            'auc_compact': _auc(compact, labels),
+            'flipped_at_q90': int(np.sum((exact > threshold) !=
+                                         (compact > threshold)))
+        }
+    return report
+
+
+if __name__ == "__main__":
+    """Print dtype report."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--n_signals', type=int, default=10**6)
+    args = parser.parse_args()
+    print(json.dumps(dtype_report(args.n_signals), indent=2))
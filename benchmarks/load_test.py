@@ -0,0 +1,128 @@
+"""Load test of the experimental local scoring service.
+
+Usage:
+    python -m benchmarks.load_test --clients 8 --requests 2000
+"""
+
+# Author: Christian Gerloff <christian.gerloff@rwth-aachen.de>
+# License: see repository LICENSE file
+
+
+import json
+import time
+import argparse
+import threading
+import http.client
+import numpy as np
+
+from detection.compact_model import CompactModel
+from detection.scoring_service import serve
+from utils import synthetic_features
+
+from .data import FEATURES
+
+
+def quantile_model(n_signals: int = 10000, n_grid: int = 256) -> CompactModel:
+    """Model scoring features by their empirical tail probability.
+
+    Args:
+        n_signals (int, optional): number of synthetic training signals.
+            Defaults to 10000.
+        n_grid (int, optional): grid points per feature. Defaults to 256.
+
+    Returns:
+        CompactModel: model of the synthetic features.
+    """
+    data = synthetic_features(n_signals, augmentations=())[FEATURES]
+    levels = np.linspace(0, 1, n_grid)
+    grids = [np.unique(np.quantile(data[f], levels)) for f in FEATURES]
+    values = [np.abs(np.linspace(-1, 1, len(g))) for g in grids]
+    return CompactModel(FEATURES, grids, values, np.ones(len(FEATURES)),
+                        threshold=0.9)
+
+
+def load_test(host: str,
+              port: int,
+              n_clients: int = 8,
+              n_requests: int = 2000,
+              rows_per_request: int = 1) -> dict:
+    """Sends scoring requests from concurrent clients.
+
+    Args:
+        host (str): host of the service.
+        port (int): port of the service.
+        n_clients (int, optional): concurrent clients. Defaults to 8.
+        n_requests (int, optional): requests per client. Defaults to 2000.
+        rows_per_request (int, optional): feature vectors per request.
+            Defaults to 1.
+
+    Returns:
+        dict: throughput and latency percentiles in milliseconds.
+    """
+    rng = np.random.default_rng(42)
+    payloads = [json.dumps({'features': rng.random(
+        (rows_per_request, len(FEATURES))).tolist()}) for _ in range(64)]
+    latencies = [[] for _ in range(n_clients)]
+
+    def _client(i):
+        connection = http.client.HTTPConnection(host, port)
+        headers = {'Content-Type': 'application/json'}
+        for j in range(n_requests):
+            start = time.perf_counter()
+            connection.request('POST', '/score', payloads[j % 64], headers)
+            response = connection.getresponse()
+            response.read()
+            latencies[i].append(time.perf_counter() - start)
+            if response.status != 200:
+                raise RuntimeError(f'Scoring failed: {response.status}')
+        connection.close()
+
+    clients = [threading.Thread(target=_client, args=(i,))
+               for i in range(n_clients)]
+    start = time.perf_counter()
+    for client in clients:
+        client.start()
+    for client in clients:
+        client.join()
+    duration = time.perf_counter() - start
+
+    latencies = np.concatenate(latencies) * 1000
+    return {'requests': len(latencies),
+            'rows_per_s': len(latencies) * rows_per_request / duration,
+            'requests_per_s': len(latencies) / duration,
+            'p50_ms': float(np.percentile(latencies, 50)),
+            'p99_ms': float(np.percentile(latencies, 99))}
+
+
+if __name__ == "__main__":
+    """Run load test."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--model', type=str, default=None)
+    parser.add_argument('--host', type=str, default=None,
+                        help='existing service, started locally if not set')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--clients', type=int, default=8)
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--rows', type=int, default=1)
+    parser.add_argument('--max_batch', type=int, default=256)
+    parser.add_argument('--max_wait_ms', type=float, default=0)
+    args = parser.parse_args()
+
+    server = None
+    host, port = args.host, args.port
+    if host is None:
+        model = (CompactModel.load(args.model) if args.model
+                 else quantile_model())
+        server = serve(model, port=0, max_batch=args.max_batch,
+                       max_wait_ms=args.max_wait_ms)
+        host, port = server.server_address
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    result = load_test(host, port, args.clients, args.requests, args.rows)
+    print(f"requests={result['requests']}  "
+          f"throughput={result['rows_per_s']:.0f} rows/s  "
+          f"p50={result['p50_ms']:.2f}ms  p99={result['p99_ms']:.2f}ms")
+
+    if server is not None:
+        server.shutdown()
+        server.batcher.close()
@@ -0,0 +1,137 @@
+"""Registry, runner and comparison of the benchmark suite."""
+
+# Author: Christian Gerloff <christian.gerloff@rwth-aachen.de>
+# License: see repository LICENSE file
+
+
+import re
+import json
+import time
+import timeit
+import logging
+import platform
+import numpy as np
+import pandas as pd
+
+from pathlib import Path
+from typing import Callable
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+DEFAULT_SIZES = [10**3, 10**4, 10**5, 10**6]
+
+# registered benchmarks by name
+BENCHMARKS = {}
+
+
+def benchmark(name: str, max_rows: int = None):
+    """Registers a benchmark.
+
+    The decorated function receives the number of rows, prepares its
+    inputs and returns the callable to time.
+
+    Args:
+        name (str): name of the benchmark.
+        max_rows (int, optional): largest number of rows to run.
+            Defaults to None.
+    """
+    def _register(setup: Callable):
+        BENCHMARKS[name] = {'setup': setup, 'max_rows': max_rows}
+        return setup
+    return _register
+
+
+def run(sizes: list = None,
+        pattern: str = None,
+        repeats: int = 5) -> dict:
+    """Runs the registered benchmarks.
+
+    Benchmarks whose dependencies are not importable are skipped,
+    failing benchmarks are recorded with their error.
+
+    Args:
+        sizes (list, optional): numbers of rows. Defaults to 10^3..10^6.
+        pattern (str, optional): regular expression selecting benchmarks.
+            Defaults to None (all).
+        repeats (int, optional): repetitions per benchmark.
+            Defaults to 5.
+
+    Returns:
+        dict: meta data and results of all benchmarks.
+    """
+    sizes = sizes if sizes is not None else DEFAULT_SIZES
+    results = []
+    for name, spec in sorted(BENCHMARKS.items()):
+        if pattern is not None and not re.search(pattern, name):
+            continue
+        for n_rows in sizes:
+            if spec['max_rows'] is not None and n_rows > spec['max_rows']:
+                continue
+            result = {'name': name, 'n_rows': n_rows}
+            try:
+                func = spec['setup'](n_rows)
+                times = timeit.repeat(func, number=1, repeat=repeats)
+                result.update({'status': 'ok',
+                               'best': min(times),
+                               'median': float(np.median(times)),
+                               'repeats': repeats})
+            except ImportError as e:
+                result.update({'status': 'skipped', 'reason': repr(e)})
+            except Exception as e:
+                logger.error(f'Benchmark {name} failed for {n_rows} rows: {e}')
+                result.update({'status': 'failed', 'reason': repr(e)})
+            logger.info(f'{name} n={n_rows}: '
+                        f"{result.get('best', result['status'])}")
+            results.append(result)
+
+    return {
+        'meta': {
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'pandas': pd.__version__,
+            'machine': platform.machine(),
+            'processor': platform.processor()
+        },
+        'results': results
+    }
+
+
+def save(results: dict, filename: str):
+    """Stores benchmark results as JSON.
+
+    Args:
+        results (dict): results of run.
+        filename (str): output file.
+    """
+    Path(filename).write_text(json.dumps(results, indent=2), encoding='UTF-8')
+
+
+def compare(baseline_file: str,
+            current_file: str,
+            threshold: float = 0.1) -> pd.DataFrame:
+    """Compares benchmark results against a baseline.
+
+    Args:
+        baseline_file (str): JSON results of the baseline.
+        current_file (str): JSON results to compare.
+        threshold (float, optional): relative slowdown of the best time
+            flagged as regression. Defaults to 0.1.
+
+    Returns:
+        pd.DataFrame: comparison per benchmark and number of rows.
+    """
+    def _frame(filename):
+        results = json.loads(Path(filename).read_text(encoding='UTF-8'))
+        frame = pd.DataFrame(results['results'])
+        if 'best' not in frame:
+            frame['best'] = np.nan
+        return frame.loc[frame.status == 'ok', ['name', 'n_rows', 'best']]
+
+    comparison = _frame(baseline_file).merge(
+        _frame(current_file), on=['name', 'n_rows'],
+        suffixes=('_baseline', '_current'))
+    comparison['ratio'] = comparison.best_current / comparison.best_baseline
+    comparison['regression'] = comparison.ratio > 1 + threshold
+    return comparison.sort_values(['name', 'n_rows']).reset_index(drop=True)
@@ -0,0 +1,116 @@
+"""Memory of detection workers with pickled and shared feature tables.
+
+Each worker scores the rows of a split, either from a pickled copy of the
+table or from a SharedDataset. The private memory of all workers (Linux
+smaps_rollup) is reported per number of workers.
+
+Usage:
+    python -m benchmarks.worker_memory --n_signals 1000000 --workers 1 2 4 8
+"""
+
+# Author: Christian Gerloff <christian.gerloff@rwth-aachen.de>
+# License: see repository LICENSE file
+
+
+import os
+import json
+import time
+import argparse
+import numpy as np
+import pandas as pd
+
+from concurrent.futures import ProcessPoolExecutor
+
+from utils import SharedDataset, synthetic_features
+
+from .data import FEATURES
+
+
+def _memory_mb() -> dict:
+    """Resident and private memory of this process in MB."""
+    memory = {}
+    with open('/proc/self/smaps_rollup') as rollup:
+        for line in rollup:
+            key, _, value = line.partition(':')
+            if key in ('Rss', 'Private_Clean', 'Private_Dirty'):
+                memory[key] = int(value.split()[0]) / 1024
+    return {'rss': memory['Rss'],
+            'private': memory['Private_Clean'] + memory['Private_Dirty']}
+
+
+def _score(frame: pd.DataFrame) -> tuple:
+    """Scores a split and returns the memory of the worker."""
+    X = frame[FEATURES].to_numpy()
+    np.abs((X - X.mean(axis=0)) / X.std(axis=0)).max(axis=1).sum()
+    return os.getpid(), _memory_mb()
+
+
+def _score_pickled(data: pd.DataFrame, positions: np.ndarray) -> tuple:
+    return _score(data.iloc[positions])
+
+
+def _score_shared(dataset: SharedDataset, positions: np.ndarray) -> tuple:
+    return _score(dataset.take(positions, FEATURES))
+
+
+def _total(results: list) -> dict:
+    """Sums the peak memory of each worker."""
+    peaks = {}
+    for pid, memory in results:
+        peak = peaks.setdefault(pid, {'rss': 0, 'private': 0})
+        for key, value in memory.items():
+            peak[key] = max(peak[key], value)
+    return {f'{key}_mb': sum(p[key] for p in peaks.values())
+            for key in ('rss', 'private')}
+
+
+def worker_memory(n_signals: int,
+                  workers: list,
+                  split_fraction: float = 0.1,
+                  seed: int = 20211001) -> dict:
+    """Memory and runtime of pickled and shared tables per worker count.
+
+    Args:
+        n_signals (int): number of synthetic signals (rows are doubled
+            by the AAFT augmentation).
+        workers (list): numbers of worker processes.
+        split_fraction (float, optional): fraction of rows per split.
+            Defaults to 0.1.
+        seed (int, optional): random seed. Defaults to 20211001.
+
+    Returns:
+        dict: report per number of workers.
+    """
+    data = synthetic_features(n_signals, seed=seed)
+    rng = np.random.default_rng(seed)
+    size = int(len(data) * split_fraction)
+    report = {'n_rows': len(data),
+              'table_mb': data.memory_usage(deep=True).sum() / 2**20}
+    with SharedDataset.create(data) as shared:
+        for n_jobs in workers:
+            splits = [rng.choice(len(data), size, replace=False)
+                      for _ in range(2 * n_jobs)]
+            start = time.perf_counter()
+            with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+                pickled = list(executor.map(_score_pickled,
+                                            [data] * len(splits), splits))
+            pickled_time = time.perf_counter() - start
+            start = time.perf_counter()
+            with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+                results = list(executor.map(_score_shared,
+                                            [shared] * len(splits), splits))
+            shared_time = time.perf_counter() - start
+            report[n_jobs] = {
+                'pickled': {**_total(pickled), 'seconds': pickled_time},
+                'shared': {**_total(results), 'seconds': shared_time}
+            }
+    return report
+
+
+if __name__ == "__main__":
+    """Print worker memory report."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--n_signals', type=int, default=10**6)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8])
+    args = parser.parse_args()
+    print(json.dumps(worker_memory(args.n_signals, args.workers), indent=2))
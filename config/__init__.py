@@ -9,7 +9,8 @@ from .basis_profiles import ProcessingHybridProfile
 from .basis_profiles import DetectionProfile, BaselineNamesProfile
 from .basis_profiles import DetectorNamesProfile, DetectorProfile
 from .basis_profiles import NirejectNamesProfile, NirejectProfile
-from .load_profile import load_profile
+from .execution_profiles import ExecutionProfile
+from .load_profile import load_profile, get_profile
 
 __all__ = [
     'ETLProfile',
@@ -24,5 +25,7 @@ __all__ = [
     'NirejectNamesProfile',
     'DetectorProfile',
     'NirejectProfile',
-    'load_profile'
+    'ExecutionProfile',
+    'load_profile',
+    'get_profile'
 ]
@@ -0,0 +1,49 @@
+"""Profiles of execution options that do not alter stage results."""
+
+# Author: Christian Gerloff <christian.gerloff@rwth-aachen.de>
+# License: see repository LICENSE file
+
+from typing import Optional, List, Dict, Any
+from pydantic.dataclasses import dataclass
+
+
+@dataclass
+class ExecutionProfile:
+    """Execution options of the ETL stage.
+
+    Args:
+        ingest_cache_path (str, optional): Directory of the ingest cache
+            shared by ETL runs reading the same file. Defaults to None.
+        artifact_format (str, optional): Layout of the ETL artifacts,
+            'joblib' or 'columnar' (Arrow IPC, .npy and a manifest).
+            Defaults to 'joblib'.
+        split_format (str, optional): Storage of the sampled splits,
+            'full' frames per seed or 'index' positions into the data
+            (IndexedSplits). Defaults to 'full'.
+        n_jobs (int, optional): Number of processes sampling the seeds
+            on memory-mapped data. Defaults to 1.
+        pushdown (bool, optional): Reads only the required columns and
+            rows with pyarrow before the data loader. Without augmentation
+            in sampling, only original signals are read. Defaults to False.
+        read_columns (list, optional): Columns to read with pushdown.
+            Defaults to None (all).
+        read_filters (dict, optional): Row filters with pushdown, any of
+            augmentation, probes and signal_ids ([start, stop)).
+            Defaults to None.
+        partition_by_probe (bool, optional): Additionally writes the data
+            hive-partitioned by probe with a partition index, to load or
+            score one probe at a time. Defaults to False.
+        dtype_policy (str, optional): Dtypes applied at ingest, 'float64'
+            keeps the loaded dtypes, 'compact' stores float32 features,
+            categorical augmentation and probe and int32 signal_id.
+            Defaults to 'float64'.
+    """
+    ingest_cache_path: Optional[str] = None
+    artifact_format: str = 'joblib'
+    split_format: str = 'full'
+    n_jobs: int = 1
+    pushdown: bool = False
+    read_columns: Optional[List[str]] = None
+    read_filters: Optional[Dict[str, Any]] = None
+    partition_by_probe: bool = False
+    dtype_policy: str = 'float64'
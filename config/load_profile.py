@@ -3,15 +3,55 @@
 # Author: Christian Gerloff <christian.gerloff@rwth-aachen.de>
 # License: see repository LICENSE file
 
+import copy
 import yaml
 import logging
+import threading
 from pathlib import Path
+from dataclasses import fields
+from functools import lru_cache
 from pydantic.dataclasses import dataclass
 from .basis_profiles import *
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# parsed config files and resolved profiles
+_configs = {}
+_profiles = {}
+_lock = threading.Lock()
+
+
+@lru_cache(maxsize=None)
+def _schema(profile_class: type) -> dict:
+    """Cached schema of a profile class.
+
+    Args:
+        profile_class (type): The profile class.
+
+    Returns:
+        dict: The pydantic schema of the profile class.
+    """
+    return profile_class.__pydantic_model__.schema()
+
+
+def _read_configs(config_file: str) -> tuple:
+    """Parses a config file once per path and modification time.
+
+    Args:
+        config_file (str): The name of the configuration file.
+
+    Returns:
+        tuple: The cache key and all configurations of the file.
+    """
+    path = Path(config_file).resolve()
+    key = (str(path), path.stat().st_mtime_ns)
+    with _lock:
+        if _configs.get(key[0], (None, None))[0] != key:
+            all_configs = yaml.safe_load(path.read_text(encoding='UTF-8'))
+            _configs[key[0]] = (key, all_configs)
+        return _configs[key[0]]
+
 
 def _recursive_update(profile, profile_updates: dict):
     """Recursively updates the profile with the profile_updates.
@@ -25,7 +65,7 @@ def _recursive_update(profile, profile_updates: dict):
     """
 
     # check if any key definitions is in schema (nested profile)
-    schema = profile.__pydantic_model__.schema()
+    schema = _schema(type(profile))
 
     for key, value in profile_updates.items():
         # test if profile_updates contains subclass in definitions
@@ -73,8 +113,7 @@ def load_profile(profile: dataclass,
 
     try:
         profile_name = profile.__class__.__name__
-        config_file = Path(config_file).read_text(encoding='UTF-8')
-        all_configs = yaml.safe_load(config_file)
+        _, all_configs = _read_configs(config_file)
 
         if config_name not in all_configs:
             logger.warning(f'Unable to load config {config_name} from {config_file}.\n'
@@ -85,10 +124,62 @@ def load_profile(profile: dataclass,
         if profile_name not in config:
             return profile
 
-        profile_updates = config.get(profile_name)
-        _recursive_update(profile, profile_updates)
+        # updates must not alias the cached configuration
+        profile_updates = copy.deepcopy(config.get(profile_name))
+        profile = _recursive_update(profile, profile_updates)
 
     except Exception as e:
         logger.error(f'Unable to load profile {config_name}/{profile} '
                      f'from configuration file {config_file}: {e}')
     return profile
+
+
+def get_profile(profile_class: type,
+                config_name: str,
+                config_file: str = 'config.yaml') -> dataclass:
+    """Provides a validated profile from a YAML config file.
+
+    Profiles are resolved and validated once per class, configuration and
+    version of the configuration file. Each call returns a copy. Invalid
+    profiles are not cached.
+
+    Args:
+        profile_class (type): The profile class to load.
+        config_name (str): The name of the configuration.
+        config_file (str, optional): The name of the configuration file.
+            Defaults to 'config.yaml'.
+
+    Raises:
+        RuntimeError: If the configuration file cannot be read.
+        ValueError: If the profile fails validation.
+
+    Returns:
+        dataclass: The parametrized profile.
+    """
+    try:
+        file_key, _ = _read_configs(config_file)
+    except Exception as e:
+        logger.error(f'Unable to read configuration {config_name} '
+                     f'from configuration file {config_file}: {e}')
+        raise RuntimeError(f'Unable to read configuration {config_name} '
+                           f'from {config_file}') from e
+
+    key = (profile_class, config_name, file_key)
+    with _lock:
+        profile = _profiles.get(key, None)
+    if profile is None:
+        profile = load_profile(profile_class(), config_name, config_file)
+        try:
+            # validate updates of the raw configuration
+            profile = type(profile)(**{
+                field.name: getattr(profile, field.name)
+                for field in fields(profile) if field.init
+            })
+        except Exception as e:
+            logger.error(f'Invalid profile {config_name}/{profile_class.__name__} '
+                         f'in configuration file {config_file}: {e}')
+            raise ValueError(f'Invalid profile {config_name}/'
+                             f'{profile_class.__name__} in {config_file}') from e
+        with _lock:
+            _profiles[key] = profile
+    return copy.deepcopy(profile)
@@ -3,12 +3,29 @@ The :mod:`detector` module to
 access the detectors
 """
 
-from .detection import data_loader, subsampling
-from .detection import process_hybrid
-from .detection import performance_evaluation
-from .detection import nireject, nireject_sv
-from .detection import xgbod_sv, feawad_sv
-from .nireject import Nireject
+import importlib
+
+# public names resolved on first access to keep heavy backends
+# (xgboost, keras/tensorflow) out of stages that do not use them
+_LAZY_ATTRS = {
+    'data_loader': '.detection',
+    'subsampling': '.detection',
+    'process_hybrid': '.detection',
+    'performance_evaluation': '.detection',
+    'nireject': '.detection',
+    'nireject_sv': '.detection',
+    'xgbod_sv': '.detection',
+    'feawad_sv': '.detection',
+    'Nireject': '.nireject',
+    'iter_scores': '.batch_scoring',
+    'score_parquet': '.batch_scoring',
+    'map_features': '.feature_parallel',
+    'FeatureMoments': '.streaming_stats',
+    'ClassMoments': '.streaming_stats',
+    'QuantileSketch': '.sketches',
+    'FeatureSketches': '.sketches',
+    'fit_sketches': '.sketches'
+}
 
 __all__ = [
     'data_loader',
@@ -19,5 +36,26 @@ __all__ = [
     'Nireject',
     'xgbod_sv',
     'feawad_sv',
-    'performance_evaluation'
+    'performance_evaluation',
+    'iter_scores',
+    'score_parquet',
+    'map_features',
+    'FeatureMoments',
+    'ClassMoments',
+    'QuantileSketch',
+    'FeatureSketches',
+    'fit_sketches'
 ]
+
+
+def __getattr__(name: str):
+    if name in _LAZY_ATTRS:
+        module = importlib.import_module(_LAZY_ATTRS[name], __name__)
+        value = getattr(module, name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
@@ -0,0 +1,162 @@
+"""Scores feature tables in batches with bounded memory."""
+
+# Author: Christian Gerloff <christian.gerloff@rwth-aachen.de>
+# License: see repository LICENSE file
+
+
+import logging
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from pathlib import Path
+from typing import Callable, Iterable, Iterator
+
+from utils.python.feature_reader import iter_features, read_features
+from utils.python.feature_reader import feature_schema
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+SCORING_METHODS = ('decision_function', 'predict', 'predict_proba')
+
+# columns identifying scored rows in the output
+KEY_COLUMNS = ['signal_id', 'probe', 'augmentation']
+
+
+def iter_frames(data: pd.DataFrame, batch_size: int) -> Iterator[pd.DataFrame]:
+    """Splits a frame into consecutive batches of rows.
+
+    Args:
+        data (pd.DataFrame): frame to split.
+        batch_size (int): rows per batch.
+
+    Yields:
+        pd.DataFrame: batch of rows.
+    """
+    for start in range(0, len(data), batch_size):
+        yield data.iloc[start:start + batch_size]
+
+
+def iter_scores(detector,
+                batches: Iterable[pd.DataFrame],
+                features: list = None,
+                method: str = 'decision_function',
+                batch_kwargs: Callable = None,
+                **kwargs) -> Iterator[tuple]:
+    """Scores batches of a feature table one at a time.
+
+    The fitted detector scores each batch with the given method. Constant
+    arguments, such as the augmented reference set of Nireject, are
+    loaded once and passed unchanged to every call. Arguments that refer
+    to the rows of a batch are returned by batch_kwargs. Scores match a
+    single call on the whole table for detectors scoring rows
+    independently of each other given the constant arguments.
+
+    Args:
+        detector: fitted detector, e.g. Nireject.
+        batches (Iterable[pd.DataFrame]): batches of the feature table.
+        features (list, optional): feature columns to score.
+            Defaults to None (all).
+        method (str, optional): scoring method of the detector.
+            Defaults to 'decision_function'.
+        batch_kwargs (Callable, optional): function of a batch returning
+            further arguments of the scoring method. Defaults to None.
+        **kwargs: constant arguments of the scoring method,
+            e.g. augmented.
+
+    Yields:
+        tuple: batch and its scores.
+    """
+    if method not in SCORING_METHODS:
+        raise ValueError(f'{method} is not a supported scoring method.')
+    score = getattr(detector, method)
+    for batch in batches:
+        if len(batch) == 0:
+            continue
+        X = batch if features is None else batch[features]
+        arguments = kwargs
+        if batch_kwargs is not None:
+            arguments = {**kwargs, **batch_kwargs(batch)}
+        yield batch, np.asarray(score(X, **arguments))
+
+
+def _score_table(batch: pd.DataFrame, scores: np.ndarray) -> pa.Table:
+    """Keys and scores of a batch as arrow table."""
+    table = {c: batch[c].to_numpy() for c in KEY_COLUMNS if c in batch}
+    if scores.ndim == 1:
+        table['score'] = scores
+    else:
+        for i in range(scores.shape[1]):
+            table[f'score_{i}'] = scores[:, i]
+    return pa.table(table)
+
+
+def score_parquet(detector,
+                  source: str,
+                  filename: str,
+                  features: list,
+                  method: str = 'decision_function',
+                  batch_size: int = 1 << 17,
+                  filters: dict = None,
+                  augmentation: str = None,
+                  **kwargs) -> Path:
+    """Scores a parquet feature table into a parquet file of scores.
+
+    Only the key and feature columns are read and batches are written as
+    row groups, so memory is bounded by the batch size. With
+    augmentation, the original rows are scored and the augmented rows
+    matching the same filters are read once and passed to every batch as
+    the reference set `augmented`. The file is written with its schema
+    even without rows.
+
+    Args:
+        detector: fitted detector, e.g. Nireject.
+        source (str): parquet file or partitioned directory of features.
+        filename (str): parquet file of the scores.
+        features (list): feature columns to score.
+        method (str, optional): scoring method of the detector.
+            Defaults to 'decision_function'.
+        batch_size (int, optional): rows per batch. Defaults to 1 << 17.
+        filters (dict, optional): row filters of the feature reader,
+            e.g. {'probes': [0, 1]}. Defaults to None.
+        augmentation (str, optional): augmentation of the reference
+            set, e.g. 'AAFT'. Defaults to None.
+        **kwargs: constant arguments of the scoring method.
+
+    Returns:
+        Path: the written file.
+    """
+    filename = Path(filename)
+    filename.parent.mkdir(parents=True, exist_ok=True)
+    schema = feature_schema(source)
+    keys = [c for c in KEY_COLUMNS if c in schema.names]
+    filters = dict(filters or {})
+    if augmentation is not None:
+        kwargs['augmented'] = read_features(
+            source, list(features),
+            **{**filters, 'augmentation': [augmentation]})
+        filters['augmentation'] = ['None']
+    batches = iter_features(source, keys + list(features),
+                            batch_size=batch_size, **filters)
+
+    writer = None
+    n_rows = 0
+    try:
+        for batch, scores in iter_scores(detector, batches, features,
+                                         method, **kwargs):
+            table = _score_table(batch, scores)
+            if writer is None:
+                writer = pq.ParquetWriter(filename, table.schema)
+            writer.write_table(table)
+            n_rows += len(batch)
+        if writer is None:
+            empty = pa.schema([schema.field(c) for c in keys] +
+                              [pa.field('score', pa.float64())])
+            pq.write_table(empty.empty_table(), filename)
+    finally:
+        if writer is not None:
+            writer.close()
+    logger.info(f'Scored {n_rows} rows of {source} into {filename}')
+    return filename
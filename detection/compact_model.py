@@ -0,0 +1,148 @@
+"""Experimental compact, versioned model format scored with NumPy only.
+
+The format is a standalone approximation: scores are the weighted mean
+of per-feature tables. It does not reproduce the decision_function of a
+fitted Nireject, and there is no exporter from the fitted detectors of
+the pipeline. Models are built from per-feature score transforms with
+detection.lookup_tables.compile_model, whose report states the
+deviation from those transforms only. It is not part of the public
+detection API until a Nireject exporter with a parity test exists.
+"""
+
+# Author: Christian Gerloff <christian.gerloff@rwth-aachen.de>
+# License: see repository LICENSE file
+
+
+import json
+import numpy as np
+
+from pathlib import Path
+from dataclasses import dataclass, field
+
+FORMAT_VERSION = 1
+
+
+@dataclass
+class CompactModel:
+    """Fitted detector as per-feature score tables.
+
+    The score of a feature is the piecewise linear interpolation of its
+    table, the anomaly score the weighted mean over all features. This
+    combination rule is defined by the format and is not validated
+    against the scores of the pipeline detectors.
+
+    Args:
+        features (list): names of the features in scoring order.
+        grids (list): increasing feature values of each table.
+        values (list): scores at the grid points of each table.
+        weights (np.ndarray): weight of each feature.
+        threshold (float, optional): decision threshold of predict.
+            Defaults to None.
+        metadata (dict, optional): JSON serializable information, e.g.
+            task, seed and tail priors of the detector. Defaults to {}.
+    """
+    features: list
+    grids: list
+    values: list
+    weights: np.ndarray
+    threshold: float = None
+    metadata: dict = field(default_factory=dict)
+
+    def __post_init__(self):
+        self.grids = [np.asarray(g, dtype=np.float64) for g in self.grids]
+        self.values = [np.asarray(v, dtype=np.float64) for v in self.values]
+        self.weights = np.asarray(self.weights, dtype=np.float64)
+        n_features = len(self.features)
+        if not (len(self.grids) == len(self.values) ==
+                len(self.weights) == n_features):
+            raise ValueError('A table and weight is required per feature')
+        for grid, values in zip(self.grids, self.values):
+            if grid.shape != values.shape or np.any(np.diff(grid) <= 0):
+                raise ValueError('Tables require increasing grids '
+                                 'matching their values')
+
+    def _matrix(self, X) -> np.ndarray:
+        """Feature matrix in scoring order."""
+        if hasattr(X, 'columns'):
+            X = X[self.features].to_numpy()
+        X = np.asarray(X, dtype=np.float64)
+        if X.ndim == 1:
+            X = X[np.newaxis, :]
+        if X.shape[1] != len(self.features):
+            raise ValueError(f'Expected {len(self.features)} features, '
+                             f'got {X.shape[1]}')
+        return X
+
+    def decision_function(self, X) -> np.ndarray:
+        """Anomaly scores.
+
+        Args:
+            X (pd.DataFrame or np.ndarray): features.
+
+        Returns:
+            np.ndarray: anomaly score per row.
+        """
+        X = self._matrix(X)
+        scores = np.zeros(X.shape[0])
+        for i, (grid, values) in enumerate(zip(self.grids, self.values)):
+            scores += self.weights[i] * np.interp(X[:, i], grid, values)
+        return scores / self.weights.sum()
+
+    def predict(self, X) -> np.ndarray:
+        """Binary labels, 1 for badchannels.
+
+        Args:
+            X (pd.DataFrame or np.ndarray): features.
+
+        Returns:
+            np.ndarray: label per row.
+        """
+        if self.threshold is None:
+            raise ValueError('The model has no decision threshold')
+        return (self.decision_function(X) > self.threshold).astype(int)
+
+    def save(self, filename: str) -> Path:
+        """Stores the model as uncompressed npz without pickles.
+
+        Args:
+            filename (str): target file.
+
+        Returns:
+            Path: the written file.
+        """
+        header = {'format_version': FORMAT_VERSION,
+                  'features': list(self.features),
+                  'threshold': self.threshold,
+                  'metadata': self.metadata}
+        arrays = {'header': np.array(json.dumps(header)),
+                  'weights': self.weights}
+        for i, (grid, values) in enumerate(zip(self.grids, self.values)):
+            arrays[f'grid_{i}'] = grid
+            arrays[f'values_{i}'] = values
+        filename = Path(filename)
+        with open(filename, 'wb') as f:
+            np.savez(f, **arrays)
+        return filename
+
+    @classmethod
+    def load(cls, filename: str) -> 'CompactModel':
+        """Loads a stored model.
+
+        Args:
+            filename (str): stored model.
+
+        Returns:
+            CompactModel: the model.
+        """
+        with np.load(filename, allow_pickle=False) as arrays:
+            header = json.loads(str(arrays['header']))
+            if header['format_version'] > FORMAT_VERSION:
+                raise ValueError(f'Model format {header["format_version"]} '
+                                 f'is newer than {FORMAT_VERSION}')
+            n_features = len(header['features'])
+            return cls(features=header['features'],
+                       grids=[arrays[f'grid_{i}'] for i in range(n_features)],
+                       values=[arrays[f'values_{i}'] for i in range(n_features)],
+                       weights=arrays['weights'],
+                       threshold=header['threshold'],
+                       metadata=header['metadata'])
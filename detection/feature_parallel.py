@@ -0,0 +1,109 @@
+"""Applies independent per-feature work concurrently with stable seeding."""
+
+# Author: Christian Gerloff <christian.gerloff@rwth-aachen.de>
+# License: see repository LICENSE file
+
+
+import os
+import zlib
+import logging
+import numpy as np
+import pandas as pd
+
+from typing import Callable, List
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+BACKENDS = ('thread', 'process')
+
+
+def feature_seeds(seed: int, features) -> List[np.random.SeedSequence]:
+    """Independent seed sequences per feature.
+
+    The seed of a feature is derived from the detector seed and the CRC32
+    of the feature name, so it does not depend on the number of workers
+    nor on which other features are selected. Features given by their
+    number are keyed by position instead.
+
+    Args:
+        seed (int): seed of the detector, None for fresh entropy.
+        features (list or int): feature names or number of features.
+
+    Returns:
+        List[np.random.SeedSequence]: seed sequence per feature.
+    """
+    if seed is None:
+        seed = np.random.SeedSequence().entropy
+    keys = range(features) if isinstance(features, int) else features
+    return [np.random.SeedSequence(
+                [seed, zlib.crc32(str(key).encode('UTF-8'))])
+            for key in keys]
+
+
+def _apply_feature(func: Callable,
+                   values: np.ndarray,
+                   seed: np.random.SeedSequence,
+                   args: tuple):
+    """Applies func to a feature with its own generator."""
+    return func(values, np.random.default_rng(seed), *args)
+
+
+def map_features(func: Callable,
+                 X,
+                 seed: int = None,
+                 n_jobs: int = 1,
+                 backend: str = 'thread',
+                 feature_args: list = None) -> list:
+    """Applies a function to each feature column.
+
+    The function is called as func(values, rng, *args) with the values of
+    one column, a generator seeded per feature and the optional
+    per-feature arguments (e.g. the tail prior). Results are identical for
+    any n_jobs and backend. Columns of a frame are seeded by name and keep
+    their results when other columns are dropped, columns of an array are
+    seeded by position.
+
+    Args:
+        func (Callable): function per feature, picklable for the process
+            backend.
+        X (pd.DataFrame or np.ndarray): features in columns.
+        seed (int, optional): seed of the detector. Defaults to None.
+        n_jobs (int, optional): number of workers, -1 for all cores.
+            Defaults to 1.
+        backend (str, optional): 'thread' for functions releasing the GIL
+            (NumPy), 'process' otherwise. Defaults to 'thread'.
+        feature_args (list, optional): tuple of arguments per feature.
+            Defaults to None.
+
+    Returns:
+        list: result per feature in column order.
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f'{backend} is not a supported backend.')
+    features = None
+    if isinstance(X, pd.DataFrame):
+        features = list(X.columns)
+    values = X.to_numpy() if isinstance(X, pd.DataFrame) else np.asarray(X)
+    if values.ndim == 1:
+        values = values[:, np.newaxis]
+    n_features = values.shape[1]
+    if feature_args is None:
+        feature_args = [()] * n_features
+    if len(feature_args) != n_features:
+        raise ValueError('feature_args requires one entry per feature')
+
+    if n_jobs < 0:
+        n_jobs = os.cpu_count() or 1
+
+    columns = [np.ascontiguousarray(values[:, i]) for i in range(n_features)]
+    args = ([func] * n_features, columns,
+            feature_seeds(seed, features or n_features), feature_args)
+    if n_jobs == 1 or n_features == 1:
+        return list(map(_apply_feature, *args))
+
+    executor_class = (ThreadPoolExecutor if backend == 'thread'
+                      else ProcessPoolExecutor)
+    with executor_class(max_workers=min(n_jobs, n_features)) as executor:
+        return list(executor.map(_apply_feature, *args))
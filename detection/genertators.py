@@ -9,6 +9,8 @@ Generates different data conditions
 import numpy as np
 import pandas as pd
 
+from dataclasses import dataclass
+
 
 def _check_labels(labels: np.ndarray):
     """Check if labels are binary and ensure type is np.ndarray
@@ -47,10 +49,32 @@ def _np_pandas_consitency_check(labels, shuffled_labels, shuffled_idx):
     return labels
 
 
+def _random_state(seed: int = None, rng=None):
+    """Random number source of a generator.
+
+    Args:
+        seed (int, optional): seed of the legacy global random state.
+            Defaults to None.
+        rng (np.random.Generator, optional): generator or seed sequence
+            used instead of the global random state. Defaults to None.
+
+    Returns:
+        object providing `choice`, either the generator or np.random
+    """
+    if rng is not None:
+        if isinstance(rng, np.random.SeedSequence):
+            return np.random.default_rng(rng)
+        return rng
+    if seed is not None:
+        np.random.seed(seed)
+    return np.random
+
+
 def binary_label_shuffling(labels: np.ndarray,
                            shuffled_idx: np.ndarray = None,
                            noise_ratio: float = 0.1,
-                           seed: int = None):
+                           seed: int = None,
+                           rng: np.random.Generator = None):
     """Shuffle labels across both classes
 
     Args:
@@ -58,6 +82,9 @@ def binary_label_shuffling(labels: np.ndarray,
         shuffled_idx (np.ndarray): indices of shuffled labels. If None, it will be generated.
         noise_ratio (float): percentage of labels to be
             shuffled
+        seed (int, optional): seed for random number generator. Defaults to None.
+        rng (np.random.Generator, optional): generator or seed sequence used
+            instead of the global random state. Defaults to None.
 
     Returns:
         np.ndarray: shuffled labels
@@ -68,11 +95,10 @@ def binary_label_shuffling(labels: np.ndarray,
 
     shuffled_labels = _check_labels(labels)
 
-    if seed is not None:
-        np.random.seed(seed)
+    random_state = _random_state(seed, rng)
     # labels are shuffled across the binary classes with p (i.e., noise ratio)
     if shuffled_idx is None:
-        shuffled_idx = np.random.choice(
+        shuffled_idx = random_state.choice(
             np.arange(len(shuffled_labels)),
             int(len(shuffled_labels) * noise_ratio),
             replace=False)
@@ -89,7 +115,8 @@ def binary_label_shuffling(labels: np.ndarray,
 def preserving_badchannel_label_shuffling(labels: np.ndarray,
                                           shuffled_idx: np.ndarray = None,
                                           noise_ratio: float = 0.1,
-                                          seed: int = None):
+                                          seed: int = None,
+                                          rng: np.random.Generator = None):
     """Shuffle labels across both classes while preserving label distribution of badchannels.
 
     Args:
@@ -99,6 +126,8 @@ def preserving_badchannel_label_shuffling(labels: np.ndarray,
         noise_ratio (float, optional): percentage of labels to be
             shuffled. Defaults to 0.1.
         seed (int, optional): seed for random number generator. Defaults to None.
+        rng (np.random.Generator, optional): generator or seed sequence used
+            instead of the global random state. Defaults to None.
 
     Returns:
         np.ndarray: shuffled labels
@@ -109,8 +138,7 @@ def preserving_badchannel_label_shuffling(labels: np.ndarray,
     if noise_ratio <= 0.0 and shuffled_idx is None:
         return labels, shuffled_idx
 
-    if seed is not None:
-        np.random.seed(seed)
+    random_state = _random_state(seed, rng)
 
     shuffled_labels = _check_labels(labels)
 
@@ -125,14 +153,14 @@ def preserving_badchannel_label_shuffling(labels: np.ndarray,
         n_shuffled = int(noise_ratio * len(bad_idx))
 
         # random sample of indices to be shuffled for badchannels
-        bad_shuffled_idx = np.random.choice(
+        bad_shuffled_idx = random_state.choice(
             bad_idx,
             n_shuffled,
             replace=False
         )
 
         # random sample of indices to not to be shuffled of normal data
-        normal_shuffled_idx = np.random.choice(
+        normal_shuffled_idx = random_state.choice(
             normal_idx,
             n_shuffled,
             replace=False,
@@ -156,31 +184,90 @@ def preserving_badchannel_label_shuffling(labels: np.ndarray,
     return labels, shuffled_idx
 
 
+def _lookup_arrays(shuffling_lookup):
+    """Convert a shuffling lookup into paired index arrays.
+
+    Args:
+        shuffling_lookup (dict or tuple): dictionary that maps the index of
+            original labels to the index of shuffled labels or a tuple of
+            paired (src, dst) index arrays.
+
+    Returns:
+        np.ndarray: source indices
+        np.ndarray: destination indices
+    """
+    if isinstance(shuffling_lookup, dict):
+        src = np.fromiter(shuffling_lookup.keys(), dtype=np.intp,
+                          count=len(shuffling_lookup))
+        dst = np.fromiter(shuffling_lookup.values(), dtype=np.intp,
+                          count=len(shuffling_lookup))
+        return src, dst
+    src, dst = shuffling_lookup
+    return np.asarray(src, dtype=np.intp), np.asarray(dst, dtype=np.intp)
+
+
+def _apply_swaps(labels: np.ndarray, src: np.ndarray, dst: np.ndarray):
+    """Swap labels of paired indices.
+
+    Equivalent to sequentially assigning labels[dst] to src and labels[src]
+    to dst for each pair, where later assignments overwrite earlier ones.
+
+    Args:
+        labels (np.ndarray): array of labels
+        src (np.ndarray): source indices
+        dst (np.ndarray): destination indices
+
+    Returns:
+        np.ndarray: shuffled labels
+    """
+    # interleave assignments in the order of the sequential swaps
+    targets = np.empty(2 * len(src), dtype=np.intp)
+    targets[0::2] = src
+    targets[1::2] = dst
+    values = np.empty(2 * len(src), dtype=labels.dtype)
+    values[0::2] = labels[dst]
+    values[1::2] = labels[src]
+
+    # keep only the last assignment per index
+    order = np.arange(len(targets))
+    last = np.full(len(labels), -1, dtype=np.intp)
+    np.maximum.at(last, targets, order)
+    winners = last[targets] == order
+
+    shuffled_labels = np.copy(labels)
+    shuffled_labels[targets[winners]] = values[winners]
+    return shuffled_labels
+
+
 def preserving_binary_label_shuffling(labels: np.ndarray,
-                                      shuffling_lookup: dict = None,
+                                      shuffling_lookup: tuple = None,
                                       noise_ratio: float = 0.1,
-                                      seed: int = None):
+                                      seed: int = None,
+                                      rng: np.random.Generator = None):
     """Shuffle labels across both classes while preserving label distribution.
 
     Args:
         labels (np.ndarray): array of labels
-        shuffling_lookup (dict, optional): dictionary that maps the index of original
-            labels to the index of shuffled labels. Defaults to None.
+        shuffling_lookup (tuple, optional): paired (src, dst) index arrays
+            swapping the label of src with the label of dst. A dictionary
+            that maps the index of original labels to the index of shuffled
+            labels is accepted as well. Defaults to None.
         noise_ratio (float, optional): percentage of labels to be
             shuffled. Defaults to 0.1.
         seed (int, optional): seed for random number generator. Defaults to None.
+        rng (np.random.Generator, optional): generator or seed sequence used
+            instead of the global random state. Defaults to None.
 
     Returns:
         np.ndarray: shuffled labels
-        dict: dictionary that maps the index of original
-            labels to the index of shuffled labels. Defaults to None
+        tuple: paired (src, dst) index arrays, or the given lookup.
+            Defaults to None
     """
 
     if noise_ratio <= 0.0:
         return labels, shuffling_lookup
 
-    if seed is not None:
-        np.random.seed(seed)
+    random_state = _random_state(seed, rng)
 
     labels = _check_labels(labels)
 
@@ -191,12 +278,12 @@ def preserving_binary_label_shuffling(labels: np.ndarray,
         idx_1 = np.where(labels == 1)[0]
 
         # random sample of indices to be shuffled per class
-        shuffled_idx_0 = np.random.choice(
+        shuffled_idx_0 = random_state.choice(
             idx_0,
             int(noise_ratio * len(idx_0)),
             replace=False
         )
-        shuffled_idx_1 = np.random.choice(
+        shuffled_idx_1 = random_state.choice(
             idx_1,
             int(noise_ratio * len(idx_1)),
             replace=False
@@ -205,28 +292,22 @@ def preserving_binary_label_shuffling(labels: np.ndarray,
         # random sample of indices to not to be shuffled per class
         not_shuffled_idx_0 = np.setdiff1d(idx_0, shuffled_idx_0)
         not_shuffled_idx_1 = np.setdiff1d(idx_1, shuffled_idx_1)
-        pair_0 = np.random.choice(
+        pair_0 = random_state.choice(
             not_shuffled_idx_1,  # important from 1!
             int(noise_ratio * len(idx_0)),
             replace=True  # required as not_shuffled_idx_1 might be smaller
         )
-        pair_1 = np.random.choice(
+        pair_1 = random_state.choice(
             not_shuffled_idx_0,  # important from 0!
             int(noise_ratio * len(idx_1)),
             replace=False
         )
 
-        shuffling_lookup = {}
-        for idx, i in enumerate(shuffled_idx_0):
-            shuffling_lookup[i] = pair_0[idx]
-        for idx, i in enumerate(shuffled_idx_1):
-            shuffling_lookup[i] = pair_1[idx]
+        shuffling_lookup = (np.concatenate((shuffled_idx_0, shuffled_idx_1)),
+                            np.concatenate((pair_0, pair_1)))
 
-    # shuffling based on keys of lookup dictionary
-    shuffled_labels = np.copy(labels)
-    for key, value in shuffling_lookup.items():
-        shuffled_labels[key] = labels[value]
-        shuffled_labels[value] = labels[key]
+    # shuffling based on pairs of lookup
+    shuffled_labels = _apply_swaps(labels, *_lookup_arrays(shuffling_lookup))
     return shuffled_labels, shuffling_lookup
 
 
@@ -272,11 +353,8 @@ def _add_label(data, idx: np.ndarray):
     if (isinstance(data, pd.Series) or
        isinstance(data, pd.DataFrame)):
 
-        # get pandas index of unlabelled data
-        idx = data.index[idx]
-
-        # concat data by rows from idx
-        data = pd.concat([data, data[idx]])
+        # concat data by rows at positions idx
+        data = pd.concat([data, data.iloc[idx]])
     elif isinstance(data, pd.Index):
         # append index
         data = data.append(data[idx])
@@ -286,12 +364,32 @@ def _add_label(data, idx: np.ndarray):
     return data
 
 
+def take_rows(data, selection: np.ndarray):
+    """Select rows of data by position.
+
+    Args:
+        data: dataset, labels or indices (pd.Series, pd.DataFrame,
+            pd.Index or np.ndarray).
+        selection (np.ndarray): positions of the selected rows.
+
+    Returns:
+        selected rows of data.
+    """
+    if (isinstance(data, pd.Series) or
+       isinstance(data, pd.DataFrame)):
+        return data.iloc[selection]
+    if isinstance(data, pd.Index):
+        return data[selection]
+    return np.take(data, selection, axis=0)
+
+
 def set_perc_rated(data,
                    labels,
                    idx,
                    gamma: float = 1.0,
                    unlabel_idx: np.ndarray = None,
-                   seed: int = None):
+                   seed: int = None,
+                   rng: np.random.Generator = None):
     """ Set percentage of labels to be rated.
         Apply only to train data.
 
@@ -304,14 +402,15 @@ def set_perc_rated(data,
         unlabel_idx (np.ndarray): unlabelled indices of dataset.
             Defaults to None.
         seed (int): seed for random number generator. Defaults to None.
+        rng (np.random.Generator): generator or seed sequence used
+            instead of the global random state. Defaults to None.
     """
 
     if ((gamma <= 0.0 and unlabel_idx is None) or
        (gamma >= 1.0 and unlabel_idx is None)):
         return data, labels, idx, unlabel_idx
 
-    if seed is not None:
-        np.random.seed(seed)
+    random_state = _random_state(seed, rng)
 
     # get number of observations for sanity check
     data_shape = data.shape[0]
@@ -332,7 +431,7 @@ def set_perc_rated(data,
         n_unlabelled = len(bad_idx) - n_labeled
 
         # random sample of indices to be unlabelled for badchannels
-        bad_unlabelled_idx = np.random.choice(
+        bad_unlabelled_idx = random_state.choice(
             bad_idx,
             n_unlabelled,
             replace=False
@@ -359,10 +458,16 @@ def set_contamination_rate(data,
                            contamination: float = 0.1,
                            remove_idx: np.ndarray = None,
                            add_idx: np.ndarray = None,
-                           seed: int = None):
+                           seed: int = None,
+                           rng: np.random.Generator = None,
+                           return_selection: bool = False):
     """Set contamination rate of data.
         Apply to both taind and test data.
 
+        With `return_selection` the data is not rebuilt. Instead a single
+        positional row selection is returned that yields the adjusted
+        data, labels and indices via `take_rows`.
+
     Args:
         data (_type_): dataset.
         labels (_type_): labels of dataset.
@@ -375,13 +480,23 @@ def set_contamination_rate(data,
             Defaults to None.
         seed (int): seed for random number generator.
             Defaults to None.
+        rng (np.random.Generator): generator or seed sequence used
+            instead of the global random state. Defaults to None.
+        return_selection (bool): return the row selection instead of
+            the adjusted data, labels and indices. Defaults to False.
+
+    Returns:
+        adjusted data, labels and indices or the row selection
+        np.ndarray: indices of removed data
+        np.ndarray: indices of added data
     """
     if ((contamination <= 0.0 and remove_idx is None and add_idx is None) or
        (contamination >= 1.0 and remove_idx is None and add_idx is None)):
+        if return_selection:
+            return np.arange(len(labels)), remove_idx, add_idx
         return data, labels, idx, remove_idx, add_idx
 
-    if seed is not None:
-        np.random.seed(seed)
+    random_state = _random_state(seed, rng)
 
     # convert labels to numpy array
     label_array = _check_labels(labels)
@@ -399,7 +514,7 @@ def set_contamination_rate(data,
             n_remove = len(bad_idx) - n_labeled
 
             # random sample of indices to be unlabelled for badchannels
-            remove_idx = np.random.choice(
+            remove_idx = random_state.choice(
                 bad_idx,
                 n_remove,
                 replace=False
@@ -412,7 +527,7 @@ def set_contamination_rate(data,
             n_add = n_labeled - len(bad_idx)
 
             # random sample of indices to be unlabelled for badchannels
-            add_idx = np.random.choice(
+            add_idx = random_state.choice(
                 bad_idx,
                 n_add,
                 replace=True
@@ -420,6 +535,16 @@ def set_contamination_rate(data,
             # avoid empty array
             if len(add_idx) == 0:
                 add_idx = None
+
+    if return_selection:
+        selection = np.arange(len(label_array))
+        if remove_idx is not None:
+            selection = np.delete(selection, remove_idx)
+        if add_idx is not None:
+            # added indices refer to the data after removal
+            selection = np.concatenate((selection, selection[add_idx]))
+        return selection, remove_idx, add_idx
+
     if remove_idx is not None:
         data = _unlabel(data, remove_idx)
         labels = _unlabel(labels, remove_idx)
@@ -431,3 +556,198 @@ def set_contamination_rate(data,
         idx = _add_label(idx, add_idx)
 
     return data, labels, idx, remove_idx, add_idx
+
+
+@dataclass
+class NestedMasks:
+    """Nested index masks of all (seed, level) pairs.
+
+    Indices of each seed are stored once in CSR layout, i.e. the indices
+    of seed i are `indices[indptr[i]:indptr[i + 1]]` and their number is
+    the largest size of the seed. The mask of a level is the first
+    `sizes[seed, level]` indices of the seed, hence masks of lower levels
+    are prefixes of higher levels.
+
+    Args:
+        levels (np.ndarray): ratios of the levels.
+        seeds (np.ndarray): seeds of the masks.
+        indices (np.ndarray): concatenated indices of all seeds.
+        indptr (np.ndarray): start of the indices of each seed.
+        sizes (np.ndarray): number of indices per seed and level.
+    """
+    levels: np.ndarray
+    seeds: np.ndarray
+    indices: np.ndarray
+    indptr: np.ndarray
+    sizes: np.ndarray
+
+    def mask(self, seed_pos: int, level_pos: int) -> np.ndarray:
+        """Indices of a seed and level.
+
+        Args:
+            seed_pos (int): position of the seed.
+            level_pos (int): position of the level.
+
+        Returns:
+            np.ndarray: indices of the mask.
+        """
+        start = self.indptr[seed_pos]
+        return self.indices[start:start + self.sizes[seed_pos, level_pos]]
+
+
+def _nested_masks(population: np.ndarray,
+                  level_sizes: np.ndarray,
+                  levels: list,
+                  seeds: list,
+                  replace: bool = False,
+                  rngs: list = None) -> NestedMasks:
+    """Draw nested masks from a population for all seeds and levels.
+
+    Only the largest mask of each seed is drawn and stored, the masks of
+    all other levels are its prefixes.
+
+    Args:
+        population (np.ndarray): indices to draw from.
+        level_sizes (np.ndarray): number of indices per level, or per
+            seed and level.
+        levels (list): ratios of the levels.
+        seeds (list): seeds of the masks.
+        replace (bool, optional): draw with replacement. Defaults to False.
+        rngs (list, optional): generators per seed. Defaults to None.
+
+    Returns:
+        NestedMasks: nested masks of all seeds and levels.
+    """
+    sizes = np.asarray(level_sizes, dtype=np.intp).reshape(-1, len(levels))
+    sizes = np.broadcast_to(sizes, (len(seeds), len(levels)))
+    n_used = (sizes.max(axis=1) if len(levels) > 0
+              else np.zeros(len(seeds), dtype=np.intp))
+    indptr = np.concatenate(([0], np.cumsum(n_used))).astype(np.intp)
+    if rngs is None:
+        rngs = [np.random.default_rng(seed) for seed in seeds]
+
+    # single ordered random sample per seed, levels are its prefixes
+    dtype = (np.int32 if len(population) == 0 or
+             population.max() < np.iinfo(np.int32).max else np.intp)
+    indices = np.empty(indptr[-1], dtype=dtype)
+    for i, rng in enumerate(rngs):
+        if n_used[i] > 0:
+            indices[indptr[i]:indptr[i + 1]] = rng.choice(
+                population, n_used[i], replace=replace)
+
+    return NestedMasks(
+        levels=np.asarray(levels),
+        seeds=np.asarray(seeds),
+        indices=indices,
+        indptr=indptr,
+        sizes=np.array(sizes)
+    )
+
+
+def nested_label_shuffling(labels: np.ndarray,
+                           noise_ratios: list,
+                           seeds: list) -> NestedMasks:
+    """Nested shuffled indices of binary_label_shuffling for all ratios.
+
+    Args:
+        labels (np.ndarray): array of labels
+        noise_ratios (list): percentages of labels to be shuffled.
+        seeds (list): seeds for random number generators.
+
+    Returns:
+        NestedMasks: shuffled_idx per seed and noise ratio.
+    """
+    labels = _check_labels(labels)
+    level_sizes = [int(len(labels) * r) if r > 0.0 else 0
+                   for r in noise_ratios]
+    return _nested_masks(np.arange(len(labels)), level_sizes,
+                         noise_ratios, seeds)
+
+
+def nested_badchannel_label_shuffling(labels: np.ndarray,
+                                      noise_ratios: list,
+                                      seeds: list):
+    """Nested indices of preserving_badchannel_label_shuffling.
+
+    The shuffled_idx of a seed and ratio are the badchannel mask followed
+    by the normal mask of the same seed and ratio.
+
+    Args:
+        labels (np.ndarray): array of labels
+        noise_ratios (list): percentages of badchannels to be shuffled.
+        seeds (list): seeds for random number generators.
+
+    Returns:
+        NestedMasks: shuffled badchannel indices per seed and ratio.
+        NestedMasks: shuffled normal indices per seed and ratio.
+    """
+    labels = _check_labels(labels)
+    normal_idx = np.where(labels == 0)[0]
+    bad_idx = np.where(labels == 1)[0]
+    level_sizes = [int(r * len(bad_idx)) if r > 0.0 else 0
+                   for r in noise_ratios]
+
+    # both classes are drawn from the same generator per seed
+    rngs = [np.random.default_rng(seed) for seed in seeds]
+    bad_masks = _nested_masks(bad_idx, level_sizes, noise_ratios,
+                              seeds, rngs=rngs)
+    normal_masks = _nested_masks(normal_idx, level_sizes, noise_ratios,
+                                 seeds, rngs=rngs)
+    return bad_masks, normal_masks
+
+
+def nested_perc_rated(labels: np.ndarray,
+                      gammas: list,
+                      seeds: list) -> NestedMasks:
+    """Nested unlabelled indices of set_perc_rated for all gammas.
+
+    Args:
+        labels (np.ndarray): array of labels
+        gammas (list): percentages of rated badchannels.
+        seeds (list): seeds for random number generators.
+
+    Returns:
+        NestedMasks: unlabel_idx per seed and gamma.
+    """
+    labels = _check_labels(labels)
+    bad_idx = np.where(labels == 1)[0]
+    level_sizes = [len(bad_idx) - int(g * len(bad_idx))
+                   if 0.0 < g < 1.0 else 0
+                   for g in gammas]
+    return _nested_masks(bad_idx, level_sizes, gammas, seeds)
+
+
+def nested_contamination_rate(labels: np.ndarray,
+                              contaminations: list,
+                              seeds: list):
+    """Nested removed and added indices of set_contamination_rate.
+
+    Args:
+        labels (np.ndarray): array of labels
+        contaminations (list): contamination rates.
+        seeds (list): seeds for random number generators.
+
+    Returns:
+        NestedMasks: remove_idx per seed and contamination rate.
+        NestedMasks: add_idx per seed and contamination rate.
+    """
+    labels = _check_labels(labels)
+    bad_idx = np.where(labels == 1)[0]
+    current_contamination = len(bad_idx) / len(labels)
+
+    remove_sizes, add_sizes = [], []
+    for c in contaminations:
+        n_labeled = int(c * len(labels))
+        valid = 0.0 < c < 1.0
+        remove_sizes.append(len(bad_idx) - n_labeled
+                            if valid and current_contamination > c else 0)
+        add_sizes.append(n_labeled - len(bad_idx)
+                         if valid and current_contamination < c else 0)
+
+    # removals and additions are drawn from the same generator per seed
+    rngs = [np.random.default_rng(seed) for seed in seeds]
+    remove_masks = _nested_masks(bad_idx, remove_sizes, contaminations,
+                                 seeds, rngs=rngs)
+    add_masks = _nested_masks(bad_idx, add_sizes, contaminations,
+                              seeds, replace=True, rngs=rngs)
+    return remove_masks, add_masks
@@ -0,0 +1,116 @@
+"""Compiles per-feature score transforms into interpolation tables.
+
+Experimental: the compiled CompactModel combines the tables with its own
+rule and does not reproduce the scores of Nireject.
+"""
+
+# Author: Christian Gerloff <christian.gerloff@rwth-aachen.de>
+# License: see repository LICENSE file
+
+
+import logging
+import numpy as np
+
+from typing import Callable
+
+from .compact_model import CompactModel
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def compile_table(transform: Callable,
+                  lower: float,
+                  upper: float,
+                  max_points: int = 1024,
+                  tol: float = 1e-4,
+                  n_initial: int = 65,
+                  n_check: int = 8) -> tuple:
+    """Tabulates a vectorized score transform on an adaptive grid.
+
+    Intervals whose midpoint deviates from the linear interpolation by
+    more than tol are bisected until all are within tol or the table
+    reaches max_points. Values outside [lower, upper] are clamped to the
+    scores at the bounds, so the bounds should cover the fitted data,
+    e.g. minimum and maximum of FeatureMoments.
+
+    Args:
+        transform (Callable): vectorized score of a feature.
+        lower (float): lower bound of the grid.
+        upper (float): upper bound of the grid.
+        max_points (int, optional): maximum size of the table.
+            Defaults to 1024.
+        tol (float, optional): target absolute deviation.
+            Defaults to 1e-4.
+        n_initial (int, optional): size of the initial uniform grid.
+            Defaults to 65.
+        n_check (int, optional): check points per interval for the
+            reported deviation. Defaults to 8.
+
+    Returns:
+        tuple: grid, values and maximum absolute deviation within bounds.
+    """
+    if not upper > lower:
+        raise ValueError('upper must be greater than lower')
+    grid = np.linspace(lower, upper, min(n_initial, max_points))
+    values = transform(grid)
+    while len(grid) < max_points:
+        mids = (grid[:-1] + grid[1:]) / 2
+        mid_values = transform(mids)
+        errors = np.abs(mid_values - np.interp(mids, grid, values))
+        refine = np.flatnonzero(errors > tol)
+        if len(refine) == 0:
+            break
+        budget = max_points - len(grid)
+        if len(refine) > budget:
+            refine = refine[np.argsort(errors[refine])[::-1][:budget]]
+        grid = np.concatenate((grid, mids[refine]))
+        values = np.concatenate((values, mid_values[refine]))
+        order = np.argsort(grid)
+        grid, values = grid[order], values[order]
+
+    steps = np.linspace(0, 1, n_check + 1)[1:-1]
+    checks = (grid[:-1, np.newaxis] +
+              np.diff(grid)[:, np.newaxis] * steps).ravel()
+    deviation = float(np.max(np.abs(
+        transform(checks) - np.interp(checks, grid, values)), initial=0))
+    return grid, values, deviation
+
+
+def compile_model(transforms: dict,
+                  bounds: dict,
+                  weights: dict = None,
+                  threshold: float = None,
+                  metadata: dict = None,
+                  **kwargs) -> tuple:
+    """Compiles per-feature score transforms into a compact model.
+
+    Args:
+        transforms (dict): vectorized score transform per feature.
+        bounds (dict): (lower, upper) per feature.
+        weights (dict, optional): weight per feature. Defaults to None
+            (equal weights).
+        threshold (float, optional): decision threshold.
+            Defaults to None.
+        metadata (dict, optional): metadata of the model.
+            Defaults to None.
+        **kwargs: arguments of compile_table.
+
+    Returns:
+        tuple: the compact model and the size and maximum deviation of
+            each table.
+    """
+    features = list(transforms)
+    grids, values, report = [], [], {}
+    for feature in features:
+        grid, table, deviation = compile_table(
+            transforms[feature], *bounds[feature], **kwargs)
+        grids.append(grid)
+        values.append(table)
+        report[feature] = {'points': len(grid), 'max_deviation': deviation}
+        logger.info(f'Table of {feature}: {len(grid)} points, '
+                    f'max deviation {deviation:.2e}')
+    weights = [1.0 if weights is None else weights[f] for f in features]
+    model = CompactModel(features, grids, values, weights, threshold,
+                         metadata or {})
+    return model, report
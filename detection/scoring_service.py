@@ -0,0 +1,213 @@
+"""Experimental local HTTP service scoring feature vectors with micro-batching.
+
+Usage:
+    python -m detection.scoring_service model.npz --port 8080
+
+POST /score with {"features": [[...], ...]} returns {"scores": [...]}.
+Scores are those of the experimental CompactModel, which does not
+reproduce the pipeline detectors, so they must not be used in place of
+Nireject scores.
+"""
+
+# Author: Christian Gerloff <christian.gerloff@rwth-aachen.de>
+# License: see repository LICENSE file
+
+
+import json
+import time
+import queue
+import logging
+import argparse
+import threading
+import numpy as np
+
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from .compact_model import CompactModel
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+class MicroBatcher:
+    """Scores concurrent requests in shared batches.
+
+    Requests are queued and a pool of warm workers stacks up to
+    max_batch rows that arrive within max_wait_ms into a single call
+    of the model.
+
+    Args:
+        model (CompactModel): model shared by all workers.
+        max_batch (int, optional): maximum rows per call. Defaults to 256.
+        max_wait_ms (float, optional): maximum time to wait for further
+            requests, 0 batches only queued requests. Defaults to 0.
+        n_workers (int, optional): number of workers. Defaults to 1.
+    """
+
+    def __init__(self,
+                 model: CompactModel,
+                 max_batch: int = 256,
+                 max_wait_ms: float = 0,
+                 n_workers: int = 1):
+        self.model = model
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self._requests = queue.Queue()
+        self._stopped = threading.Event()
+
+        # warm up the scoring path before serving
+        model.decision_function(np.zeros((1, len(model.features))))
+        self._workers = [threading.Thread(target=self._work, daemon=True)
+                         for _ in range(n_workers)]
+        for worker in self._workers:
+            worker.start()
+
+    def submit(self, X: np.ndarray) -> Future:
+        """Queues rows for scoring.
+
+        Args:
+            X (np.ndarray): feature vectors in rows.
+
+        Returns:
+            Future: scores of the rows.
+        """
+        X = np.atleast_2d(np.asarray(X, dtype=np.float64))
+        if X.ndim != 2 or X.shape[1] != len(self.model.features):
+            raise ValueError(f'Expected {len(self.model.features)} features '
+                             'per row')
+        future = Future()
+        self._requests.put((X, future))
+        return future
+
+    def _collect(self) -> list:
+        """Collects requests of the next batch."""
+        try:
+            batch = [self._requests.get(timeout=0.1)]
+        except queue.Empty:
+            return []
+        n_rows = len(batch[0][0])
+        deadline = time.monotonic() + self.max_wait
+        while n_rows < self.max_batch:
+            timeout = deadline - time.monotonic()
+            try:
+                if timeout > 0:
+                    request = self._requests.get(timeout=timeout)
+                else:
+                    request = self._requests.get_nowait()
+            except queue.Empty:
+                break
+            batch.append(request)
+            n_rows += len(request[0])
+        return batch
+
+    def _work(self):
+        """Scores batches until stopped."""
+        while not self._stopped.is_set():
+            batch = self._collect()
+            if len(batch) == 0:
+                continue
+            try:
+                scores = self.model.decision_function(
+                    np.concatenate([X for X, _ in batch]))
+                offsets = np.cumsum([len(X) for X, _ in batch])[:-1]
+                for (_, future), s in zip(batch, np.split(scores, offsets)):
+                    future.set_result(s)
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+
+    def close(self):
+        """Stops the workers."""
+        self._stopped.set()
+        for worker in self._workers:
+            worker.join()
+
+
+def _handler(batcher: MicroBatcher) -> type:
+    """Request handler bound to a batcher."""
+
+    class ScoringHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+        disable_nagle_algorithm = True
+
+        def _reply(self, status: int, body: dict):
+            payload = json.dumps(body).encode('UTF-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def do_GET(self):
+            if self.path == '/health':
+                self._reply(200, {'status': 'ok',
+                                  'features': batcher.model.features})
+            else:
+                self._reply(404, {'error': f'{self.path} not found'})
+
+        def do_POST(self):
+            if self.path != '/score':
+                self._reply(404, {'error': f'{self.path} not found'})
+                return
+            try:
+                length = int(self.headers.get('Content-Length', 0))
+                request = json.loads(self.rfile.read(length))
+                scores = batcher.submit(request['features']).result()
+            except Exception as e:
+                self._reply(400, {'error': str(e)})
+                return
+            self._reply(200, {'scores': scores.tolist()})
+
+        def log_message(self, format, *args):
+            logger.debug(format % args)
+
+    return ScoringHandler
+
+
+def serve(model: CompactModel,
+          host: str = '127.0.0.1',
+          port: int = 8080,
+          **kwargs) -> ThreadingHTTPServer:
+    """Creates the scoring server.
+
+    Args:
+        model (CompactModel): model to serve.
+        host (str, optional): host to bind. Defaults to '127.0.0.1'.
+        port (int, optional): port to bind, 0 for any free port.
+            Defaults to 8080.
+        **kwargs: arguments of MicroBatcher.
+
+    Returns:
+        ThreadingHTTPServer: server, started by serve_forever.
+    """
+    logger.warning('Serving an experimental CompactModel, its scores do '
+                   'not reproduce Nireject')
+    batcher = MicroBatcher(model, **kwargs)
+    server = ThreadingHTTPServer((host, port), _handler(batcher))
+    server.daemon_threads = True
+    server.batcher = batcher
+    return server
+
+
+if __name__ == "__main__":
+    """Serve a compact model."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument('model', type=str)
+    parser.add_argument('--host', type=str, default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--max_batch', type=int, default=256)
+    parser.add_argument('--max_wait_ms', type=float, default=0)
+    parser.add_argument('--n_workers', type=int, default=1)
+    args = parser.parse_args()
+
+    server = serve(CompactModel.load(args.model), args.host, args.port,
+                   max_batch=args.max_batch,
+                   max_wait_ms=args.max_wait_ms,
+                   n_workers=args.n_workers)
+    logger.info(f'Scoring service listening on {args.host}:{args.port}')
+    try:
+        server.serve_forever()
+    finally:
+        server.batcher.close()
@@ -4,95 +4,316 @@
 # License: see repository LICENSE file
 
 
+import os
+import json
+import shutil
+import hashlib
 import logging
 import argparse
+import tempfile
 import mlflow
 import numpy as np
 import pandas as pd
 
 from pathlib import Path
+from itertools import repeat
 from dataclasses import asdict
-from typing import List
-from joblib import dump
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Tuple
+from joblib import dump, load
 
 from config import ETLProfile, DataLoaderProfile
 from config import SamplingProfile, AnnotationProfile
-from config import load_profile
+from config import ExecutionProfile
+from config import get_profile
 from detection import data_loader, subsampling
+from utils import dump_artifact, IndexedSplits
+from utils.python.feature_reader import stage_features, check_filters
+from utils.python.partitions import probe_index, write_partitions
+from utils.python.dtype_policy import apply_dtype_policy
+from utils.python.annotations import annotate_batch
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
-def _annotate_samples(data: pd.DataFrame,
-                      samples: pd.DataFrame,
-                      seed: int,
-                      annotation_names: list):
-    """Annotate samples.
+def _file_digest(filename: str, cache_path: Path) -> str:
+    """Content hash of a file, memoized by path, size and mtime.
 
     Args:
-        data (pd.DataFrame): data to annotate.
-        samples (pd.DataFrame): samples to annotate.
-        seed (int): seed used for sampling.
-        profile (dataclass): profile specifying annotation.
+        filename (str): file to hash.
+        cache_path (Path): directory of the ingest cache.
+
+    Returns:
+        str: sha256 digest of the file content.
+    """
+    stat = Path(filename).stat()
+    source = {'filename': str(Path(filename).resolve()),
+              'size': stat.st_size,
+              'mtime_ns': stat.st_mtime_ns}
+    source_key = hashlib.sha1(
+        json.dumps(source, sort_keys=True).encode('UTF-8')).hexdigest()
+    memo_file = cache_path / 'sources' / f'{source_key}.sha256'
+    if memo_file.exists():
+        return memo_file.read_text(encoding='UTF-8')
+
+    sha = hashlib.sha256()
+    with open(filename, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 24), b''):
+            sha.update(chunk)
+    digest = sha.hexdigest()
+
+    memo_file.parent.mkdir(parents=True, exist_ok=True)
+    memo_file.write_text(digest, encoding='UTF-8')
+    return digest
+
+
+def _ingest_key(profile: DataLoaderProfile,
+                cache_path: Path,
+                read_options: dict = None,
+                dtype_policy: str = 'float64') -> str:
+    """Key of the ingest cache.
+
+    The key combines the content hash of the source file with all
+    remaining fields of the profile, the pushdown options and the dtype
+    policy.
+
+    Args:
+        profile (DataLoaderProfile): profile specifying dataloader.
+        cache_path (Path): directory of the ingest cache.
+        read_options (dict, optional): pushdown options. Defaults to None.
+        dtype_policy (str, optional): dtype policy of the data.
+            Defaults to 'float64'.
 
     Returns:
-        annotated samples.
+        str: key of the ingested data.
+    """
+    params = asdict(profile)
+    params.pop('filename')
+    payload = {'source': _file_digest(profile.filename, cache_path),
+               'params': params}
+    if read_options is not None:
+        payload['read_options'] = read_options
+    if dtype_policy != 'float64':
+        payload['dtype_policy'] = dtype_policy
+    payload = json.dumps(payload,
+                         sort_keys=True,
+                         default=str)
+    return hashlib.sha256(payload.encode('UTF-8')).hexdigest()
+
+
+def _dump_atomic(value, filename: Path, **kwargs):
+    """Dumps a value such that concurrent readers never see partial files.
+
+    Args:
+        value: value to dump.
+        filename (Path): target file.
+        kwargs: arguments of joblib.dump.
+    """
+    filename.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_file = tempfile.mkstemp(dir=filename.parent, suffix='.tmp')
+    os.close(fd)
+    try:
+        dump(value, tmp_file, **kwargs)
+        os.replace(tmp_file, filename)
+    finally:
+        if os.path.exists(tmp_file):
+            os.remove(tmp_file)
+
+
+def _link_artifact(source: Path, target: Path):
+    """Hands out a cached artifact to a run by hard link or copy.
+
+    Args:
+        source (Path): cached artifact.
+        target (Path): artifact of the run.
     """
+    try:
+        os.link(source, target)
+    except OSError:
+        shutil.copyfile(source, target)
+
+
+def _read_options(execution_profile: ExecutionProfile,
+                  sampling_profile: SamplingProfile) -> dict:
+    """Pushdown options of the ingest.
 
-    idx_train = samples[4]
-    idx_test = samples[5]
-    idx_aug_train = samples[10]
-    idx_aug_test = samples[11]
+    Unless filtered explicitly, only original signals and the
+    augmentations used by sampling are read.
 
-    train = data.loc[idx_train, annotation_names]
-    test = data.loc[idx_test, annotation_names]
-    aug_train = (
-        data.loc[idx_aug_train, annotation_names]
-        if idx_aug_train is not None else None
-    )
-    aug_test = (
-        data.loc[idx_aug_test, annotation_names]
-        if idx_aug_test is not None else None
-    )
+    Args:
+        execution_profile (ExecutionProfile): execution options.
+        sampling_profile (SamplingProfile): profile specifing sampling.
 
-    # sanity check does augmentation correcpond to annotation if not None
-    if (aug_train is not None and
-       aug_train.shape[0] == train.shape[0]):
-        if not np.array_equal(aug_train, train):
-            logger.warning('Augmented training data does not match training data')
+    Returns:
+        dict: columns and row filters or None without pushdown.
+    """
+    if not execution_profile.pushdown:
+        return None
+    filters = check_filters(dict(execution_profile.read_filters or {}))
+    if 'augmentation' not in filters:
+        filters['augmentation'] = ['None'] + list(
+            sampling_profile.augmentation or [])
+    return {'columns': execution_profile.read_columns, 'filters': filters}
 
-    return seed, (train, test, aug_train, aug_test)
 
+def _load(params: dict,
+          read_options: dict = None,
+          dtype_policy: str = 'float64') -> pd.DataFrame:
+    """Loads data with the data loader.
+
+    With pushdown or a compact dtype policy, the required columns and rows
+    are streamed into a temporary parquet file in the dtypes of the
+    policy, which is passed to the data loader. Hence, no float64 frame
+    of the whole table is built.
+
+    Args:
+        params (dict): arguments of the data loader.
+        read_options (dict, optional): pushdown options. Defaults to None.
+        dtype_policy (str, optional): dtypes of the staged file.
+            Defaults to 'float64'.
 
-def _ingest(profile: DataLoaderProfile) -> pd.DataFrame:
+    Returns:
+        pd.DataFrame: loaded data.
+    """
+    if read_options is None and dtype_policy == 'float64':
+        return data_loader(**params)
+    read_options = read_options or {'columns': None, 'filters': {}}
+    with tempfile.TemporaryDirectory() as tmp_path:
+        staged = stage_features(params['filename'],
+                                Path(tmp_path) / 'features.parquet',
+                                read_options['columns'],
+                                dtype_policy=dtype_policy,
+                                **read_options['filters'])
+        return data_loader(**{**params, 'filename': str(staged)})
+
+
+def _ingest(profile: DataLoaderProfile,
+            cache_path: str = None,
+            read_options: dict = None,
+            dtype_policy: str = 'float64') -> Tuple[pd.DataFrame, Path]:
     """Ingest data.
 
     Args:
         profile (DataLoaderProfile): profile specifying dataloader.
+        cache_path (str, optional): directory of the ingest cache.
+            Defaults to None (no caching).
+        read_options (dict, optional): columns and row filters pushed
+            down to the parquet reader. Defaults to None (read all).
+        dtype_policy (str, optional): dtypes of the ingested data,
+            'float64' or 'compact'. Defaults to 'float64'.
 
     Returns:
         pd.DataFrame: ingested data.
+        Path: cached artifact of the ingested data or None.
     """
 
     # read files
     try:
         params = asdict(profile)
         mlflow.log_params(params)
-        data = data_loader(**params)
+        if read_options is not None:
+            mlflow.log_param('read_options', read_options)
+        mlflow.log_param('dtype_policy', dtype_policy)
+        if cache_path is None:
+            data = _load(params, read_options, dtype_policy)
+            return apply_dtype_policy(data, dtype_policy), None
+
+        cache_path = Path(cache_path)
+        cache_key = _ingest_key(profile, cache_path, read_options,
+                                dtype_policy)
+        cache_file = cache_path / f'{cache_key}.joblib'
+        mlflow.log_param('ingest_cache_file', str(cache_file))
+        if cache_file.exists():
+            logger.info(f'Ingest cache hit: {cache_file}')
+            return load(cache_file), cache_file
+
+        data = apply_dtype_policy(_load(params, read_options, dtype_policy),
+                                  dtype_policy)
+        _dump_atomic(data, cache_file, compress=3)
     except Exception as e:
         logger.error(f'Unable to read artifacts: {e}')
-        data = None
-    return data
+        return None, None
+    return data, cache_file
+
+
+# data shared with the sampling workers
+_worker_data = None
+
+
+def _init_sampling_worker(data_file: str):
+    """Attaches a sampling worker to the memory-mapped data.
+
+    Args:
+        data_file (str): uncompressed joblib file of the data.
+    """
+    global _worker_data
+    # copy-on-write as generators may alter labels in place
+    _worker_data = load(data_file, mmap_mode='c')
+
+
+def _subsample_seed(seed: int, params: dict, split_format: str):
+    """Samples the shared data of a worker for a single seed.
+
+    Args:
+        seed (int): seed used for sampling.
+        params (dict): parameters of subsampling.
+        split_format (str): 'full' or 'index'.
+
+    Returns:
+        output of subsampling or its IndexedSplits.
+    """
+    samples = subsampling(_worker_data, **params, seed=seed)
+    if split_format == 'index':
+        splits = IndexedSplits(_worker_data)
+        splits.append(seed, samples)
+        return splits
+    return samples
+
+
+def _parallel_subsampling(data: pd.DataFrame,
+                          params: dict,
+                          seeds: list,
+                          split_format: str,
+                          n_jobs: int) -> list:
+    """Samples seeds on a process pool sharing memory-mapped data.
+
+    Args:
+        data (pd.DataFrame): data to sample.
+        params (dict): parameters of subsampling.
+        seeds (list): seeds used for sampling.
+        split_format (str): 'full' or 'index'.
+        n_jobs (int): number of worker processes.
+
+    Returns:
+        list: results per seed in the order of seeds.
+    """
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        data_file = Path(tmp_dir) / 'data.joblib'
+        dump(data, data_file)
+        with ProcessPoolExecutor(max_workers=n_jobs,
+                                 initializer=_init_sampling_worker,
+                                 initargs=(str(data_file),)) as executor:
+            return list(executor.map(_subsample_seed,
+                                     seeds,
+                                     repeat(params),
+                                     repeat(split_format)))
 
 
 def _sampling(data: pd.DataFrame,
-              profile: SamplingProfile) -> pd.DataFrame:
+              profile: SamplingProfile,
+              split_format: str = 'full',
+              n_jobs: int = 1) -> pd.DataFrame:
     """Sample data.
 
     Args:
         data (pd.DataFrame): data to sampling base.
         profile (SamplingProfile): profile spefcifing sampling.
+        split_format (str, optional): 'full' keeps the output of
+            subsampling per seed, 'index' keeps only positional indices
+            into data (IndexedSplits). Defaults to 'full'.
+        n_jobs (int, optional): number of processes sampling seeds.
+            Defaults to 1.
 
     Returns:
         pd.DataFrame: sampled data.
@@ -121,11 +342,28 @@ def _sampling(data: pd.DataFrame,
 
     # sample data
     try:
+        base_data = data
         if (params.get('augmentation') is None or
            len(params.get('augmentation')) == 0):
             data = data[data.augmentation == 'None']
 
-        sampled_data = [(s, subsampling(data, **params, seed=s)) for s in seeds]
+        if n_jobs > 1:
+            samples = _parallel_subsampling(
+                data, params, seeds, split_format, n_jobs)
+            if split_format == 'index':
+                sampled_data = IndexedSplits(base_data)
+                positions_map = base_data.index.get_indexer(data.index)
+                for splits in samples:
+                    sampled_data.merge(splits, positions_map)
+            else:
+                sampled_data = list(zip(seeds, samples))
+        elif split_format == 'index':
+            # compress each seed right away to bound memory
+            sampled_data = IndexedSplits(base_data)
+            for s in seeds:
+                sampled_data.append(s, subsampling(data, **params, seed=s))
+        else:
+            sampled_data = [(s, subsampling(data, **params, seed=s)) for s in seeds]
     except Exception as e:
         logger.error(f'Unable to sample data: {e}')
         return None
@@ -154,8 +392,7 @@ def _annotate(data: pd.DataFrame,
         logger.info('No annotations provided')
         return None
     try:
-        annotations = [_annotate_samples(data, d, s, profile.annotations) for s, d in datasets]
-
+        annotations = annotate_batch(data, datasets, profile.annotations)
     except Exception as e:
         logger.error(f'Unable to annotate data: {e}')
         return None
@@ -165,7 +402,8 @@ def _annotate(data: pd.DataFrame,
 def etl(etl_profile: ETLProfile,
         dataload_profile: DataLoaderProfile,
         sampling_profile: SamplingProfile,
-        annotation_profile: AnnotationProfile) -> List[pd.DataFrame]:
+        annotation_profile: AnnotationProfile,
+        execution_profile: ExecutionProfile = None) -> List[pd.DataFrame]:
     """Extract, Transform, Load.
 
     Args:
@@ -174,8 +412,13 @@ def etl(etl_profile: ETLProfile,
         dataload_profile (DataLoaderProfile): profile to load data.
         sampling_profile (SamplingProfile): profile to sample data.
         annotation_profile (AnnotationProfile): profile to annotate data.
+        execution_profile (ExecutionProfile, optional): execution options.
+            Defaults to ExecutionProfile().
     """
 
+    if execution_profile is None:
+        execution_profile = ExecutionProfile()
+
     with mlflow.start_run() as active_run:
 
         # set tags
@@ -185,23 +428,41 @@ def etl(etl_profile: ETLProfile,
         output_path.mkdir(parents=True, exist_ok=True)
         mlflow.log_param('output_path', str(output_path))
 
+        artifact_format = execution_profile.artifact_format
+        mlflow.log_param('artifact_format', artifact_format)
+
         # ingest data
-        data = _ingest(dataload_profile)
-        dump(data, output_path / 'data.joblib', compress=3)
+        data, cache_file = _ingest(dataload_profile,
+                                   execution_profile.ingest_cache_path,
+                                   _read_options(execution_profile,
+                                                 sampling_profile),
+                                   execution_profile.dtype_policy)
+        if cache_file is not None and artifact_format == 'joblib':
+            _link_artifact(cache_file, output_path / 'data.joblib')
+        else:
+            dump_artifact(data, output_path, 'data', artifact_format)
 
         # store pandas idx per probe if more than one unique probe
-        if len(data.probe.unique()) > 1:
-            probes_idx_data = data.groupby('probe').apply(lambda x: x.index)
-            dump(probes_idx_data, output_path / 'probes_idx_data.joblib', compress=3)
+        probes_idx_data = probe_index(data)
+        if len(probes_idx_data) > 1:
+            dump_artifact(probes_idx_data, output_path,
+                          'probes_idx_data', artifact_format)
+            if execution_profile.partition_by_probe:
+                write_partitions(data, output_path / 'data_by_probe')
 
         # sample data
-        sampled_data = _sampling(data, sampling_profile)
-        dump(sampled_data, output_path / 'sampled_data.joblib', compress=3)
+        sampled_data = _sampling(data,
+                                 sampling_profile,
+                                 execution_profile.split_format,
+                                 execution_profile.n_jobs)
+        dump_artifact(sampled_data, output_path,
+                      'sampled_data', artifact_format)
 
         # annotate data
         annotated_data = _annotate(data, sampled_data, annotation_profile)
         if annotated_data is not None:
-            dump(annotated_data, output_path / 'annotated_data.joblib', compress=3)
+            dump_artifact(annotated_data, output_path,
+                          'annotated_data', artifact_format)
 
         mlflow.log_artifacts(output_path)
         logger.info(f'ETL finished - run_id: {active_run.info.run_id} \n'
@@ -221,18 +482,20 @@ if __name__ == "__main__":
         (etl_profile,
          dataloader_profile,
          sampling_profile,
-         annotation_profile) = tuple(
+         annotation_profile,
+         execution_profile) = tuple(
             map(
-                lambda profile: load_profile(
-                    profile,
+                lambda profile_class: get_profile(
+                    profile_class,
                     args.config_name,
                     args.config_file
                 ),
                 [
-                    ETLProfile(),
-                    DataLoaderProfile(),
-                    SamplingProfile(),
-                    AnnotationProfile()
+                    ETLProfile,
+                    DataLoaderProfile,
+                    SamplingProfile,
+                    AnnotationProfile,
+                    ExecutionProfile
                 ]
             )
         )
@@ -243,4 +506,5 @@ if __name__ == "__main__":
     etl(etl_profile,
         dataloader_profile,
         sampling_profile,
-        annotation_profile)
+        annotation_profile,
+        execution_profile)
@@ -4,8 +4,22 @@
 # License: see repository LICENSE file
 
 
+import os
+import time
+import logging
+import argparse
 import itertools
 import mlflow
+import pandas as pd
+
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from mlflow.utils import mlflow_tags
+
+from utils import RunIndex, run_fingerprint, FINGERPRINT_TAG
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
 
 ETL_Q1 = ['N21_UNGROUPED_AAFT', 'R22_UNGROUPED_AAFT']
 
@@ -60,73 +74,219 @@ ETL_Q4 = ['HYBRID_CHANNEL_MIXED_V3_AAFT_VR', 'HYBRID_CHANNEL_MIXED_V3_AAFT_LM',
 
 # same detectors
 DETECTION_Q1 = ['Q1']
-DETECTION_Q2 = ['Q1']  
+DETECTION_Q2 = ['Q1']
 DETECTION_Q3 = ['Q1']
 DETECTION_Q4 = ['Q1']
 
-# ablation study
-config_file = 'config.yaml'
-
-# Q1
-for etl_config, detection_config in itertools.product(ETL_Q1, DETECTION_Q1):
-    mlflow.projects.run(
-        backend='local',
-        uri=".",
-        synchronous=True,
-        entry_point='main',
-        env_manager='local',
-        experiment_name='Q1_final',
-        parameters={
-            'etl_config': etl_config,
-            'detection_config': detection_config,
-            'config_file': config_file
-        }
-    )
-
-# Q2
-for etl_config, detection_config in itertools.product(ETL_Q2, DETECTION_Q2):
-    mlflow.projects.run(
-        backend='local',
-        uri=".",
-        synchronous=True,
-        entry_point='main',
-        env_manager='local',
-        experiment_name='Q2_final',
-        parameters={
-            'etl_config': etl_config,
-            'detection_config': detection_config,
-            'config_file': config_file
-        }
-    )
-
-# Q3
-for etl_config, detection_config in itertools.product(ETL_Q3, DETECTION_Q3):
-    mlflow.projects.run(
-        backend='local',
-        uri=".",
-        synchronous=True,
-        entry_point='main',
-        env_manager='local',
-        experiment_name='Q3_final',
-        parameters={
-            'etl_config': etl_config,
-            'detection_config': detection_config,
-            'config_file': config_file
-        }
-    )
-
-# Q4
-for etl_config, detection_config in itertools.product(ETL_Q4, DETECTION_Q4):
-    mlflow.projects.run(
-        backend='local',
-        uri=".",
-        synchronous=True,
-        entry_point='hybrid_main',
-        env_manager='local',
-        experiment_name='Q4_final',
-        parameters={
-            'etl_config': etl_config,
-            'detection_config': detection_config,
-            'config_file': config_file
+QUESTIONS = {
+    'Q1': (ETL_Q1, DETECTION_Q1, 'main', 'Q1_final'),
+    'Q2': (ETL_Q2, DETECTION_Q2, 'main', 'Q2_final'),
+    'Q3': (ETL_Q3, DETECTION_Q3, 'main', 'Q3_final'),
+    'Q4': (ETL_Q4, DETECTION_Q4, 'hybrid_main', 'Q4_final')
+}
+
+# thread pools of numerical backends capped per worker
+THREAD_ENV_VARS = [
+    'OMP_NUM_THREADS',
+    'OPENBLAS_NUM_THREADS',
+    'MKL_NUM_THREADS',
+    'VECLIB_MAXIMUM_THREADS',
+    'NUMEXPR_NUM_THREADS'
+]
+
+
+def _init_worker(threads_per_worker: int):
+    """Caps the threads of numerical backends in a sweep worker.
+
+    Args:
+        threads_per_worker (int): Number of threads per worker.
+    """
+    for env_var in THREAD_ENV_VARS:
+        os.environ[env_var] = str(threads_per_worker)
+
+
+def _run_stage(entry_point: str,
+               experiment_name: str,
+               parameters: dict) -> dict:
+    """Runs a single project entry point.
+
+    Args:
+        entry_point (str): Name of the entry point.
+        experiment_name (str): Name of the experiment.
+        parameters (dict): Parameters of the entry point.
+
+    Returns:
+        dict: run id, status and wall time of the run.
+    """
+    start = time.perf_counter()
+    run_id = None
+    status = 'FINISHED'
+    try:
+        submitted_run = mlflow.projects.run(
+            backend='local',
+            uri=".",
+            synchronous=True,
+            entry_point=entry_point,
+            env_manager='local',
+            experiment_name=experiment_name,
+            parameters=parameters
+        )
+        run_id = submitted_run.run_id
+
+        # register etl stages for reuse by the pipeline cache
+        if entry_point == 'etl':
+            client = mlflow.tracking.MlflowClient()
+            run = client.get_run(run_id)
+            fingerprint = run_fingerprint(
+                entry_point,
+                parameters,
+                run.data.tags.get(mlflow_tags.MLFLOW_GIT_COMMIT, None))
+            client.set_tag(run_id, FINGERPRINT_TAG, fingerprint)
+            # main.py looks runs up by the user it tags its runs with
+            client.set_tag(run_id, mlflow_tags.MLFLOW_USER,
+                           os.getenv('MLFLOW_TRACKING_USERNAME'))
+            RunIndex().add(client.get_run(run_id), fingerprint)
+    except Exception as e:
+        logger.error(f'{entry_point} failed for {parameters}: {e}')
+        status = 'FAILED'
+    return {'run_id': run_id,
+            'status': status,
+            'wall_time': time.perf_counter() - start}
+
+
+def _rebuild_index(experiment_names: set):
+    """Imports the run history of the experiments into the run index.
+
+    Done once before dispatch, so concurrent pipelines find the
+    experiments rebuilt instead of importing them each.
+
+    Args:
+        experiment_names (set): Names of the experiments.
+    """
+    run_index = RunIndex()
+    client = mlflow.tracking.MlflowClient()
+    for experiment_name in experiment_names:
+        experiment = client.get_experiment_by_name(experiment_name)
+        experiment_id = (experiment.experiment_id if experiment is not None
+                         else client.create_experiment(experiment_name))
+        if not run_index.is_rebuilt(experiment_id):
+            run_index.rebuild(experiment_id)
+
+
+def sweep(questions: list,
+          n_workers: int = 1,
+          threads_per_worker: int = 1,
+          config_file: str = 'config.yaml',
+          summary_file: str = 'sweep_summary.csv') -> pd.DataFrame:
+    """Runs the ETL x detection grids of the questions concurrently.
+
+    The run index is rebuilt once and identical ETL stages are run once
+    before the dependent pipelines are dispatched, which then reuse them
+    via the run cache.
+
+    Args:
+        questions (list): Names of the questions, e.g. ['Q1', 'Q3'].
+        n_workers (int, optional): Number of worker processes.
+            Defaults to 1.
+        threads_per_worker (int, optional): Threads of numerical
+            backends per worker. Defaults to 1.
+        config_file (str, optional): Name of configuration file.
+            Defaults to 'config.yaml'.
+        summary_file (str, optional): Path of the wall time summary.
+            Defaults to 'sweep_summary.csv'.
+
+    Returns:
+        pd.DataFrame: wall time summary per cell.
+    """
+    config_path = str(Path.cwd() / 'config' / config_file)
+
+    # deduplicate etl stages of all pipelines
+    etl_stages = {}
+    cells = {}
+    for question in questions:
+        etl_configs, detection_configs, entry_point, experiment_name = (
+            QUESTIONS[question])
+        for etl_config, detection_config in itertools.product(
+                etl_configs, detection_configs):
+            etl_key = None
+            if entry_point == 'main':
+                etl_parameters = {'config_name': etl_config,
+                                  'config_file': config_path}
+                etl_key = (experiment_name,
+                           run_fingerprint('etl', etl_parameters, None))
+                etl_stages.setdefault(
+                    etl_key, (question, etl_config, etl_parameters))
+            cells.setdefault(etl_key, []).append(
+                (question, etl_config, detection_config,
+                 entry_point, experiment_name))
+
+    _rebuild_index({experiment_name for experiment_name, _ in etl_stages})
+    summary = []
+
+    def _submit_cells(executor, etl_key):
+        return {
+            executor.submit(_run_stage,
+                            entry_point,
+                            experiment_name,
+                            {'etl_config': etl_config,
+                             'detection_config': detection_config,
+                             'config_file': config_file}): {
+                'question': question,
+                'stage': entry_point,
+                'etl_config': etl_config,
+                'detection_config': detection_config
+            }
+            for (question, etl_config, detection_config,
+                 entry_point, experiment_name) in cells.pop(etl_key, [])
         }
-    )
\ No newline at end of file
+
+    with ProcessPoolExecutor(max_workers=n_workers,
+                             initializer=_init_worker,
+                             initargs=(threads_per_worker,)) as executor:
+        pending = _submit_cells(executor, None)
+        for etl_key, (question, etl_config, etl_parameters) in (
+                etl_stages.items()):
+            future = executor.submit(_run_stage,
+                                     'etl',
+                                     etl_key[0],
+                                     etl_parameters)
+            pending[future] = {'question': question,
+                               'stage': 'etl',
+                               'etl_config': etl_config,
+                               'detection_config': None,
+                               'etl_key': etl_key}
+
+        # dispatch pipelines as soon as their etl stage finished
+        while pending:
+            future = next(as_completed(pending))
+            cell = pending.pop(future)
+            etl_key = cell.pop('etl_key', None)
+            cell.update(future.result())
+            summary.append(cell)
+            logger.info(f'Finished {cell}')
+            if etl_key is not None:
+                pending.update(_submit_cells(executor, etl_key))
+
+    summary = pd.DataFrame(summary)
+    summary.to_csv(summary_file, index=False)
+    logger.info(f'Sweep summary written to {summary_file}')
+    return summary
+
+
+if __name__ == "__main__":
+    """Run ablation study."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--questions', type=str, nargs='+',
+                        default=list(QUESTIONS.keys()))
+    parser.add_argument('--n_workers', type=int, default=1)
+    parser.add_argument('--threads_per_worker', type=int, default=1)
+    parser.add_argument('--config_file', type=str, default='config.yaml')
+    parser.add_argument('--summary_file', type=str,
+                        default='sweep_summary.csv')
+    args = parser.parse_args()
+
+    sweep(args.questions,
+          args.n_workers,
+          args.threads_per_worker,
+          args.config_file,
+          args.summary_file)
@@ -14,9 +14,12 @@ import mlflow
 from pathlib import Path
 from mlflow.utils import mlflow_tags
 from mlflow.entities import RunStatus
+from mlflow.exceptions import MlflowException
 from mlflow.utils.logging_utils import eprint
 from mlflow.tracking.fluent import _get_experiment_id
 
+from utils import RunIndex, run_fingerprint, FINGERPRINT_TAG
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
@@ -25,10 +28,17 @@ def _already_ran(entry_point_name: str,
                  parameters: dict,
                  git_commit: str,
                  user_name: str = None,
-                 experiment_id: str = None) -> str:
+                 experiment_id: str = None,
+                 run_index: RunIndex = None) -> str:
     """Detect if a run with the given entrypoint name,
        parameters, experiment id from a specific user already ran.
 
+    The lookup is a single query against the local run index.
+    The history of an experiment is imported from the tracking server
+    once per index, by the sweep before it dispatches pipelines or else
+    by the first lookup; use `--rebuild_index` to import runs tagged by
+    other machines since then.
+
     Args:
         entry_point_name (str): Name of pipeline stage.
         parameters (dict): Parameters of pipeline stage.
@@ -37,49 +47,39 @@ def _already_ran(entry_point_name: str,
             Defaults to None.
         experiment_id (str, optional): Id of relevant experiment.
             Defaults to None.
+        run_index (RunIndex, optional): Index of historical runs.
+            Defaults to the index next to the tracking store.
 
     Returns:
         str: id of identical historical run.
     """
     experiment_id = (experiment_id if experiment_id is not None
                      else _get_experiment_id())
+    run_index = run_index if run_index is not None else RunIndex()
     client = mlflow.tracking.MlflowClient()
 
-    all_run_infos = reversed(client.list_run_infos(experiment_id))
-    for run_info in all_run_infos:
-        full_run = client.get_run(run_info.run_id)
-        tags = full_run.data.tags
-        hist_entry_point = tags.get(
-            mlflow_tags.MLFLOW_PROJECT_ENTRY_POINT, None)
-        if hist_entry_point != entry_point_name:
-            continue
-        match_failed = False
-        for param_key, param_value in parameters.items():
-            run_value = full_run.data.params.get(param_key)
-            if run_value != param_value:
-                match_failed = True
-                break
-        if match_failed:
-            continue
-        if run_info.to_proto().status != RunStatus.FINISHED:
-            eprint(f'Run matched, but is not FINISHED, so skipping'
-                   f'run_id={run_info.run_id}, status= {run_info.status}')
-            continue
-        hist_user_name = tags.get(mlflow_tags.MLFLOW_USER, None)
-        if (user_name is not None and hist_user_name != user_name):
-            eprint(f'Run matched, but user does not match'
-                   f'found={hist_user_name}, '
-                   f'current user={user_name}')
-            continue
-        previous_version = tags.get(mlflow_tags.MLFLOW_GIT_COMMIT, None)
-        if git_commit != previous_version:
-            eprint(f'Run matched, but has a different source version, '
-                   f'so skipping found={previous_version}, '
-                   f'expected={git_commit}')
-            continue
-        return client.get_run(run_info.run_id)
-    eprint("No matching run has been found.")
-    return None
+    if not run_index.is_rebuilt(experiment_id):
+        run_index.rebuild(experiment_id)
+
+    fingerprint = run_fingerprint(entry_point_name, parameters, git_commit)
+    run_id = run_index.lookup(experiment_id, fingerprint, user_name)
+    if run_id is None:
+        eprint("No matching run has been found.")
+        return None
+
+    try:
+        full_run = client.get_run(run_id)
+    except MlflowException as e:
+        eprint(f'Indexed run {run_id} is not available, '
+               f'so removing it from the index: {e}')
+        run_index.remove(run_id)
+        return None
+    if full_run.info.to_proto().status != RunStatus.FINISHED:
+        eprint(f'Run matched, but is not FINISHED, so skipping'
+               f'run_id={run_id}, status= {full_run.info.status}')
+        run_index.add(full_run, fingerprint)
+        return None
+    return full_run
 
 
 def _get_or_run(entrypoint: str,
@@ -102,13 +102,16 @@ def _get_or_run(entrypoint: str,
     Returns:
         mlflow.entities.Run: Information about current run.
     """
+    run_index = RunIndex()
     if user_name is not None:
         existing_run = _already_ran(entrypoint,
                                     parameters,
                                     git_commit,
-                                    user_name)
+                                    user_name,
+                                    run_index=run_index)
     else:
-        existing_run = _already_ran(entrypoint, parameters, git_commit)
+        existing_run = _already_ran(entrypoint, parameters, git_commit,
+                                    run_index=run_index)
     if use_cache and existing_run:
         print(f'Found existing run for entrypoint={entrypoint} '
               f'and parameters={parameters}')
@@ -122,7 +125,14 @@ def _get_or_run(entrypoint: str,
         parameters=parameters,
     )
 
-    return mlflow.tracking.MlflowClient().get_run(submitted_run.run_id)
+    # keep index up to date
+    client = mlflow.tracking.MlflowClient()
+    fingerprint = run_fingerprint(entrypoint, parameters, git_commit)
+    client.set_tag(submitted_run.run_id, FINGERPRINT_TAG, fingerprint)
+    run = client.get_run(submitted_run.run_id)
+    run_index.add(run, fingerprint)
+
+    return run
 
 
 def workflow(etl_config: str = 'TRINH',
@@ -174,8 +184,11 @@ if __name__ == "__main__":
     parser.add_argument('--etl_config', type=str, default='TRINH')
     parser.add_argument('--detection_config', type=str, default='Q1')
     parser.add_argument('--config_file', type=str, default='config.yaml')
+    parser.add_argument('--rebuild_index', action='store_true')
     args = parser.parse_args()
 
     if os.getenv('MLFLOW_TRACKING_URI', None):
         logger.info('MLFLOW_TRACKING_URI not set')
+    if args.rebuild_index:
+        RunIndex().rebuild(_get_experiment_id())
     workflow(args.etl_config, args.detection_config, args.config_file)
@@ -0,0 +1,72 @@
+"""
+Tests of stage artifact formats.
+"""
+
+# Author: Christian Gerloff <christian.gerloff@rwth-aachen.de>
+# License: see repository LICENSE file
+
+
+import pytest
+import numpy as np
+import pandas as pd
+
+from utils.python.artifacts import dump_artifact, load_artifact
+
+
+@pytest.fixture
+def data():
+    """Fixture to return a small feature frame."""
+    rng = np.random.default_rng(42)
+    return pd.DataFrame({
+        'signal_id': np.arange(20),
+        'probe': ['probe_1'] * 10 + ['probe_2'] * 10,
+        'sci': rng.random(20),
+        'flatline': rng.random(20),
+        'labels': rng.integers(0, 2, 20)
+    }, index=np.arange(20) + 100)
+
+
+@pytest.fixture
+def sampled_data(data):
+    """Fixture to return splits shaped like the ETL sampling output."""
+    features = ['sci', 'flatline']
+    train, test = data.iloc[:12], data.iloc[12:]
+    return [(np.int64(seed),
+             (train[features], test[features],
+              train['labels'], test['labels'],
+              train.index, test.index,
+              None, None, None, None, None, None))
+            for seed in (1, 2)]
+
+
+@pytest.mark.parametrize('artifact_format', ['joblib', 'columnar'])
+def test_roundtrip(tmp_path, data, sampled_data, artifact_format):
+    """Test that artifacts are restored in both formats."""
+    dump_artifact(data, tmp_path, 'data', artifact_format)
+    dump_artifact(sampled_data, tmp_path, 'sampled_data', artifact_format)
+
+    pd.testing.assert_frame_equal(load_artifact(tmp_path, 'data'), data)
+
+    loaded = load_artifact(tmp_path, 'sampled_data')
+    assert len(loaded) == len(sampled_data)
+    for (seed, split), (exp_seed, exp_split) in zip(loaded, sampled_data):
+        assert seed == exp_seed
+        pd.testing.assert_frame_equal(split[0], exp_split[0])
+        pd.testing.assert_series_equal(split[2], exp_split[2])
+        assert split[4].equals(exp_split[4])
+        assert split[6] is None
+
+
+def test_column_projection(tmp_path, data):
+    """Test that columnar artifacts load only the requested columns."""
+    dump_artifact(data, tmp_path, 'data', 'columnar')
+    projected = load_artifact(tmp_path, 'data', columns=['sci', 'labels'])
+
+    assert projected.columns.tolist() == ['sci', 'labels']
+    assert projected.index.equals(data.index)
+
+
+def test_unknown_format(tmp_path, data):
+    """Smoke test of artifact format validation."""
+    with pytest.raises(ValueError, match='is not a supported'):
+        dump_artifact(data, tmp_path, 'data', 'csv')
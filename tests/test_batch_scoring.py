@@ -0,0 +1,136 @@
+"""
+Tests of batch scoring.
+"""
+
+# Author: Christian Gerloff <christian.gerloff@rwth-aachen.de>
+# License: see repository LICENSE file
+
+
+import pytest
+import numpy as np
+import pandas as pd
+
+from detection import iter_scores, score_parquet
+from detection.batch_scoring import iter_frames
+from utils import synthetic_features, write_synthetic_features
+
+FEATURES = ['diff_cov', 'hr_freq_od_wave1', 'hr_power_od_wave1',
+            'flatline', 'sci']
+
+
+class RowDetector:
+    """Detector scoring each row by its distance to the training data.
+
+    With a reference set, scores are the fraction of reference rows that
+    are closer to the training data, hence they depend on the whole set.
+    """
+
+    def fit(self, X):
+        self.center_ = X.mean().to_numpy()
+        self.scale_ = X.std().to_numpy()
+        return self
+
+    def _distance(self, X):
+        return np.sqrt((((X.to_numpy() - self.center_) /
+                         self.scale_) ** 2).sum(axis=1))
+
+    def decision_function(self, X, augmented=None):
+        scores = self._distance(X)
+        if augmented is not None:
+            reference = np.sort(self._distance(augmented))
+            scores = np.searchsorted(reference, scores) / len(reference)
+        return scores
+
+    def predict_proba(self, X):
+        scores = self.decision_function(X)
+        scores = 1 - np.exp(-scores)
+        return np.column_stack([1 - scores, scores])
+
+
+@pytest.fixture
+def detector():
+    """Fixture to return a fitted detector."""
+    train = synthetic_features(1000, seed=1)
+    return RowDetector().fit(train[FEATURES])
+
+
+@pytest.mark.parametrize('batch_size', [1, 333, 5000])
+def test_iter_scores(detector, batch_size):
+    """Test that batch scores match the one-shot call."""
+    data = synthetic_features(1000, seed=2)
+    original = data[data.augmentation == 'None']
+    augmented = data.loc[data.augmentation == 'AAFT', FEATURES]
+    expected = detector.decision_function(original[FEATURES],
+                                          augmented=augmented)
+
+    scores = [s for _, s in iter_scores(detector,
+                                        iter_frames(original, batch_size),
+                                        FEATURES, augmented=augmented)]
+    assert np.array_equal(np.concatenate(scores), expected)
+
+    # per-batch arguments take precedence over the constant ones
+    def batch_kwargs(batch):
+        return {'augmented': augmented.iloc[:10]}
+
+    scores = [s for _, s in iter_scores(detector,
+                                        iter_frames(original, batch_size),
+                                        FEATURES, batch_kwargs=batch_kwargs,
+                                        augmented=augmented)]
+    assert np.array_equal(np.concatenate(scores), detector.decision_function(
+        original[FEATURES], augmented=augmented.iloc[:10]))
+
+    with pytest.raises(ValueError):
+        next(iter_scores(detector, [data], FEATURES, method='fit'))
+
+
+@pytest.mark.parametrize('method', ['decision_function', 'predict_proba'])
+def test_score_parquet(detector, tmp_path, method):
+    """Test that scores written to parquet match the one-shot call."""
+    source = write_synthetic_features(tmp_path / 'features.parquet', 3000,
+                                      batch_size=1000, seed=3)
+    filename = score_parquet(detector, source, tmp_path / 'scores.parquet',
+                             FEATURES, method=method, batch_size=700,
+                             filters={'augmentation': ['None']})
+
+    data = pd.read_parquet(source)
+    data = data[data.augmentation == 'None']
+    expected = getattr(detector, method)(data[FEATURES])
+    scores = pd.read_parquet(filename)
+
+    assert np.array_equal(scores.signal_id, data.signal_id)
+    assert np.array_equal(
+        scores.filter(like='score').to_numpy().squeeze(), expected)
+
+
+def test_score_parquet_augmented(detector, tmp_path):
+    """Test that all augmented rows are the reference of every batch."""
+    source = write_synthetic_features(tmp_path / 'features.parquet', 3000,
+                                      batch_size=1000, seed=4)
+    filename = score_parquet(detector, source, tmp_path / 'scores.parquet',
+                             FEATURES, batch_size=700, augmentation='AAFT',
+                             filters={'probes': [0, 5, 99]})
+
+    data = pd.read_parquet(source)
+    data = data[data.probe.isin([0, 5, 99])]
+    original = data[data.augmentation == 'None']
+    augmented = data[data.augmentation == 'AAFT']
+    expected = detector.decision_function(original[FEATURES],
+                                          augmented=augmented[FEATURES])
+    scores = pd.read_parquet(filename)
+
+    assert (scores.augmentation == 'None').all()
+    assert np.array_equal(scores.signal_id, original.signal_id)
+    assert np.array_equal(scores.score, expected)
+
+
+def test_score_parquet_empty(detector, tmp_path):
+    """Test that a file with schema is written without rows."""
+    source = write_synthetic_features(tmp_path / 'features.parquet', 100,
+                                      seed=5)
+    filename = score_parquet(detector, source, tmp_path / 'scores.parquet',
+                             FEATURES, filters={'signal_ids': (1000, None)})
+
+    scores = pd.read_parquet(filename)
+    assert len(scores) == 0
+    assert list(scores.columns) == ['signal_id', 'probe', 'augmentation',
+                                    'score']
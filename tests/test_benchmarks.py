@@ -0,0 +1,48 @@
+"""
+Tests of the benchmark suite.
+"""
+
+# Author: Christian Gerloff <christian.gerloff@rwth-aachen.de>
+# License: see repository LICENSE file
+
+
+import pytest
+
+from benchmarks.suite import BENCHMARKS, benchmark, run, save, compare
+
+
+@pytest.fixture
+def registered():
+    """Fixture to register a benchmark and a skipped benchmark."""
+    @benchmark('test.sum')
+    def _bench_sum(n_rows):
+        return lambda: sum(range(n_rows))
+
+    @benchmark('test.missing')
+    def _bench_missing(n_rows):
+        import nireject_missing_module  # noqa: F401
+
+    yield
+    BENCHMARKS.pop('test.sum')
+    BENCHMARKS.pop('test.missing')
+
+
+def test_compare(registered, tmp_path):
+    """Test that slower results are flagged as regressions."""
+    results = run([10, 100], pattern='^test\\.', repeats=2)
+    status = {r['name']: r['status'] for r in results['results']}
+    assert status == {'test.sum': 'ok', 'test.missing': 'skipped'}
+    save(results, tmp_path / 'baseline.json')
+
+    for result in results['results']:
+        if result['status'] == 'ok':
+            result['best'] *= 2
+    save(results, tmp_path / 'current.json')
+
+    comparison = compare(tmp_path / 'baseline.json',
+                         tmp_path / 'current.json', threshold=0.5)
+    assert len(comparison) == 2
+    assert comparison.regression.all()
+    comparison = compare(tmp_path / 'baseline.json',
+                         tmp_path / 'baseline.json')
+    assert not comparison.regression.any()
@@ -0,0 +1,81 @@
+"""
+Tests of the compact model and the scoring service.
+"""
+
+# Author: Christian Gerloff <christian.gerloff@rwth-aachen.de>
+# License: see repository LICENSE file
+
+
+import json
+import threading
+import http.client
+import pytest
+import numpy as np
+import pandas as pd
+
+from detection.compact_model import CompactModel
+from detection.scoring_service import serve
+
+
+@pytest.fixture
+def model():
+    """Fixture to return a model of two features."""
+    return CompactModel(features=['sci', 'flatline'],
+                        grids=[[0, 0.5, 1], [0, 1]],
+                        values=[[1, 0.2, 0], [0, 1]],
+                        weights=[2, 1],
+                        threshold=0.5,
+                        metadata={'task': 'unsupervised', 'seed': 42})
+
+
+def test_compact_model(model, tmp_path):
+    """Test scores and the stored model."""
+    X = pd.DataFrame({'flatline': [0.0, 1.0, 2.0],
+                      'sci': [0.25, 1.0, -1.0]})
+    expected = (2 * np.array([0.6, 0, 1]) + np.array([0, 1, 1])) / 3
+    assert np.allclose(model.decision_function(X), expected)
+    assert np.array_equal(model.predict(X), [0, 0, 1])
+
+    loaded = CompactModel.load(model.save(tmp_path / 'model.npz'))
+    assert loaded.metadata == model.metadata
+    assert np.array_equal(loaded.decision_function(X),
+                          model.decision_function(X))
+
+    with pytest.raises(ValueError):
+        CompactModel(['sci'], [[1, 0]], [[0, 1]], [1])
+
+
+def test_scoring_service(model):
+    """Test concurrent requests against the local service."""
+    server = serve(model, port=0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    host, port = server.server_address
+    rng = np.random.default_rng(0)
+    requests = [rng.random((n, 2)) for n in (1, 3, 1, 7)]
+    responses = [None] * len(requests)
+
+    def _score(i):
+        connection = http.client.HTTPConnection(host, port)
+        connection.request('POST', '/score',
+                           json.dumps({'features': requests[i].tolist()}))
+        response = connection.getresponse()
+        responses[i] = (response.status, json.loads(response.read()))
+
+    try:
+        threads = [threading.Thread(target=_score, args=(i,))
+                   for i in range(len(requests))]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        for X, (status, body) in zip(requests, responses):
+            assert status == 200
+            assert np.allclose(body['scores'], model.decision_function(X))
+
+        requests.append(rng.random((1, 3)))
+        responses.append(None)
+        _score(len(requests) - 1)
+        assert responses[-1][0] == 400
+    finally:
+        server.shutdown()
+        server.batcher.close()
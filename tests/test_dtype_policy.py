@@ -0,0 +1,74 @@
+"""
+Tests of the reduced-precision dtype policy.
+"""
+
+# Author: Christian Gerloff <christian.gerloff@rwth-aachen.de>
+# License: see repository LICENSE file
+
+
+import pytest
+import numpy as np
+import pandas as pd
+
+from utils import apply_dtype_policy, synthetic_features
+from utils import dump_artifact, load_artifact, probe_index
+from utils import write_partitions, load_partition
+from utils.python.dtype_policy import memory_usage
+from utils.python.feature_reader import stage_features
+
+
+@pytest.fixture
+def data():
+    """Fixture to return a synthetic feature table."""
+    return synthetic_features(5000, n_probes=5, seed=3)
+
+
+def test_apply_dtype_policy(data):
+    """Test dtypes, values and memory of the compact policy."""
+    compact = apply_dtype_policy(data)
+
+    assert compact.sci.dtype == np.float32
+    assert compact.signal_id.dtype == np.int32
+    assert isinstance(compact.augmentation.dtype, pd.CategoricalDtype)
+    assert isinstance(compact.probe.dtype, pd.CategoricalDtype)
+    assert compact.labels.dtype == data.labels.dtype
+    assert np.allclose(compact.sci, data.sci, rtol=1e-7)
+    assert memory_usage(compact) < memory_usage(data) / 2
+    assert apply_dtype_policy(data, 'float64') is data
+    with pytest.raises(ValueError):
+        apply_dtype_policy(data, 'float16')
+
+
+@pytest.mark.parametrize('artifact_format', ['joblib', 'columnar'])
+def test_dtype_policy_preserved(data, tmp_path, artifact_format):
+    """Test that artifacts and partitions keep the compact dtypes."""
+    compact = apply_dtype_policy(data)
+
+    dump_artifact(compact, tmp_path, 'data', artifact_format)
+    loaded = load_artifact(tmp_path, 'data')
+    pd.testing.assert_frame_equal(loaded, compact)
+
+    original = compact[compact.augmentation == 'None']
+    assert len(original) == 5000
+    assert [len(i) for i in probe_index(compact)] == [2000] * 5
+
+    write_partitions(compact, tmp_path / 'partitions')
+    probe = load_partition(tmp_path / 'partitions', 2)
+    assert probe.sci.dtype == np.float32
+    assert probe.signal_id.dtype == np.int32
+    assert (probe.probe == 2).all()
+
+
+def test_staged_dtype_policy(data, tmp_path):
+    """Test that features staged in compact dtypes match the policy."""
+    source = tmp_path / 'features.parquet'
+    data.to_parquet(source)
+    staged = stage_features(source, tmp_path / 'staged.parquet',
+                            batch_size=1000, dtype_policy='compact')
+
+    loaded = pd.read_parquet(staged)
+    assert loaded.sci.dtype == np.float32
+    assert isinstance(loaded.augmentation.dtype, pd.CategoricalDtype)
+    pd.testing.assert_frame_equal(apply_dtype_policy(loaded),
+                                  apply_dtype_policy(data),
+                                  check_categorical=False)
@@ -0,0 +1,66 @@
+"""
+Tests of the sampling of the ETL stage.
+"""
+
+# Author: Christian Gerloff <christian.gerloff@rwth-aachen.de>
+# License: see repository LICENSE file
+
+
+import pytest
+import numpy as np
+import pandas as pd
+
+import etl_stage
+
+from config import SamplingProfile
+from utils import synthetic_features
+
+
+@pytest.fixture
+def data():
+    """Fixture to return a synthetic feature table with augmentation."""
+    return synthetic_features(500, seed=6)
+
+
+@pytest.fixture(autouse=True)
+def no_tracking(monkeypatch):
+    """Fixture to skip logging sampling parameters to mlflow."""
+    monkeypatch.setattr(etl_stage.mlflow, 'log_params', lambda *args: None)
+    monkeypatch.setattr(etl_stage.mlflow, 'log_param', lambda *args: None)
+
+
+def _assert_equal(serial, parallel):
+    """Asserts that two fields of subsampling are identical."""
+    if serial is None:
+        assert parallel is None
+    elif isinstance(serial, pd.DataFrame):
+        pd.testing.assert_frame_equal(serial, parallel)
+    elif isinstance(serial, pd.Series):
+        pd.testing.assert_series_equal(serial, parallel)
+    elif isinstance(serial, pd.Index):
+        pd.testing.assert_index_equal(serial, parallel)
+    else:
+        assert np.array_equal(serial, parallel)
+
+
+@pytest.mark.parametrize('generator', [{},
+                                       {'label_noise_ratio': 0.1},
+                                       {'gamma': 0.25},
+                                       {'c_rate': 0.1}])
+@pytest.mark.parametrize('split_format', ['full', 'index'])
+def test_parallel_sampling(data, generator, split_format):
+    """Test that parallel sampling matches the serial splits in order."""
+    profile = SamplingProfile(test_size=0.4, augmentation=['AAFT'], mode=1,
+                              seeds=[20211001], repeats=4, **generator)
+    serial = etl_stage._sampling(data, profile, split_format)
+    parallel = etl_stage._sampling(data, profile, split_format, n_jobs=2)
+
+    assert serial is not None and parallel is not None
+    assert len(serial) == len(parallel) == 4
+    for (serial_seed, serial_samples), (parallel_seed, parallel_samples) in (
+            zip(serial, parallel)):
+        assert serial_seed == parallel_seed
+        assert len(serial_samples) == len(parallel_samples)
+        for serial_field, parallel_field in zip(serial_samples,
+                                                parallel_samples):
+            _assert_equal(serial_field, parallel_field)
@@ -0,0 +1,49 @@
+"""
+Tests of the per-feature parallel map.
+"""
+
+# Author: Christian Gerloff <christian.gerloff@rwth-aachen.de>
+# License: see repository LICENSE file
+
+
+import pytest
+import numpy as np
+
+from detection import map_features
+from utils import synthetic_features
+
+FEATURES = ['diff_cov', 'hr_freq_od_wave1', 'hr_power_od_wave1',
+            'flatline', 'sci']
+
+
+def _tail_threshold(values, rng, tail_prior):
+    """Bootstrapped tail quantile of a feature."""
+    sample = rng.choice(values, size=len(values))
+    q = 0.95 if tail_prior >= 0 else 0.05
+    return np.quantile(sample, q)
+
+
+@pytest.mark.parametrize('n_jobs, backend', [(2, 'thread'),
+                                             (-1, 'thread'),
+                                             (3, 'process')])
+def test_map_features(n_jobs, backend):
+    """Test that results do not depend on the number of workers."""
+    X = synthetic_features(2000, seed=5)[FEATURES]
+    tail_priors = [(p,) for p in [1, 0, -1, 1, -1]]
+
+    serial = map_features(_tail_threshold, X, seed=20211001,
+                          feature_args=tail_priors)
+    parallel = map_features(_tail_threshold, X, seed=20211001,
+                            n_jobs=n_jobs, backend=backend,
+                            feature_args=tail_priors)
+    assert serial == parallel
+
+    # a feature keeps its seed when other features are dropped
+    for kept in ([0], [3], [1, 4]):
+        subset = map_features(_tail_threshold, X[[FEATURES[i] for i in kept]],
+                              seed=20211001,
+                              feature_args=[tail_priors[i] for i in kept])
+        assert subset == [serial[i] for i in kept]
+
+    with pytest.raises(ValueError):
+        map_features(_tail_threshold, X, backend='gpu')
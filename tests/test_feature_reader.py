@@ -0,0 +1,70 @@
+"""
+Tests of the feature reader with pushdown.
+"""
+
+# Author: Christian Gerloff <christian.gerloff@rwth-aachen.de>
+# License: see repository LICENSE file
+
+
+import pytest
+import pandas as pd
+
+from utils import write_synthetic_features, read_features, iter_features
+from utils.python.feature_reader import stage_features
+
+
+@pytest.fixture
+def feature_file(tmp_path):
+    """Fixture to write a synthetic feature table in row groups."""
+    return write_synthetic_features(tmp_path / 'features.parquet', 5000,
+                                    n_probes=10, batch_size=1000, seed=42)
+
+
+@pytest.mark.parametrize('columns, filters', [
+    (None, {}),
+    (['signal_id', 'augmentation', 'sci'], {'augmentation': ['None']}),
+    (['signal_id', 'probe', 'labels'], {'probes': [0, 7]}),
+    (None, {'signal_ids': (1200, 3100), 'augmentation': ['AAFT']}),
+    (['signal_id'], {'signal_ids': (None, 10)})
+])
+def test_read_features(feature_file, columns, filters):
+    """Test that pushdown matches filtering in pandas."""
+    data = pd.read_parquet(feature_file)
+    mask = pd.Series(True, index=data.index)
+    if 'augmentation' in filters:
+        mask &= data.augmentation.isin(filters['augmentation'])
+    if 'probes' in filters:
+        mask &= data.probe.isin(filters['probes'])
+    if 'signal_ids' in filters:
+        start, stop = filters['signal_ids']
+        if start is not None:
+            mask &= data.signal_id >= start
+        mask &= data.signal_id < stop
+    expected = data.loc[mask, columns or data.columns].reset_index(drop=True)
+
+    pd.testing.assert_frame_equal(
+        read_features(feature_file, columns, **filters), expected)
+    pd.testing.assert_frame_equal(
+        pd.concat(iter_features(feature_file, columns, batch_size=700,
+                                **filters), ignore_index=True), expected)
+
+
+def test_stage_features(feature_file, tmp_path):
+    """Test that staged files hold the pushed down rows."""
+    columns = ['signal_id', 'augmentation', 'labels', 'sci']
+    staged = stage_features(feature_file, tmp_path / 'staged.parquet',
+                            columns, batch_size=700, augmentation=['None'])
+    pd.testing.assert_frame_equal(
+        pd.read_parquet(staged),
+        read_features(feature_file, columns, augmentation=['None']))
+
+    # empty selections keep the schema
+    staged = stage_features(feature_file, tmp_path / 'empty.parquet',
+                            columns, probes=[99])
+    assert list(pd.read_parquet(staged).columns) == columns
+
+
+def test_unsupported_filter(feature_file):
+    """Test that unknown row filters are rejected."""
+    with pytest.raises(ValueError, match='probe'):
+        read_features(feature_file, probe=[0])
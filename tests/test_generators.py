@@ -0,0 +1,226 @@
+"""
+Tests of data condition generators.
+"""
+
+# Author: Christian Gerloff <christian.gerloff@rwth-aachen.de>
+# License: see repository LICENSE file
+
+
+import pytest
+import numpy as np
+import pandas as pd
+
+from concurrent.futures import ThreadPoolExecutor
+
+from detection.genertators import binary_label_shuffling
+from detection.genertators import preserving_badchannel_label_shuffling
+from detection.genertators import preserving_binary_label_shuffling
+from detection.genertators import set_perc_rated, set_contamination_rate
+from detection.genertators import nested_label_shuffling, nested_perc_rated
+from detection.genertators import nested_contamination_rate
+from detection.genertators import nested_badchannel_label_shuffling
+from detection.genertators import _nested_masks
+from detection.genertators import take_rows
+
+
+def _loop_swaps(labels, shuffling_lookup):
+    """Reference of the sequential dictionary based swaps."""
+    shuffled_labels = np.copy(labels)
+    for key, value in shuffling_lookup.items():
+        shuffled_labels[key] = labels[value]
+        shuffled_labels[value] = labels[key]
+    return shuffled_labels
+
+
+@pytest.fixture
+def labels():
+    """Fixture to return imbalanced binary labels."""
+    rng = np.random.default_rng(20211001)
+    return (rng.random(2000) < 0.2).astype(int)
+
+
+@pytest.mark.parametrize('noise_ratio, seed',
+                         [(0.01, 42),
+                          (0.1, 22),
+                          (0.5, 20211001),
+                          (0.75, 7)])
+def test_preserving_binary_label_shuffling(labels, noise_ratio, seed):
+    """Test that vectorized swaps match the sequential swaps."""
+    shuffled, (src, dst) = preserving_binary_label_shuffling(
+        labels, noise_ratio=noise_ratio, seed=seed)
+    lookup = dict(zip(src, dst))
+
+    assert np.array_equal(shuffled, _loop_swaps(labels, lookup))
+
+    # dictionary lookups are still accepted
+    shuffled_dict, returned = preserving_binary_label_shuffling(
+        labels, shuffling_lookup=lookup, noise_ratio=noise_ratio)
+    assert returned is lookup
+    assert np.array_equal(shuffled_dict, shuffled)
+
+
+def _draw(labels, rng=None, seed=None):
+    """Indices drawn by all generators from one random source."""
+    features = np.arange(len(labels))
+    return (
+        binary_label_shuffling(np.copy(labels), noise_ratio=0.1,
+                               seed=seed, rng=rng)[1],
+        preserving_badchannel_label_shuffling(np.copy(labels),
+                                              noise_ratio=0.1,
+                                              seed=seed, rng=rng)[1],
+        np.concatenate(preserving_binary_label_shuffling(
+            labels, noise_ratio=0.1, seed=seed, rng=rng)[1]),
+        set_perc_rated(features, labels, features, gamma=0.5,
+                       seed=seed, rng=rng)[3],
+        set_contamination_rate(features, labels, features,
+                               contamination=0.4, seed=seed, rng=rng)[4]
+    )
+
+
+# indices of the baseline implementation on the global random state
+LEGACY_DRAWS = {
+    42: ([19, 16, 15, 26], [34, 27], [13, 36, 4, 24, 19, 31],
+         [34, 30, 0, 29, 19, 9], [20, 10, 34, 24]),
+    7: ([17, 37, 34, 18], [24, 25], [3, 13, 30, 0, 4, 5],
+        [24, 34, 9, 19, 0, 4], [14, 30, 20, 10]),
+    20211001: ([17, 6, 10, 15], [4, 26], [36, 15, 10, 4, 9, 33],
+               [4, 20, 9, 19, 10, 14], [29, 29, 29, 39])
+}
+
+
+@pytest.mark.parametrize('seed', list(LEGACY_DRAWS))
+def test_legacy_seed(seed):
+    """Test that the legacy seed path reproduces the baseline indices."""
+    labels = np.array([1, 0, 0, 0, 1, 0, 0, 0, 0, 1] * 4)
+    for drawn, expected in zip(_draw(labels, seed=seed), LEGACY_DRAWS[seed]):
+        assert np.array_equal(drawn, expected)
+
+
+@pytest.mark.parametrize('n_seeds', [1, 8])
+def test_parallel_rng(labels, n_seeds):
+    """Test that generators with own generators are thread-safe."""
+    children = np.random.SeedSequence(20211001).spawn(n_seeds)
+    serial = [_draw(labels, rng=np.random.default_rng(c)) for c in children]
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        parallel = list(executor.map(
+            lambda c: _draw(labels, rng=np.random.default_rng(c)), children))
+
+    for drawn_serial, drawn_parallel in zip(serial, parallel):
+        for drawn_1, drawn_2 in zip(drawn_serial, drawn_parallel):
+            assert np.array_equal(drawn_1, drawn_2)
+
+    # seed sequences are accepted as well
+    _, drawn = binary_label_shuffling(np.copy(labels), noise_ratio=0.1,
+                                      rng=children[0])
+    assert np.array_equal(drawn, serial[0][0])
+
+
+@pytest.mark.parametrize('seeds', [[42], [1, 2, 3]])
+def test_nested_masks(labels, seeds):
+    """Test that nested masks are prefixes and match generator sizes."""
+    features = np.arange(len(labels))
+    noise_ratios = [0.01, 0.05, 0.1, 0.25]
+    gammas = [1.0, 0.75, 0.5, 0.1]
+    contaminations = [0.01, 0.05, 0.3, 0.5]
+
+    noise_masks = nested_label_shuffling(labels, noise_ratios, seeds)
+    rated_masks = nested_perc_rated(labels, gammas, seeds)
+    remove_masks, add_masks = nested_contamination_rate(
+        labels, contaminations, seeds)
+
+    for i, _ in enumerate(seeds):
+        for masks in (noise_masks, rated_masks, remove_masks, add_masks):
+            largest = max(range(len(masks.levels)),
+                          key=lambda j: masks.sizes[i, j])
+            for j, _ in enumerate(masks.levels):
+                mask = masks.mask(i, j)
+                assert np.array_equal(mask,
+                                      masks.mask(i, largest)[:len(mask)])
+
+        for j, noise_ratio in enumerate(noise_ratios):
+            _, shuffled_idx = binary_label_shuffling(
+                np.copy(labels), noise_ratio=noise_ratio, seed=0)
+            assert len(noise_masks.mask(i, j)) == len(shuffled_idx)
+            assert len(np.unique(noise_masks.mask(i, j))) == len(shuffled_idx)
+
+        for j, gamma in enumerate(gammas):
+            _, _, _, unlabel_idx = set_perc_rated(
+                features, labels, features, gamma=gamma, seed=0)
+            expected = 0 if unlabel_idx is None else len(unlabel_idx)
+            assert len(rated_masks.mask(i, j)) == expected
+            assert all(labels[rated_masks.mask(i, j)] == 1)
+
+        for j, contamination in enumerate(contaminations):
+            _, nested_labels, _, _, _ = set_contamination_rate(
+                features, labels, features,
+                remove_idx=remove_masks.mask(i, j),
+                add_idx=add_masks.mask(i, j))
+            _, expected_labels, _, _, _ = set_contamination_rate(
+                features, labels, features,
+                contamination=contamination, seed=0)
+            assert len(nested_labels) == len(expected_labels)
+            assert nested_labels.sum() == expected_labels.sum()
+
+
+@pytest.mark.parametrize('seeds', [[42], [1, 2, 3]])
+def test_nested_badchannel_masks(labels, seeds):
+    """Test that nested badchannel masks match the generator."""
+    noise_ratios = [0.05, 0.1, 0.5]
+    bad_masks, normal_masks = nested_badchannel_label_shuffling(
+        labels, noise_ratios, seeds)
+
+    for i, _ in enumerate(seeds):
+        for j, noise_ratio in enumerate(noise_ratios):
+            shuffled_idx = np.concatenate((bad_masks.mask(i, j),
+                                           normal_masks.mask(i, j)))
+            _, expected_idx = preserving_badchannel_label_shuffling(
+                np.copy(labels), noise_ratio=noise_ratio, seed=0)
+            shuffled, _ = preserving_badchannel_label_shuffling(
+                np.copy(labels), shuffled_idx=shuffled_idx)
+
+            assert len(shuffled_idx) == len(expected_idx)
+            assert all(labels[bad_masks.mask(i, j)] == 1)
+            assert all(labels[normal_masks.mask(i, j)] == 0)
+            assert shuffled.sum() == labels.sum()
+
+
+def test_nested_masks_storage():
+    """Test that only the used prefix of each seed is stored."""
+    sizes = np.array([[2, 5], [0, 0], [3, 1]])
+    masks = _nested_masks(np.arange(100), sizes, [0.1, 0.2], [1, 2, 3])
+
+    assert np.array_equal(masks.indptr, [0, 5, 5, 8])
+    assert len(masks.indices) == 8
+    assert len(masks.mask(1, 1)) == 0
+    assert np.array_equal(masks.mask(2, 1), masks.mask(2, 0)[:1])
+
+
+@pytest.mark.parametrize('contamination', [0.05, 0.2, 0.4])
+@pytest.mark.parametrize('container', ['ndarray', 'series', 'frame', 'index'])
+def test_contamination_selection(labels, contamination, container):
+    """Test that the row selection matches the rebuilt data."""
+    index = pd.Index(np.arange(len(labels)) * 2)
+    values = np.arange(len(labels)) * 10
+    data = {
+        'ndarray': values,
+        'series': pd.Series(values, index=index),
+        'frame': pd.DataFrame({'sci': values, 'flatline': -values},
+                              index=index),
+        'index': index
+    }[container]
+    label_series = pd.Series(labels, index=index)
+
+    (expected_data, expected_labels, expected_idx,
+     remove_idx, add_idx) = set_contamination_rate(
+        data, label_series, index, contamination=contamination, seed=42)
+    selection, remove_sel, add_sel = set_contamination_rate(
+        data, label_series, index, contamination=contamination, seed=42,
+        return_selection=True)
+
+    assert np.array_equal(np.asarray(take_rows(data, selection)),
+                          np.asarray(expected_data))
+    assert take_rows(label_series, selection).equals(expected_labels)
+    assert take_rows(index, selection).equals(expected_idx)
+    for drawn, drawn_sel in ((remove_idx, remove_sel), (add_idx, add_sel)):
+        assert (drawn is None) == (drawn_sel is None)
@@ -0,0 +1,56 @@
+"""
+Tests of the compiled score tables.
+"""
+
+# Author: Christian Gerloff <christian.gerloff@rwth-aachen.de>
+# License: see repository LICENSE file
+
+
+import pytest
+import numpy as np
+
+from detection.lookup_tables import compile_table, compile_model
+
+
+def _tail(x):
+    """Smooth two-sided tail score."""
+    return np.abs(np.tanh(3 * (x - 0.5)))
+
+
+def _logistic(x):
+    """Monotone one-sided tail score."""
+    return 1 / (1 + np.exp(-10 * (x - 1)))
+
+
+@pytest.mark.parametrize('tol, max_points', [(1e-3, 1024), (1e-6, 4096)])
+def test_compile_table(tol, max_points):
+    """Test that tables meet the tolerance within their size."""
+    grid, values, deviation = compile_table(_logistic, -1, 3,
+                                            max_points=max_points, tol=tol)
+    assert len(grid) <= max_points
+    assert np.all(np.diff(grid) > 0)
+    assert np.all(np.diff(values) >= 0)
+    assert deviation <= 2 * tol
+
+    x = np.random.default_rng(0).uniform(-1, 3, 10000)
+    assert np.abs(np.interp(x, grid, values) - _logistic(x)).max() <= deviation
+
+    # size bound wins over tolerance
+    grid, _, coarse = compile_table(_logistic, -1, 3, max_points=16,
+                                    tol=1e-9)
+    assert len(grid) == 16
+    assert coarse > deviation
+
+
+def test_compile_model():
+    """Test the compiled model against the exact scores."""
+    model, report = compile_model({'sci': _tail, 'flatline': _logistic},
+                                  {'sci': (0, 1), 'flatline': (-1, 3)},
+                                  weights={'sci': 2, 'flatline': 1},
+                                  tol=1e-5)
+    X = np.random.default_rng(1).uniform([0, -1], [1, 3], (5000, 2))
+    exact = (2 * _tail(X[:, 0]) + _logistic(X[:, 1])) / 3
+    bound = max(r['max_deviation'] for r in report.values())
+
+    assert np.abs(model.decision_function(X) - exact).max() <= bound
+    assert set(report) == {'sci', 'flatline'}
@@ -0,0 +1,71 @@
+"""
+Tests of the probe partitioned data layout.
+"""
+
+# Author: Christian Gerloff <christian.gerloff@rwth-aachen.de>
+# License: see repository LICENSE file
+
+
+import pytest
+import numpy as np
+import pandas as pd
+
+from utils import synthetic_features, read_features
+from utils import probe_index, write_partitions, load_partition
+from utils import map_partitions
+
+
+@pytest.fixture
+def data():
+    """Fixture to return a shuffled synthetic feature table."""
+    data = synthetic_features(2000, n_probes=7, seed=42)
+    data.index = data.index * 3 + 1
+    return data.sample(frac=1, random_state=0)
+
+
+def test_probe_index(data):
+    """Test that the vectorized index matches groupby apply."""
+    expected = data.groupby('probe').apply(lambda x: x.index)
+    result = probe_index(data)
+
+    assert result.index.equals(expected.index)
+    for idx, expected_idx in zip(result, expected):
+        assert idx.equals(expected_idx)
+
+
+@pytest.mark.parametrize('n_jobs', [1, 2])
+def test_partitions(data, tmp_path, n_jobs):
+    """Test that partitions load the rows of their probe."""
+    index = write_partitions(data, tmp_path)
+    assert [p['value'] for p in index['partitions']] == list(range(7))
+    assert sum(p['n_rows'] for p in index['partitions']) == len(data)
+
+    probe = load_partition(tmp_path, np.int64(3))
+    pd.testing.assert_frame_equal(probe[data.columns],
+                                  data[data.probe == 3])
+    probe = load_partition(tmp_path, 3, columns=['probe', 'sci'])
+    assert list(probe.columns) == ['probe', 'sci']
+    with pytest.raises(KeyError):
+        load_partition(tmp_path, 99)
+
+    counts = map_partitions(len, tmp_path, n_jobs=n_jobs)
+    assert counts == data.probe.value_counts().to_dict()
+
+    # the partitioned directory is readable with pushdown
+    pushed = read_features(tmp_path, ['sci', 'probe'], probes=[2])
+    assert len(pushed) == (data.probe == 2).sum()
+
+
+def test_escaped_partitions(tmp_path):
+    """Test that values with path characters stay single partitions."""
+    values = ['S1-D1', 'a/b', 'x=y', 'with space', '50%']
+    data = pd.DataFrame({'probe': np.repeat(values, 3),
+                         'sci': np.arange(15.0)})
+    write_partitions(data, tmp_path)
+
+    assert len(list(tmp_path.glob('*/part-0.parquet'))) == len(values)
+    for value in values:
+        partition = load_partition(tmp_path, value)
+        assert partition.sci.tolist() == data.sci[data.probe == value].tolist()
+    pushed = read_features(tmp_path, ['probe'], probes=['a/b', '50%'])
+    assert sorted(pushed.probe) == ['50%'] * 3 + ['a/b'] * 3
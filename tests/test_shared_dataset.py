@@ -0,0 +1,101 @@
+"""
+Tests of the shared memory feature table.
+"""
+
+# Author: Christian Gerloff <christian.gerloff@rwth-aachen.de>
+# License: see repository LICENSE file
+
+
+import pickle
+import pytest
+import numpy as np
+import pandas as pd
+
+from utils import SharedDataset, map_splits, synthetic_features
+from utils import apply_dtype_policy
+
+
+def _label_sum(frame: pd.DataFrame) -> float:
+    return float(frame.labels.sum()), float(frame.sci.sum())
+
+
+@pytest.fixture
+def data():
+    """Fixture to return a synthetic feature table."""
+    return synthetic_features(2000, n_probes=5, seed=5)
+
+
+@pytest.fixture
+def shared(data):
+    """Fixture to return the feature table in shared memory."""
+    with SharedDataset.create(data) as dataset:
+        yield dataset
+
+
+def test_roundtrip(data, shared):
+    """Test that all rows and dtypes are restored."""
+    frame = shared.take()
+    pd.testing.assert_frame_equal(frame, data)
+    assert np.shares_memory(frame.sci.to_numpy(), shared.column('sci'))
+    assert not shared.column('sci').flags.writeable
+    del frame
+
+    compact = apply_dtype_policy(data)
+    with SharedDataset.create(compact) as dataset:
+        pd.testing.assert_frame_equal(dataset.take(), compact)
+
+
+def test_take(data, shared):
+    """Test selected rows and columns of split positions."""
+    positions = np.random.default_rng(0).choice(len(data), 100,
+                                                replace=False)
+    frame = shared.take(positions, ['sci', 'augmentation'])
+    pd.testing.assert_frame_equal(
+        frame, data.iloc[positions][['sci', 'augmentation']])
+
+
+def test_missing_strings():
+    """Test that missing values of string columns are kept."""
+    data = pd.DataFrame({'augmentation': ['None', None, 'AAFT']})
+    with SharedDataset.create(data) as dataset:
+        assert dataset.take().augmentation.isna().tolist() == [
+            False, True, False]
+
+
+def test_pickle(shared):
+    """Test that handles pickle to the name of the block only."""
+    buffer = pickle.dumps(shared)
+    assert len(buffer) < 200
+
+    attached = pickle.loads(buffer)
+    assert attached.name == shared.name
+    assert np.array_equal(attached.column('sci'), shared.column('sci'))
+    with pytest.raises(RuntimeError):
+        attached.unlink()
+    attached.close()
+
+
+def test_map_splits(data, shared):
+    """Test that worker processes match the serial results."""
+    rng = np.random.default_rng(1)
+    splits = [rng.choice(len(data), 500, replace=False) for _ in range(4)]
+    expected = [_label_sum(data.iloc[positions]) for positions in splits]
+
+    assert map_splits(_label_sum, shared, splits) == expected
+    assert map_splits(_label_sum, shared, splits, n_jobs=2) == expected
+
+
+
+def test_unlink_with_views(data):
+    """Test that views of the block outlive the handle."""
+    with SharedDataset.create(data) as dataset:
+        frame = dataset.take()
+        sci = dataset.column('sci')
+    pd.testing.assert_frame_equal(frame, data)
+    assert np.array_equal(sci, data.sci)
+
+    # unlinking and closing again is a no-op
+    dataset.unlink()
+    dataset.close()
+    with pytest.raises(ValueError):
+        dataset.column('sci')
@@ -0,0 +1,73 @@
+"""
+Tests of the quantile sketches.
+"""
+
+# Author: Christian Gerloff <christian.gerloff@rwth-aachen.de>
+# License: see repository LICENSE file
+
+
+import pytest
+import numpy as np
+
+from detection import QuantileSketch, fit_sketches
+from utils import write_synthetic_features, iter_features
+
+FEATURES = ['diff_cov', 'hr_freq_od_wave1', 'hr_power_od_wave1',
+            'flatline', 'sci']
+
+
+def _rank_error(values, sketch):
+    """Maximum normalized rank error of the sketch quantiles."""
+    q = np.linspace(0, 1, 101)
+    ranks = np.searchsorted(np.sort(values), sketch.quantile(q),
+                            side='right') / len(values)
+    return np.abs(ranks - q).max()
+
+
+@pytest.mark.parametrize('eps', [0.05, 0.01])
+def test_quantile_sketch(eps):
+    """Test rank error, memory and merging of sketches."""
+    values = np.random.default_rng(0).lognormal(size=200000)
+    chunks = np.array_split(values, 13)
+
+    sketch = QuantileSketch.from_error(eps, seed=1)
+    for chunk in chunks:
+        sketch.update(chunk)
+    merged = QuantileSketch.from_error(eps, seed=2)
+    for chunk in chunks[:6]:
+        merged.update(chunk)
+    other = QuantileSketch.from_error(eps, seed=3)
+    for chunk in chunks[6:]:
+        other.update(chunk)
+    merged.merge(other)
+
+    for s in (sketch, merged):
+        assert s.count == len(values)
+        assert s.size < 4 * s.k
+        assert _rank_error(values, s) <= eps
+        assert np.abs(s.cdf(np.median(values)) - 0.5) <= eps
+
+
+@pytest.mark.parametrize('seed', range(8))
+def test_quantile_sketch_seeds(seed):
+    """Test the rank error over seeds with small chunks."""
+    values = np.random.default_rng(seed).normal(size=300000)
+    sketch = QuantileSketch.from_error(0.01, seed=seed)
+    for chunk in np.array_split(values, 1000):
+        sketch.update(chunk)
+
+    assert _rank_error(values, sketch) <= 0.01
+
+
+def test_fit_sketches(tmp_path):
+    """Test sketches streamed from a parquet feature table."""
+    source = write_synthetic_features(tmp_path / 'features.parquet', 20000,
+                                      batch_size=5000, seed=4)
+    sketches = fit_sketches(iter_features(source, FEATURES, batch_size=3000),
+                            FEATURES, eps=0.02, seed=5)
+    data = iter_features(source, FEATURES, batch_size=10**6)
+    data = next(data)
+
+    for feature, sketch in zip(FEATURES, sketches.sketches):
+        assert _rank_error(data[feature].to_numpy(), sketch) <= 0.02
+    assert sketches.cdf(data.iloc[:10]).shape == (10, len(FEATURES))
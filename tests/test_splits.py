@@ -0,0 +1,120 @@
+"""
+Tests of indexed splits.
+"""
+
+# Author: Christian Gerloff <christian.gerloff@rwth-aachen.de>
+# License: see repository LICENSE file
+
+
+import pickle
+import pytest
+import numpy as np
+import pandas as pd
+
+from utils.python.splits import IndexedSplits
+from utils.python.annotations import annotate_batch
+
+
+@pytest.fixture
+def features():
+    """Fixture to return a list of feature names."""
+    return ['sci', 'flatline']
+
+
+@pytest.fixture
+def data():
+    """Fixture to return a small feature frame."""
+    rng = np.random.default_rng(7)
+    return pd.DataFrame({
+        'signal_id': np.arange(30),
+        'sci': rng.random(30),
+        'flatline': rng.random(30),
+        'labels': rng.integers(0, 2, 30)
+    }, index=np.arange(30) * 3)
+
+
+def _samples(data, features, seed):
+    """Splits shaped like subsampling including generator effects."""
+    rng = np.random.default_rng(seed)
+    order = rng.permutation(len(data))
+    # repeated rows as added by set_contamination_rate
+    train = data.iloc[np.concatenate((order[:15], order[:3]))]
+    test = data.iloc[order[15:]]
+    labels_train = train['labels'].copy()
+    # flipped labels as by the label shuffling generators
+    labels_train.iloc[[0, 4]] = 1 - labels_train.iloc[[0, 4]]
+    return (train[features], test[features],
+            labels_train, test['labels'],
+            train.index, test.index,
+            None, None, None, None, None, None)
+
+
+@pytest.mark.parametrize('seeds', [[1], [3, 5, 8]])
+def test_materialize(data, features, seeds):
+    """Test that indexed splits restore the sampled frames."""
+    splits = IndexedSplits(data)
+    expected = []
+    for seed in seeds:
+        samples = _samples(data, features, seed)
+        splits.append(seed, samples, validate=True)
+        expected.append((seed, samples))
+
+    assert len(splits) == len(seeds)
+    for (seed, split), (exp_seed, exp_split) in zip(splits, expected):
+        assert seed == exp_seed
+        pd.testing.assert_frame_equal(split[0], exp_split[0])
+        pd.testing.assert_series_equal(split[2], exp_split[2],
+                                       check_dtype=False)
+        assert split[4].equals(exp_split[4])
+        assert split[6] is None
+
+
+def test_pickle_excludes_data(data, features):
+    """Test that stored splits do not contain the shared data."""
+    splits = IndexedSplits(data)
+    splits.append(1, _samples(data, features, 1))
+    restored = pickle.loads(pickle.dumps(splits))
+
+    assert restored.data is None
+    with pytest.raises(ValueError, match='bind'):
+        restored.get(0, 'train')
+
+    restored.bind(data)
+    pd.testing.assert_frame_equal(restored[0][1][1],
+                                  splits[0][1][1])
+
+
+def test_merge_subset(data, features):
+    """Test that splits of a subset are rebased onto the full data."""
+    subset = data.iloc[::2]
+    subset_splits = IndexedSplits(subset)
+    subset_splits.append(3, _samples(subset, features, 3))
+
+    splits = IndexedSplits(data)
+    splits.merge(subset_splits, data.index.get_indexer(subset.index))
+
+    assert splits.seeds == [3]
+    pd.testing.assert_frame_equal(splits[0][1][0],
+                                  subset_splits[0][1][0])
+    pd.testing.assert_series_equal(splits[0][1][2],
+                                   subset_splits[0][1][2])
+
+
+@pytest.mark.parametrize('annotations', [['labels'], ['labels', 'sci']])
+def test_annotate_batch(data, features, annotations):
+    """Test that indexed and tuple splits yield the same annotations."""
+    datasets = [(seed, _samples(data, features, seed)) for seed in (1, 2)]
+    splits = IndexedSplits(data)
+    for seed, samples in datasets:
+        splits.append(seed, samples)
+
+    for (seed, annotated), (_, indexed), (_, samples) in zip(
+            annotate_batch(data, datasets, annotations),
+            annotate_batch(data, splits, annotations), datasets):
+        train, test, aug_train, aug_test = annotated
+        pd.testing.assert_frame_equal(train, data.loc[samples[4],
+                                                      annotations])
+        pd.testing.assert_frame_equal(test, data.loc[samples[5],
+                                                     annotations])
+        pd.testing.assert_frame_equal(indexed[0], train)
+        assert aug_train is None and aug_test is None
@@ -0,0 +1,65 @@
+"""
+Tests of the mergeable feature statistics.
+"""
+
+# Author: Christian Gerloff <christian.gerloff@rwth-aachen.de>
+# License: see repository LICENSE file
+
+
+import pytest
+import numpy as np
+
+from detection.streaming_stats import FeatureMoments, ClassMoments
+from utils import synthetic_features
+
+FEATURES = ['diff_cov', 'hr_freq_od_wave1', 'hr_power_od_wave1',
+            'flatline', 'sci']
+
+
+@pytest.fixture
+def data():
+    """Fixture to return features with missing values and labels."""
+    data = synthetic_features(5000, augmentations=(), seed=11)
+    X = data[FEATURES].to_numpy(copy=True)
+    X[::97, 1] = np.nan
+    return X, data.labels.to_numpy()
+
+
+@pytest.mark.parametrize('n_chunks', [1, 7, 50])
+def test_feature_moments(data, n_chunks):
+    """Test that incremental and merged fits match the batch fit."""
+    X, _ = data
+    incremental = FeatureMoments(len(FEATURES))
+    for chunk in np.array_split(X, n_chunks):
+        incremental.partial_fit(chunk)
+
+    halves = np.array_split(X, 2)
+    merged = FeatureMoments(len(FEATURES)).partial_fit(halves[0]).merge(
+        FeatureMoments(len(FEATURES)).partial_fit(halves[1]))
+
+    for moments in (incremental, merged):
+        assert np.array_equal(moments.count, np.sum(~np.isnan(X), axis=0))
+        assert np.allclose(moments.mean, np.nanmean(X, axis=0),
+                           rtol=1e-12, atol=0)
+        assert np.allclose(moments.var, np.nanvar(X, axis=0, ddof=1),
+                           rtol=1e-10, atol=0)
+        assert np.array_equal(moments.minimum, np.nanmin(X, axis=0))
+        assert np.array_equal(moments.maximum, np.nanmax(X, axis=0))
+
+
+def test_class_moments(data):
+    """Test per-label statistics with unlabelled rows."""
+    X, labels = data
+    y = labels.astype(float)
+    y[::3] = np.nan
+
+    moments = ClassMoments(len(FEATURES))
+    for X_chunk, y_chunk in zip(np.array_split(X, 4), np.array_split(y, 4)):
+        moments.partial_fit(X_chunk, y_chunk)
+    moments.merge(ClassMoments(len(FEATURES)).partial_fit(X[:10]))
+
+    assert moments.overall.count[0] == len(X) + 10
+    for label in (0, 1):
+        assert moments.classes[label].count[0] == np.sum(y == label)
+        assert np.allclose(moments.classes[label].mean,
+                           np.nanmean(X[y == label], axis=0))
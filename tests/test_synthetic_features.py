@@ -0,0 +1,48 @@
+"""
+Tests of the synthetic feature tables.
+"""
+
+# Author: Christian Gerloff <christian.gerloff@rwth-aachen.de>
+# License: see repository LICENSE file
+
+
+import pytest
+import pandas as pd
+import pyarrow.parquet as pq
+
+from utils.python.synthetic_features import FEATURES
+from utils import synthetic_features, write_synthetic_features
+
+
+@pytest.mark.parametrize('contamination, n_probes', [(0.1, 10), (0.4, 1)])
+def test_synthetic_features(contamination, n_probes):
+    """Test schema, pairing and contamination of the table."""
+    data = synthetic_features(20000, n_probes=n_probes,
+                              contamination=contamination,
+                              batch_size=3000, seed=42)
+
+    assert list(data.columns) == (['signal_id', 'probe', 'augmentation',
+                                   'labels'] + FEATURES)
+    assert not data.isnull().values.any()
+    assert len(data) == 40000
+    assert data.probe.nunique() == n_probes
+
+    # originals and augmentations are paired by signal_id
+    original = data[data.augmentation == 'None'].set_index('signal_id')
+    augmented = data[data.augmentation == 'AAFT'].set_index('signal_id')
+    assert original.index.is_unique and augmented.index.is_unique
+    assert original.index.sort_values().equals(augmented.index.sort_values())
+    assert original.labels.equals(augmented.labels.loc[original.index])
+    assert original.probe.equals(augmented.probe.loc[original.index])
+    assert original.labels.mean() == pytest.approx(contamination, abs=0.02)
+
+
+def test_write_synthetic_features(tmp_path):
+    """Test that streamed row groups match the in-memory table."""
+    filename = write_synthetic_features(tmp_path / 'features.parquet', 10000,
+                                        batch_size=4000, seed=7)
+
+    assert pq.ParquetFile(filename).num_row_groups == 3
+    pd.testing.assert_frame_equal(
+        pd.read_parquet(filename),
+        synthetic_features(10000, batch_size=4000, seed=7))
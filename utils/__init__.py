@@ -3,14 +3,73 @@ The :mod:`utils` module to
 access the detectors
 """
 
-from .python.ml_logging import log_metric_array, log_metrics_dataframe
-from .python.ml_logging import fetch_artifacts
-from .python.detector_tuples import get_detectors, get_baseline_detectors
+import importlib
+
+# public names resolved on first access to keep heavy backends
+# out of stages that do not use them
+_LAZY_ATTRS = {
+    'log_metric_array': '.python.ml_logging',
+    'log_metrics_dataframe': '.python.ml_logging',
+    'fetch_artifacts': '.python.ml_logging',
+    'get_detectors': '.python.detector_tuples',
+    'get_baseline_detectors': '.python.detector_tuples',
+    'RunIndex': '.python.run_index',
+    'run_fingerprint': '.python.run_index',
+    'FINGERPRINT_TAG': '.python.run_index',
+    'dump_artifact': '.python.artifacts',
+    'load_artifact': '.python.artifacts',
+    'dump_columnar': '.python.artifacts',
+    'load_columnar': '.python.artifacts',
+    'IndexedSplits': '.python.splits',
+    'synthetic_features': '.python.synthetic_features',
+    'write_synthetic_features': '.python.synthetic_features',
+    'read_features': '.python.feature_reader',
+    'iter_features': '.python.feature_reader',
+    'probe_index': '.python.partitions',
+    'write_partitions': '.python.partitions',
+    'load_partition': '.python.partitions',
+    'map_partitions': '.python.partitions',
+    'apply_dtype_policy': '.python.dtype_policy',
+    'SharedDataset': '.python.shared_dataset',
+    'map_splits': '.python.shared_dataset'
+}
 
 __all__ = [
     'log_metric_array',
     'log_metrics_dataframe',
     'fetch_artifacts',
     'get_detectors',
-    'get_baseline_detectors'
+    'get_baseline_detectors',
+    'RunIndex',
+    'run_fingerprint',
+    'FINGERPRINT_TAG',
+    'dump_artifact',
+    'load_artifact',
+    'dump_columnar',
+    'load_columnar',
+    'IndexedSplits',
+    'synthetic_features',
+    'write_synthetic_features',
+    'read_features',
+    'iter_features',
+    'probe_index',
+    'write_partitions',
+    'load_partition',
+    'map_partitions',
+    'apply_dtype_policy',
+    'SharedDataset',
+    'map_splits'
 ]
+
+
+def __getattr__(name: str):
+    if name in _LAZY_ATTRS:
+        module = importlib.import_module(_LAZY_ATTRS[name], __name__)
+        value = getattr(module, name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
@@ -0,0 +1,121 @@
+"""Annotation of sampled splits with columns of the shared data."""
+
+# Author: Christian Gerloff <christian.gerloff@rwth-aachen.de>
+# License: see repository LICENSE file
+
+
+import logging
+import numpy as np
+import pandas as pd
+
+from .splits import IndexedSplits, SPLIT_FIELDS, SPLITS
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# position of the split indices in the output of subsampling
+SPLIT_IDX = {split: SPLIT_FIELDS.index(f'idx_{split}') for split in SPLITS}
+
+
+def split_positions(data: pd.DataFrame,
+                    datasets: list,
+                    split: str) -> list:
+    """Positions of a split in data for all seeds.
+
+    Args:
+        data (pd.DataFrame): data the splits refer to.
+        datasets (list): sampled data of all seeds.
+        split (str): name of the split.
+
+    Returns:
+        list: positions per seed, None if the split is not sampled.
+    """
+    if isinstance(datasets, IndexedSplits) and datasets.data is data:
+        return [positions[split] for positions in datasets.positions]
+
+    idx = [samples[SPLIT_IDX[split]] for _, samples in datasets]
+    sampled = [i for i in idx if i is not None]
+    if len(sampled) == 0:
+        return idx
+
+    # single hash lookup for the indices of all seeds
+    positions = data.index.get_indexer(np.concatenate(sampled))
+    if (positions < 0).any():
+        raise KeyError(f'{split} indices are not present in data')
+    positions = iter(np.split(positions,
+                              np.cumsum([len(i) for i in sampled])[:-1]))
+    return [next(positions) if i is not None else None for i in idx]
+
+
+def annotate_batch(data: pd.DataFrame,
+                   datasets: list,
+                   annotation_names: list) -> list:
+    """Annotate samples of all seeds.
+
+    Annotations of all seeds are taken at once per split from a dense
+    annotation matrix. The frames of each seed are views of the result.
+
+    Args:
+        data (pd.DataFrame): data to annotate.
+        datasets (list): sampled data of all seeds.
+        annotation_names (list): names of the annotation columns.
+
+    Returns:
+        list: seed and annotated samples per seed.
+    """
+    if not data.index.is_unique:
+        raise ValueError('Annotation requires a unique data index')
+
+    annotations = data[annotation_names]
+    if annotations.dtypes.nunique() == 1:
+        matrix = annotations.to_numpy()
+
+        def _take(positions):
+            return np.take(matrix, positions, axis=0)
+
+        def _frame(values, index):
+            return pd.DataFrame(values, index=index,
+                                columns=annotation_names, copy=False)
+    else:
+        # keep column dtypes of mixed annotations
+        columns = [annotations[c].to_numpy() for c in annotation_names]
+
+        def _take(positions):
+            return [np.take(c, positions) for c in columns]
+
+        def _frame(values, index):
+            return pd.DataFrame(dict(zip(annotation_names, values)),
+                                index=index, copy=False)
+
+    annotated = {}
+    for split in SPLIT_IDX:
+        positions = split_positions(data, datasets, split)
+        sampled = [p for p in positions if p is not None]
+        if len(sampled) == 0:
+            annotated[split] = [None] * len(positions)
+            continue
+        stacked = _take(np.concatenate(sampled))
+        offsets = np.cumsum([len(p) for p in sampled])[:-1]
+        if isinstance(stacked, list):
+            views = iter(zip(*[np.split(c, offsets) for c in stacked]))
+        else:
+            views = iter(np.split(stacked, offsets))
+        annotated[split] = [
+            _frame(next(views), data.index[p]) if p is not None else None
+            for p in positions
+        ]
+
+    seeds = [seed for seed, _ in datasets]
+    annotations = []
+    for i, seed in enumerate(seeds):
+        train, test, aug_train, aug_test = (
+            annotated[split][i] for split in SPLIT_IDX)
+
+        # sanity check does augmentation correcpond to annotation if not None
+        if (aug_train is not None and
+           aug_train.shape[0] == train.shape[0]):
+            if not np.array_equal(aug_train, train):
+                logger.warning('Augmented training data does not match training data')
+
+        annotations.append((seed, (train, test, aug_train, aug_test)))
+    return annotations
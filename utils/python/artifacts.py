@@ -0,0 +1,192 @@
+"""Reads and writes stage artifacts as joblib or columnar layout."""
+
+# Author: Christian Gerloff <christian.gerloff@rwth-aachen.de>
+# License: see repository LICENSE file
+
+
+import json
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from pathlib import Path
+from joblib import dump, load
+from pyarrow import feather
+
+MANIFEST = 'manifest.json'
+ARTIFACT_FORMATS = ('joblib', 'columnar')
+
+
+class _ColumnarWriter:
+    """Writes a nested value into files referenced by a manifest.
+
+    Args:
+        path (Path): directory of the artifact.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.n_files = 0
+
+    def _file(self, suffix: str) -> str:
+        filename = f'{self.n_files:06d}{suffix}'
+        self.n_files += 1
+        return filename
+
+    def write(self, value) -> dict:
+        """Writes a value and returns its manifest node."""
+        if value is None:
+            return {'type': 'none'}
+        if isinstance(value, (list, tuple)):
+            return {'type': type(value).__name__,
+                    'items': [self.write(item) for item in value]}
+        if isinstance(value, pd.DataFrame):
+            filename = self._file('.arrow')
+            table = pa.Table.from_pandas(value, preserve_index=True)
+            feather.write_feather(table, self.path / filename,
+                                  compression='uncompressed')
+            return {'type': 'frame', 'file': filename}
+        if isinstance(value, pd.Series):
+            node = self.write(value.to_frame(name='values'))
+            node.update({'type': 'series', 'name': value.name})
+            return node
+        if (isinstance(value, (np.ndarray, pd.Index)) and
+           not isinstance(value, pd.MultiIndex) and
+           value.dtype.kind in 'biuf'):
+            filename = self._file('.npy')
+            np.save(self.path / filename, np.asarray(value),
+                    allow_pickle=False)
+            return {'type': 'index' if isinstance(value, pd.Index)
+                    else 'array',
+                    'name': getattr(value, 'name', None),
+                    'file': filename}
+        if isinstance(value, (np.generic, int, float, str, bool)):
+            return {'type': 'scalar',
+                    'dtype': np.asarray(value).dtype.str,
+                    'value': np.asarray(value).item()}
+        filename = self._file('.joblib')
+        dump(value, self.path / filename)
+        return {'type': 'pickle', 'file': filename}
+
+
+def dump_columnar(value, path: str):
+    """Dumps a value as columnar artifact.
+
+    Frames are stored as uncompressed Arrow IPC files and numeric
+    arrays or indices as `.npy` files. Lists, tuples and scalars are
+    recorded in the manifest, any other value is stored with joblib.
+
+    Args:
+        value: value to dump.
+        path (str): directory of the artifact.
+    """
+    path = Path(path)
+    path.mkdir(parents=True, exist_ok=True)
+    writer = _ColumnarWriter(path)
+    manifest = {'version': 1, 'root': writer.write(value)}
+    (path / MANIFEST).write_text(json.dumps(manifest), encoding='UTF-8')
+
+
+def _read_frame(filename: Path, columns: list, mmap: bool) -> pd.DataFrame:
+    """Reads a frame with column projection."""
+    if columns is not None:
+        schema = feather.read_table(filename, memory_map=True).schema
+        index_columns = [
+            c for c in schema.pandas_metadata.get('index_columns', [])
+            if isinstance(c, str)
+        ]
+        columns = [c for c in columns if c in schema.names] + index_columns
+    table = feather.read_table(filename, columns=columns, memory_map=mmap)
+    return table.to_pandas(split_blocks=True)
+
+
+def _read_node(node: dict, path: Path, columns: list, mmap: bool):
+    """Reads a value from its manifest node."""
+    node_type = node['type']
+    if node_type == 'none':
+        return None
+    if node_type in ('list', 'tuple'):
+        items = [_read_node(item, path, columns, mmap)
+                 for item in node['items']]
+        return tuple(items) if node_type == 'tuple' else items
+    if node_type == 'frame':
+        return _read_frame(path / node['file'], columns, mmap)
+    if node_type == 'series':
+        frame = _read_frame(path / node['file'], None, mmap)
+        return frame['values'].rename(node['name'])
+    if node_type in ('array', 'index'):
+        array = np.load(path / node['file'],
+                        mmap_mode='r' if mmap else None,
+                        allow_pickle=False)
+        if node_type == 'index':
+            return pd.Index(array, name=node['name'], copy=False)
+        return array
+    if node_type == 'scalar':
+        return np.dtype(node['dtype']).type(node['value'])
+    if node_type == 'pickle':
+        return load(path / node['file'])
+    raise ValueError(f'Unknown artifact node type {node_type}.')
+
+
+def load_columnar(path: str, columns: list = None, mmap: bool = True):
+    """Loads a columnar artifact.
+
+    Args:
+        path (str): directory of the artifact.
+        columns (list, optional): columns to load from frames. Frames are
+            projected to the requested columns they contain.
+            Defaults to None (all columns).
+        mmap (bool, optional): memory map frames and arrays.
+            Defaults to True.
+
+    Returns:
+        the loaded value.
+    """
+    path = Path(path)
+    manifest = json.loads((path / MANIFEST).read_text(encoding='UTF-8'))
+    return _read_node(manifest['root'], path, columns, mmap)
+
+
+def dump_artifact(value,
+                  output_path: str,
+                  name: str,
+                  artifact_format: str = 'joblib'):
+    """Dumps a stage artifact in the requested format.
+
+    Args:
+        value: value to dump.
+        output_path (str): directory of the stage artifacts.
+        name (str): name of the artifact.
+        artifact_format (str, optional): 'joblib' or 'columnar'.
+            Defaults to 'joblib'.
+    """
+    if artifact_format not in ARTIFACT_FORMATS:
+        raise ValueError(f'{artifact_format} is not a supported '
+                         'artifact format.')
+    if artifact_format == 'columnar':
+        dump_columnar(value, Path(output_path) / name)
+    else:
+        dump(value, Path(output_path) / f'{name}.joblib', compress=3)
+
+
+def load_artifact(output_path: str,
+                  name: str,
+                  columns: list = None,
+                  mmap: bool = True):
+    """Loads a stage artifact independent of its format.
+
+    Args:
+        output_path (str): directory of the stage artifacts.
+        name (str): name of the artifact.
+        columns (list, optional): columns to load from frames of
+            columnar artifacts. Defaults to None (all columns).
+        mmap (bool, optional): memory map columnar artifacts.
+            Defaults to True.
+
+    Returns:
+        the loaded value.
+    """
+    path = Path(output_path) / name
+    if (path / MANIFEST).exists():
+        return load_columnar(path, columns, mmap)
+    return load(Path(output_path) / f'{name}.joblib')
@@ -0,0 +1,121 @@
+"""Reduced-precision dtype policy of feature tables."""
+
+# Author: Christian Gerloff <christian.gerloff@rwth-aachen.de>
+# License: see repository LICENSE file
+
+
+import logging
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+DTYPE_POLICIES = ('float64', 'compact')
+
+# columns stored as categories with the compact policy
+CATEGORICAL_COLUMNS = ['augmentation', 'probe']
+
+# integer columns narrowed to int32 with the compact policy
+INDEX_COLUMNS = ['signal_id']
+
+
+def apply_dtype_policy(data: pd.DataFrame,
+                       policy: str = 'compact') -> pd.DataFrame:
+    """Casts a feature table to the dtypes of a policy.
+
+    The 'compact' policy stores float features as float32, augmentation
+    and probe as categories and signal_id as int32. Labels are kept.
+    The 'float64' policy returns the data unchanged.
+
+    Args:
+        data (pd.DataFrame): feature table.
+        policy (str, optional): 'float64' or 'compact'.
+            Defaults to 'compact'.
+
+    Returns:
+        pd.DataFrame: feature table with the dtypes of the policy.
+    """
+    if policy not in DTYPE_POLICIES:
+        raise ValueError(f'{policy} is not a supported dtype policy.')
+    if policy == 'float64':
+        return data
+
+    dtypes = {}
+    for column, dtype in data.dtypes.items():
+        if column in CATEGORICAL_COLUMNS:
+            dtypes[column] = 'category'
+        elif column in INDEX_COLUMNS and pd.api.types.is_integer_dtype(dtype):
+            values = data[column]
+            if (len(values) == 0 or
+               (values.min() >= np.iinfo(np.int32).min and
+                values.max() <= np.iinfo(np.int32).max)):
+                dtypes[column] = np.int32
+            else:
+                logger.warning(f'{column} exceeds int32 and is kept as {dtype}')
+        elif pd.api.types.is_float_dtype(dtype) and dtype != np.float32:
+            dtypes[column] = np.float32
+    return data.astype(dtypes)
+
+
+def arrow_schema(schema: pa.Schema, policy: str = 'compact') -> pa.Schema:
+    """Arrow schema of the dtypes of a policy to cast while reading.
+
+    Float features become float32 and the categorical columns are
+    dictionary encoded, so batches are narrowed before a frame of the
+    whole table exists. Index columns are narrowed by apply_dtype_policy
+    after loading, since their range is only known for the whole table.
+
+    Args:
+        schema (pa.Schema): schema of the feature table.
+        policy (str, optional): 'float64' or 'compact'.
+            Defaults to 'compact'.
+
+    Returns:
+        pa.Schema: schema with the dtypes of the policy.
+    """
+    if policy not in DTYPE_POLICIES:
+        raise ValueError(f'{policy} is not a supported dtype policy.')
+    if policy == 'float64':
+        return schema
+    fields = []
+    for f in schema:
+        if f.name in CATEGORICAL_COLUMNS and not pa.types.is_dictionary(f.type):
+            f = f.with_type(pa.dictionary(pa.int32(), f.type))
+        elif pa.types.is_float64(f.type):
+            f = f.with_type(pa.float32())
+        fields.append(f)
+    return pa.schema(fields, metadata=schema.metadata)
+
+
+def cast_table(table: pa.Table, schema: pa.Schema) -> pa.Table:
+    """Casts a table to a schema of arrow_schema.
+
+    Args:
+        table (pa.Table): batch of the feature table.
+        schema (pa.Schema): target schema.
+
+    Returns:
+        pa.Table: the cast batch.
+    """
+    columns = []
+    for f in schema:
+        column = table.column(f.name)
+        if (pa.types.is_dictionary(f.type) and
+           not pa.types.is_dictionary(column.type)):
+            column = column.dictionary_encode()
+        columns.append(column.cast(f.type))
+    return pa.Table.from_arrays(columns, schema=schema)
+
+
+def memory_usage(data: pd.DataFrame) -> int:
+    """Bytes of a frame including its index and object columns.
+
+    Args:
+        data (pd.DataFrame): frame.
+
+    Returns:
+        int: memory usage in bytes.
+    """
+    return int(data.memory_usage(index=True, deep=True).sum())
@@ -0,0 +1,189 @@
+"""Reads feature tables with column projection and row filter pushdown."""
+
+# Author: Christian Gerloff <christian.gerloff@rwth-aachen.de>
+# License: see repository LICENSE file
+
+
+import logging
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from pathlib import Path
+from typing import Iterator
+
+from .dtype_policy import arrow_schema, cast_table
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# supported row filters
+FILTERS = ('augmentation', 'probes', 'signal_ids')
+
+
+def check_filters(filters: dict) -> dict:
+    """Validates the names of row filters.
+
+    Args:
+        filters (dict): row filters, e.g. read_filters of a profile.
+
+    Returns:
+        dict: the filters.
+    """
+    unknown = sorted(set(filters) - set(FILTERS))
+    if unknown:
+        raise ValueError(f'Unsupported row filters {unknown}, '
+                         f'expected any of {list(FILTERS)}')
+    return filters
+
+
+def feature_filter(augmentation: list = None,
+                   probes: list = None,
+                   signal_ids: tuple = None) -> ds.Expression:
+    """Builds the row filter of a feature table.
+
+    Args:
+        augmentation (list, optional): augmentations to keep, e.g.
+            ['None'] for original signals only. Defaults to None (all).
+        probes (list, optional): probes to keep. Defaults to None (all).
+        signal_ids (tuple, optional): half-open range [start, stop) of
+            signal ids to keep. Defaults to None (all).
+
+    Returns:
+        ds.Expression: filter expression or None without filters.
+    """
+    conditions = []
+    if augmentation is not None:
+        conditions.append(ds.field('augmentation').isin(list(augmentation)))
+    if probes is not None:
+        conditions.append(ds.field('probe').isin(list(probes)))
+    if signal_ids is not None:
+        start, stop = signal_ids
+        if start is not None:
+            conditions.append(ds.field('signal_id') >= start)
+        if stop is not None:
+            conditions.append(ds.field('signal_id') < stop)
+    expression = None
+    for condition in conditions:
+        expression = condition if expression is None else expression & condition
+    return expression
+
+
+def _dataset(source: str) -> ds.Dataset:
+    """Parquet dataset of a file or a hive partitioned directory."""
+    return ds.dataset(source, format='parquet', partitioning='hive')
+
+
+def _stream(dataset: ds.Dataset,
+            columns: list,
+            filters: dict,
+            batch_size: int) -> Iterator[pa.RecordBatch]:
+    """Batches of a dataset decoded one row group at a time.
+
+    Without pre-buffering, readahead and threads, the scanner does not run
+    ahead of a slow consumer, so memory is bounded by a row group of the
+    source instead of growing with the table. Only staging trades the
+    threaded scan for this bound; readers keep the default scanner.
+    """
+    options = ds.ParquetFragmentScanOptions(pre_buffer=False)
+    return dataset.to_batches(
+        columns=columns, filter=feature_filter(**check_filters(filters)),
+        batch_size=batch_size, fragment_scan_options=options,
+        use_threads=False, batch_readahead=0, fragment_readahead=0)
+
+
+def feature_schema(source: str) -> pa.Schema:
+    """Schema of a parquet file or partitioned directory.
+
+    Args:
+        source (str): parquet file or partitioned directory.
+
+    Returns:
+        pa.Schema: schema including partition columns.
+    """
+    return _dataset(source).schema
+
+
+def read_features(source: str,
+                  columns: list = None,
+                  **filters) -> pd.DataFrame:
+    """Reads the projected and filtered rows of a feature table.
+
+    Only the requested columns are decoded and row groups are skipped
+    based on their statistics where possible.
+
+    Args:
+        source (str): parquet file or partitioned directory.
+        columns (list, optional): columns to read. Defaults to None (all).
+        **filters: row filters of feature_filter.
+
+    Returns:
+        pd.DataFrame: feature table.
+    """
+    table = _dataset(source).to_table(
+        columns=columns, filter=feature_filter(**check_filters(filters)))
+    return table.to_pandas()
+
+
+def iter_features(source: str,
+                  columns: list = None,
+                  batch_size: int = 1 << 20,
+                  **filters) -> Iterator[pd.DataFrame]:
+    """Iterates over the projected and filtered rows in batches.
+
+    Args:
+        source (str): parquet file or partitioned directory.
+        columns (list, optional): columns to read. Defaults to None (all).
+        batch_size (int, optional): maximum rows per batch.
+            Defaults to 1 << 20.
+        **filters: row filters of feature_filter.
+
+    Yields:
+        pd.DataFrame: batch of the feature table.
+    """
+    batches = _dataset(source).to_batches(
+        columns=columns, filter=feature_filter(**check_filters(filters)),
+        batch_size=batch_size)
+    for batch in batches:
+        if batch.num_rows > 0:
+            yield batch.to_pandas()
+
+
+def stage_features(source: str,
+                   filename: str,
+                   columns: list = None,
+                   batch_size: int = 1 << 20,
+                   dtype_policy: str = 'float64',
+                   **filters) -> Path:
+    """Streams the projected and filtered rows into a parquet file.
+
+    Memory is bounded by one batch, so a loader reading the staged file
+    only sees the rows and columns that are used. Batches are cast to
+    the dtypes of the policy before they are written.
+
+    Args:
+        source (str): parquet file or partitioned directory.
+        filename (str): parquet file to write.
+        columns (list, optional): columns to read. Defaults to None (all).
+        batch_size (int, optional): maximum rows per batch.
+            Defaults to 1 << 20.
+        dtype_policy (str, optional): dtypes of the staged file,
+            'float64' or 'compact'. Defaults to 'float64'.
+        **filters: row filters of feature_filter.
+
+    Returns:
+        Path: the written file.
+    """
+    dataset = _dataset(source)
+    schema = dataset.schema
+    if columns is not None:
+        schema = pa.schema([schema.field(c) for c in columns])
+    target = arrow_schema(schema, dtype_policy)
+    batches = _stream(dataset, columns, filters, batch_size)
+    with pq.ParquetWriter(filename, target) as writer:
+        for batch in batches:
+            if batch.num_rows > 0:
+                table = pa.Table.from_batches([batch], schema)
+                writer.write_table(cast_table(table, target))
+    return Path(filename)
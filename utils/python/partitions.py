@@ -0,0 +1,186 @@
+"""Writes and loads feature tables partitioned by probe."""
+
+# Author: Christian Gerloff <christian.gerloff@rwth-aachen.de>
+# License: see repository LICENSE file
+
+
+import json
+import logging
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from pathlib import Path
+from urllib.parse import quote
+from itertools import repeat
+from typing import Callable
+from concurrent.futures import ProcessPoolExecutor
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# underscore prefix keeps the index out of dataset discovery
+PARTITION_INDEX = '_partitions.json'
+
+
+def _segment(value) -> str:
+    """URI escaped path segment, as decoded by hive partitioning."""
+    return quote(str(value), safe='')
+
+
+def _group_positions(values: pd.Series) -> tuple:
+    """Sorted group keys and row positions per group.
+
+    Args:
+        values (pd.Series): group key of each row.
+
+    Returns:
+        tuple: group keys and list of positions per group.
+    """
+    codes, uniques = pd.factorize(values, sort=True)
+    valid = np.flatnonzero(codes >= 0)
+    order = valid[np.argsort(codes[valid], kind='stable')]
+    counts = np.bincount(codes[valid], minlength=len(uniques))
+    return uniques, np.split(order, np.cumsum(counts)[:-1])
+
+
+def probe_index(data: pd.DataFrame, column: str = 'probe') -> pd.Series:
+    """Index of the rows per probe.
+
+    Vectorized equivalent of data.groupby(column).apply(lambda x: x.index).
+
+    Args:
+        data (pd.DataFrame): data with a probe column.
+        column (str, optional): name of the probe column.
+            Defaults to 'probe'.
+
+    Returns:
+        pd.Series: data index per probe.
+    """
+    uniques, positions = _group_positions(data[column])
+    return pd.Series([data.index[p] for p in positions],
+                     index=pd.Index(uniques, name=column),
+                     dtype=object)
+
+
+def _value(value):
+    """JSON serializable partition value."""
+    return value.item() if isinstance(value, np.generic) else value
+
+
+def write_partitions(data: pd.DataFrame,
+                     path: str,
+                     column: str = 'probe') -> dict:
+    """Writes data hive-partitioned by a column.
+
+    Each partition is one parquet file in <column>=<value>/ with the
+    data index preserved. A partition index lists value, file and number
+    of rows of all partitions.
+
+    Args:
+        data (pd.DataFrame): data to partition.
+        path (str): directory of the partitioned data.
+        column (str, optional): partition column. Defaults to 'probe'.
+
+    Returns:
+        dict: partition index.
+    """
+    path = Path(path)
+    uniques, positions = _group_positions(data[column])
+    partitions = []
+    for value, p in zip(uniques, positions):
+        filename = (Path(f'{_segment(column)}={_segment(value)}') /
+                    'part-0.parquet')
+        (path / filename.parent).mkdir(parents=True, exist_ok=True)
+        table = pa.Table.from_pandas(
+            data.iloc[p].drop(columns=column), preserve_index=True)
+        pq.write_table(table, path / filename)
+        partitions.append({'value': _value(value),
+                           'file': str(filename),
+                           'n_rows': len(p)})
+
+    index = {'column': column,
+             'dtype': str(data[column].dtype),
+             'partitions': partitions}
+    (path / PARTITION_INDEX).write_text(json.dumps(index, indent=2),
+                                        encoding='UTF-8')
+    return index
+
+
+def read_partition_index(path: str) -> dict:
+    """Reads the partition index.
+
+    Args:
+        path (str): directory of the partitioned data.
+
+    Returns:
+        dict: partition index.
+    """
+    return json.loads((Path(path) / PARTITION_INDEX).read_text(encoding='UTF-8'))
+
+
+def load_partition(path: str, value, columns: list = None) -> pd.DataFrame:
+    """Loads the rows of a single partition.
+
+    Args:
+        path (str): directory of the partitioned data.
+        value: partition value, e.g. the probe.
+        columns (list, optional): columns to read. Defaults to None (all).
+
+    Returns:
+        pd.DataFrame: data of the partition with its original index.
+    """
+    index = read_partition_index(path)
+    partition = next((p for p in index['partitions']
+                      if p['value'] == _value(value)), None)
+    if partition is None:
+        raise KeyError(f'{index["column"]}={value} is not a partition')
+
+    column = index['column']
+    read_columns = None
+    if columns is not None:
+        read_columns = [c for c in columns if c != column]
+    data = pd.read_parquet(Path(path) / partition['file'],
+                           columns=read_columns)
+    if columns is None or column in columns:
+        data[column] = pd.Series(partition['value'], index=data.index,
+                                 dtype=index['dtype'])
+    return data[columns] if columns is not None else data
+
+
+def _apply_partition(value, func: Callable, path: str, columns: list):
+    """Applies a function to the data of a partition."""
+    return func(load_partition(path, value, columns))
+
+
+def map_partitions(func: Callable,
+                   path: str,
+                   values: list = None,
+                   columns: list = None,
+                   n_jobs: int = 1) -> dict:
+    """Applies a function to each partition.
+
+    Only one partition per process is loaded at a time.
+
+    Args:
+        func (Callable): picklable function applied to the data of a
+            partition.
+        path (str): directory of the partitioned data.
+        values (list, optional): partitions to process.
+            Defaults to None (all).
+        columns (list, optional): columns to read. Defaults to None (all).
+        n_jobs (int, optional): number of processes. Defaults to 1.
+
+    Returns:
+        dict: result per partition value.
+    """
+    if values is None:
+        values = [p['value'] for p in read_partition_index(path)['partitions']]
+    args = (values, repeat(func), repeat(path), repeat(columns))
+    if n_jobs > 1:
+        with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+            results = list(executor.map(_apply_partition, *args))
+    else:
+        results = list(map(_apply_partition, *args))
+    return dict(zip(values, results))
@@ -0,0 +1,249 @@
+"""Local index of pipeline runs to look up reusable stages."""
+
+# Author: Christian Gerloff <christian.gerloff@rwth-aachen.de>
+# License: see repository LICENSE file
+
+
+import os
+import json
+import yaml
+import time
+import sqlite3
+import hashlib
+import logging
+import mlflow
+
+from pathlib import Path
+from contextlib import closing
+from urllib.parse import urlparse
+from mlflow.utils import mlflow_tags
+from mlflow.entities import RunStatus
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+FINGERPRINT_TAG = 'nireject.fingerprint'
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id TEXT PRIMARY KEY,
+    experiment_id TEXT NOT NULL,
+    fingerprint TEXT NOT NULL,
+    entry_point TEXT,
+    user_name TEXT,
+    status TEXT,
+    start_time INTEGER
+);
+CREATE INDEX IF NOT EXISTS runs_lookup
+    ON runs (experiment_id, fingerprint, user_name, status);
+CREATE TABLE IF NOT EXISTS experiments (
+    experiment_id TEXT PRIMARY KEY,
+    rebuild_time REAL NOT NULL
+);
+"""
+
+
+def _config_digest(config_file: str, config_name: str) -> str:
+    """Hashes the content of a configuration section.
+
+    Args:
+        config_file (str): Path to the configuration file.
+        config_name (str): Name of the configuration section.
+
+    Returns:
+        str: sha256 digest of the configuration section.
+    """
+    all_configs = yaml.safe_load(Path(config_file).read_text(encoding='UTF-8'))
+    section = all_configs.get(config_name)
+    payload = json.dumps(section, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode('UTF-8')).hexdigest()
+
+
+def run_fingerprint(entry_point: str,
+                    parameters: dict,
+                    git_commit: str) -> str:
+    """Fingerprint of a pipeline stage run.
+
+    The `config_file` parameter is replaced by the digest of the referenced
+    `config_name` section, so that runs are matched by the content of their
+    configuration rather than by the location of the configuration file.
+
+    Args:
+        entry_point (str): Name of pipeline stage.
+        parameters (dict): Parameters of pipeline stage.
+        git_commit (str): Id of corresponding git commit.
+
+    Returns:
+        str: sha256 fingerprint of the run.
+    """
+    resolved = {key: str(value) for key, value in parameters.items()}
+    if 'config_file' in resolved:
+        config_file = resolved.pop('config_file')
+        resolved['config_digest'] = _config_digest(
+            config_file, resolved.get('config_name'))
+    payload = json.dumps({'entry_point': entry_point,
+                          'parameters': resolved,
+                          'git_commit': git_commit},
+                         sort_keys=True)
+    return hashlib.sha256(payload.encode('UTF-8')).hexdigest()
+
+
+def _run_row(run: mlflow.entities.Run, fingerprint: str) -> tuple:
+    """Row of a run in the index."""
+    tags = run.data.tags
+    return (run.info.run_id,
+            run.info.experiment_id,
+            fingerprint,
+            tags.get(mlflow_tags.MLFLOW_PROJECT_ENTRY_POINT, None),
+            tags.get(mlflow_tags.MLFLOW_USER, None),
+            run.info.status,
+            run.info.start_time)
+
+
+def default_index_path() -> Path:
+    """Location of the run index next to the tracking store.
+
+    The location can be overwritten by `NIREJECT_RUN_INDEX`.
+
+    Returns:
+        Path: path of the SQLite run index.
+    """
+    env_path = os.getenv('NIREJECT_RUN_INDEX', None)
+    if env_path:
+        return Path(env_path)
+    tracking_uri = mlflow.get_tracking_uri()
+    uri = urlparse(tracking_uri)
+    if uri.scheme in ('', 'file'):
+        return Path(uri.path) / '.nireject_run_index.sqlite'
+    uri_hash = hashlib.sha1(tracking_uri.encode('UTF-8')).hexdigest()[:12]
+    return Path.home() / '.nireject' / f'run_index_{uri_hash}.sqlite'
+
+
+class RunIndex:
+    """SQLite index of pipeline runs keyed by their fingerprint.
+
+    Args:
+        path (str, optional): Path of the SQLite file.
+            Defaults to a file next to the tracking store.
+    """
+
+    def __init__(self, path: str = None):
+        self.path = Path(path) if path is not None else default_index_path()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with closing(self._connect()) as conn, conn:
+            conn.executescript(_SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        # concurrent sweep workers share the index
+        return sqlite3.connect(self.path, timeout=60)
+
+    def add(self,
+            run: mlflow.entities.Run,
+            fingerprint: str):
+        """Adds or updates a run in the index.
+
+        Args:
+            run (mlflow.entities.Run): Run to index.
+            fingerprint (str): Fingerprint of the run.
+        """
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                'INSERT OR REPLACE INTO runs VALUES (?, ?, ?, ?, ?, ?, ?)',
+                _run_row(run, fingerprint))
+
+    def remove(self, run_id: str):
+        """Removes a run from the index.
+
+        Args:
+            run_id (str): Id of the run.
+        """
+        with closing(self._connect()) as conn, conn:
+            conn.execute('DELETE FROM runs WHERE run_id = ?', (run_id,))
+
+    def lookup(self,
+               experiment_id: str,
+               fingerprint: str,
+               user_name: str = None) -> str:
+        """Latest finished run with the given fingerprint.
+
+        Args:
+            experiment_id (str): Id of relevant experiment.
+            fingerprint (str): Fingerprint of the run.
+            user_name (str, optional): Filter history by this name.
+                Defaults to None.
+
+        Returns:
+            str: id of the matching run or None.
+        """
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                'SELECT run_id FROM runs '
+                'WHERE experiment_id = ? AND fingerprint = ? '
+                'AND (? IS NULL OR user_name = ?) AND status = ? '
+                'ORDER BY start_time DESC LIMIT 1',
+                (experiment_id, fingerprint, user_name, user_name,
+                 RunStatus.to_string(RunStatus.FINISHED))).fetchone()
+        return row[0] if row is not None else None
+
+    def is_rebuilt(self, experiment_id: str) -> bool:
+        """Checks whether the history of an experiment has been imported.
+
+        Runs added by the pipeline do not count, so an experiment is
+        imported once even if new runs have been indexed before.
+
+        Args:
+            experiment_id (str): Id of relevant experiment.
+
+        Returns:
+            bool: True if the experiment has been rebuilt.
+        """
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                'SELECT 1 FROM experiments WHERE experiment_id = ?',
+                (experiment_id,)).fetchone()
+        return row is not None
+
+    def rebuild(self, experiment_id: str) -> int:
+        """Imports the history of an experiment from the tracking server.
+
+        Only runs tagged with their fingerprint by the pipeline are
+        indexed. Untagged runs are skipped, since their fingerprint would
+        hash the current content of their configuration file rather than
+        the configuration they ran with. The runs are upserted and the
+        experiment is marked as rebuilt in a single transaction, so runs
+        added concurrently are kept and lookups never see a partial
+        index.
+
+        Args:
+            experiment_id (str): Id of relevant experiment.
+
+        Returns:
+            int: number of indexed runs.
+        """
+        client = mlflow.tracking.MlflowClient()
+        rows = []
+        n_untagged = 0
+        page_token = None
+        while True:
+            runs = client.search_runs([experiment_id],
+                                      max_results=1000,
+                                      page_token=page_token)
+            for run in runs:
+                fingerprint = run.data.tags.get(FINGERPRINT_TAG, None)
+                if fingerprint is None:
+                    n_untagged += 1
+                    continue
+                rows.append(_run_row(run, fingerprint))
+            page_token = runs.token
+            if not page_token:
+                break
+
+        with closing(self._connect()) as conn, conn:
+            conn.executemany(
+                'INSERT OR REPLACE INTO runs VALUES (?, ?, ?, ?, ?, ?, ?)',
+                rows)
+            conn.execute('INSERT OR REPLACE INTO experiments VALUES (?, ?)',
+                         (experiment_id, time.time()))
+        logger.info(f'Indexed {len(rows)} runs of experiment {experiment_id} '
+                    f'in {self.path}, skipped {n_untagged} untagged runs')
+        return len(rows)
@@ -0,0 +1,298 @@
+"""Feature tables in shared memory for multi-process workers."""
+
+# Author: Christian Gerloff <christian.gerloff@rwth-aachen.de>
+# License: see repository LICENSE file
+
+
+import json
+import atexit
+import struct
+import inspect
+import logging
+import numpy as np
+import pandas as pd
+
+from typing import Callable
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory, resource_tracker
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# byte alignment of the columns in the block
+_ALIGNMENT = 64
+_HEADER = struct.Struct('<Q')
+# from Python 3.13 on, blocks are attached without the resource tracker
+_TRACK = 'track' in inspect.signature(shared_memory.SharedMemory).parameters
+
+
+def _aligned(offset: int) -> int:
+    return -(-offset // _ALIGNMENT) * _ALIGNMENT
+
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    """Attaches to a block without taking over its cleanup."""
+    if _TRACK:
+        return shared_memory.SharedMemory(name=name, track=False)
+    # before Python 3.13 every attaching process registers the block and
+    # the resource tracker would unlink it when a worker exits
+    shm = shared_memory.SharedMemory(name=name)
+    resource_tracker.unregister(shm._name, 'shared_memory')
+    return shm
+
+
+# handles whose mapping is still used by arrays or frames of the block
+_DEFERRED = []
+
+
+def _close(shm: shared_memory.SharedMemory) -> bool:
+    """Closes a handle unless views of its mapping are alive."""
+    try:
+        shm.close()
+    except BufferError:
+        return False
+    return True
+
+
+@atexit.register
+def _close_deferred():
+    """Closes the deferred handles whose views were released."""
+    _DEFERRED[:] = [shm for shm in _DEFERRED if not _close(shm)]
+
+
+class SharedDataset:
+    """Handle of a feature table in a shared memory block.
+
+    Numeric columns and the index are stored as contiguous arrays,
+    categorical and string columns as integer codes with their
+    categories. The layout is stored in the block, so workers attach by
+    name alone. Handles pickle to their name and attach on unpickling,
+    hence passing a handle to a worker never copies the data.
+
+    Args:
+        name (str): name of the shared memory block.
+    """
+
+    def __init__(self, name: str, _shm: shared_memory.SharedMemory = None):
+        self.name = name
+        self._owner = _shm is not None
+        self._unlinked = False
+        self._shm = _attach(name) if _shm is None else _shm
+        self._buffer = self._shm.buf
+        size, = _HEADER.unpack_from(self._buffer, 0)
+        self._offset = _aligned(_HEADER.size + size)
+        self.meta = json.loads(bytes(
+            self._buffer[_HEADER.size:_HEADER.size + size]).decode('UTF-8'))
+
+    @classmethod
+    def create(cls, data: pd.DataFrame, name: str = None) -> 'SharedDataset':
+        """Copies a feature table into a new shared memory block.
+
+        The creating process owns the block and must unlink it.
+
+        Args:
+            data (pd.DataFrame): feature table.
+            name (str, optional): name of the block. Defaults to None
+                (generated).
+
+        Returns:
+            SharedDataset: handle of the owner.
+        """
+        arrays = {}
+        columns = []
+        for column in data.columns:
+            values = data[column]
+            spec = {'name': column}
+            if (isinstance(values.dtype, pd.CategoricalDtype) or
+               not pd.api.types.is_numeric_dtype(values.dtype)):
+                codes, categories = pd.factorize(values, sort=True)
+                spec['categories'] = categories.tolist()
+                spec['categorical'] = isinstance(values.dtype,
+                                                 pd.CategoricalDtype)
+                values = codes.astype(np.int32)
+            arrays[column] = np.ascontiguousarray(values)
+            columns.append(spec)
+        index = data.index
+        if not pd.api.types.is_numeric_dtype(index.dtype):
+            raise ValueError('SharedDataset requires a numeric index')
+        arrays['__index__'] = np.ascontiguousarray(index.to_numpy())
+
+        layout = {}
+        offset = 0
+        for key, array in arrays.items():
+            layout[key] = {'offset': offset, 'dtype': array.dtype.str}
+            offset = _aligned(offset + array.nbytes)
+        meta = {'n_rows': len(data), 'columns': columns,
+                'index_name': index.name, 'layout': layout}
+        header = json.dumps(meta).encode('UTF-8')
+        start = _aligned(_HEADER.size + len(header))
+
+        shm = shared_memory.SharedMemory(name=name, create=True,
+                                         size=max(1, start + offset))
+        _HEADER.pack_into(shm.buf, 0, len(header))
+        shm.buf[_HEADER.size:_HEADER.size + len(header)] = header
+        for key, array in arrays.items():
+            begin = start + layout[key]['offset']
+            shm.buf[begin:begin + array.nbytes] = array.view(np.uint8).ravel()
+        logger.info(f'Shared {len(data)} rows in {shm.name} '
+                    f'({shm.size / 2**20:.1f} MB)')
+        return cls(shm.name, shm)
+
+    def __reduce__(self):
+        return (type(self), (self.name,))
+
+    def __len__(self) -> int:
+        return self.meta['n_rows']
+
+    @property
+    def columns(self) -> list:
+        """Names of the columns."""
+        return [c['name'] for c in self.meta['columns']]
+
+    def _array(self, key: str) -> np.ndarray:
+        """Read-only view of a stored array."""
+        if self._buffer is None:
+            raise ValueError(f'{self.name} is closed')
+        spec = self.meta['layout'][key]
+        array = np.frombuffer(self._buffer, dtype=np.dtype(spec['dtype']),
+                              count=self.meta['n_rows'],
+                              offset=self._offset + spec['offset'])
+        array.flags.writeable = False
+        return array
+
+    def column(self, name: str) -> np.ndarray:
+        """Zero-copy view of a column, codes for categorical columns.
+
+        Args:
+            name (str): column name.
+
+        Returns:
+            np.ndarray: read-only values of the column.
+        """
+        return self._array(name)
+
+    @property
+    def index(self) -> pd.Index:
+        """Zero-copy index of the table."""
+        return pd.Index(self._array('__index__'),
+                        name=self.meta['index_name'], copy=False)
+
+    def _decode(self, spec: dict, codes: np.ndarray):
+        """Values of a categorical column from its codes."""
+        categories = pd.Index(spec['categories'])
+        if spec['categorical']:
+            return pd.Categorical.from_codes(codes, categories)
+        return categories.take(codes, allow_fill=True,
+                               fill_value=np.nan).to_numpy()
+
+    def take(self, positions=None, columns: list = None) -> pd.DataFrame:
+        """Frame of selected rows and columns.
+
+        Without positions the numeric columns are zero-copy views of the
+        block, otherwise only the selected rows are copied.
+
+        Args:
+            positions (np.ndarray, optional): row positions, e.g. of a
+                split of IndexedSplits. Defaults to None (all rows).
+            columns (list, optional): columns. Defaults to None (all).
+
+        Returns:
+            pd.DataFrame: the selected data.
+        """
+        columns = self.columns if columns is None else columns
+        specs = {c['name']: c for c in self.meta['columns']}
+        index = self.index
+        frame = {}
+        for column in columns:
+            values = self._array(column)
+            if positions is not None:
+                values = np.take(values, positions)
+            if 'categories' in specs[column]:
+                values = self._decode(specs[column], values)
+            frame[column] = values
+        if positions is not None:
+            index = index[positions]
+        return pd.DataFrame(frame, index=index, columns=columns, copy=False)
+
+    def close(self):
+        """Detaches from the block.
+
+        Arrays and zero-copy frames of the block remain valid. Their
+        mapping is released by a later close or at exit once they are
+        released.
+        """
+        if self._buffer is None:
+            return
+        self._buffer = None
+        _close_deferred()
+        if not _close(self._shm):
+            _DEFERRED.append(self._shm)
+
+    def unlink(self):
+        """Releases the block; only called by the owner.
+
+        The block is unlinked once with the handle that created it, so the
+        resource tracker forgets it exactly once. Existing arrays and
+        frames of the block remain valid.
+        """
+        if not self._owner:
+            raise RuntimeError('Only the creating handle unlinks the block')
+        if not self._unlinked:
+            if not _TRACK:
+                # workers sharing the resource tracker of this process may
+                # have unregistered the block when attaching
+                resource_tracker.register(self._shm._name, 'shared_memory')
+            self._shm.unlink()
+            self._unlinked = True
+        self.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        if self._owner:
+            self.unlink()
+        else:
+            self.close()
+
+
+def _take_and_apply(func: Callable,
+                    dataset: SharedDataset,
+                    positions: np.ndarray,
+                    columns: list):
+    """Applies a function to rows of a shared dataset in a worker."""
+    try:
+        return func(dataset.take(positions, columns))
+    finally:
+        dataset.close()
+
+
+def map_splits(func: Callable,
+               dataset: SharedDataset,
+               splits: list,
+               columns: list = None,
+               n_jobs: int = 1) -> list:
+    """Applies a function to the rows of each split in worker processes.
+
+    Only the name of the block and the positions are sent to the
+    workers, which attach to the block and copy the rows of their split,
+    e.g. the train or test positions of IndexedSplits per seed.
+
+    Args:
+        func (Callable): picklable function of the selected frame.
+        dataset (SharedDataset): shared feature table.
+        splits (list): row positions per task.
+        columns (list, optional): columns. Defaults to None (all).
+        n_jobs (int, optional): number of processes, 1 runs in this
+            process. Defaults to 1.
+
+    Returns:
+        list: results in the order of the splits.
+    """
+    if n_jobs == 1:
+        return [func(dataset.take(positions, columns)) for positions in splits]
+    with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+        futures = [executor.submit(_take_and_apply, func, dataset,
+                                   np.asarray(positions), columns)
+                   for positions in splits]
+        return [future.result() for future in futures]
@@ -0,0 +1,217 @@
+"""Compact per-seed splits stored as positional indices."""
+
+# Author: Christian Gerloff <christian.gerloff@rwth-aachen.de>
+# License: see repository LICENSE file
+
+
+import numpy as np
+import pandas as pd
+
+from collections.abc import Sequence
+
+# order of the values returned by subsampling
+SPLIT_FIELDS = (
+    'train', 'test',
+    'labels_train', 'labels_test',
+    'idx_train', 'idx_test',
+    'aug_train', 'aug_test',
+    'labels_aug_train', 'labels_aug_test',
+    'idx_aug_train', 'idx_aug_test'
+)
+SPLITS = ('train', 'test', 'aug_train', 'aug_test')
+
+
+def _split_of(field: str) -> str:
+    """Name of the split a field of subsampling belongs to."""
+    for prefix in ('labels_', 'idx_'):
+        if field.startswith(prefix):
+            return field[len(prefix):]
+    return field
+
+
+class _LazySplit(Sequence):
+    """Sampling output of a single seed materialized on access.
+
+    Args:
+        splits (IndexedSplits): splits of all seeds.
+        i (int): position of the seed.
+    """
+
+    def __init__(self, splits, i: int):
+        self._splits = splits
+        self._i = i
+
+    def __len__(self) -> int:
+        return len(SPLIT_FIELDS)
+
+    def __getitem__(self, item):
+        if isinstance(item, slice):
+            return tuple(self[i] for i in range(len(self))[item])
+        return self._splits.get(self._i, SPLIT_FIELDS[item])
+
+
+class IndexedSplits(Sequence):
+    """Splits of all seeds as positional indices into the shared data.
+
+    Only int32 positions per split are stored, plus the positions and
+    values of labels altered by the label generators. Items behave like
+    the `(seed, subsampling(...))` tuples of the sampling stage and
+    materialize frames from the bound data when accessed.
+
+    Args:
+        data (pd.DataFrame, optional): data the splits refer to.
+            Defaults to None.
+        label_name (str, optional): name of the label column.
+            Defaults to 'labels'.
+    """
+
+    def __init__(self, data: pd.DataFrame = None, label_name: str = 'labels'):
+        self.data = data
+        self.label_name = label_name
+        self.columns = None
+        self.seeds = []
+        self.positions = []
+        self.label_flips = []
+        self.types = {}
+
+    def __getstate__(self) -> dict:
+        # the shared data is never stored with the splits
+        state = self.__dict__.copy()
+        state['data'] = None
+        return state
+
+    def bind(self, data: pd.DataFrame):
+        """Binds the data the splits refer to.
+
+        Args:
+            data (pd.DataFrame): data the splits were created from.
+
+        Returns:
+            IndexedSplits: the bound splits.
+        """
+        self.data = data
+        return self
+
+    def _positions(self, idx) -> np.ndarray:
+        """Positions of index labels in the data."""
+        positions = self.data.index.get_indexer(idx)
+        if (positions < 0).any():
+            raise ValueError('Split contains indices not present in data.')
+        dtype = np.int32 if len(self.data) < np.iinfo(np.int32).max else np.int64
+        return positions.astype(dtype, copy=False)
+
+    def append(self, seed: int, samples: tuple, validate: bool = False):
+        """Adds the sampling output of a seed.
+
+        Args:
+            seed (int): seed used for sampling.
+            samples (tuple): output of subsampling.
+            validate (bool, optional): check that the materialized frames
+                equal the sampled frames. Defaults to False.
+        """
+        if not self.data.index.is_unique:
+            raise ValueError('Indexed splits require a unique data index.')
+        samples = dict(zip(SPLIT_FIELDS, samples))
+        if self.columns is None:
+            self.columns = list(samples['train'].columns)
+
+        positions, label_flips = {}, {}
+        for split in SPLITS:
+            idx = samples[f'idx_{split}']
+            if idx is None:
+                positions[split] = None
+                continue
+            positions[split] = self._positions(idx)
+
+            labels = samples[f'labels_{split}']
+            if labels is None:
+                continue
+            labels = np.asarray(labels)
+            base = self.data[self.label_name].to_numpy()[positions[split]]
+            flips = np.flatnonzero(base != labels).astype(np.int32)
+            label_flips[split] = (flips, labels[flips])
+
+        for field, value in samples.items():
+            self.types.setdefault(field, type(value).__name__)
+        self.seeds.append(seed)
+        self.positions.append(positions)
+        self.label_flips.append(label_flips)
+
+        if validate:
+            for field, value in samples.items():
+                restored = self.get(len(self) - 1, field)
+                if not np.array_equal(np.asarray(restored), np.asarray(value)):
+                    raise ValueError(f'{field} of seed {seed} is not '
+                                     'determined by its indices.')
+
+    def merge(self, other, positions_map: np.ndarray = None):
+        """Appends the seeds of splits created on a subset of the data.
+
+        Args:
+            other (IndexedSplits): splits to append.
+            positions_map (np.ndarray, optional): positions of the rows of
+                the data of `other` in the data of these splits.
+                Defaults to None (same data).
+        """
+        if self.columns is None:
+            self.columns = other.columns
+        for field, value in other.types.items():
+            self.types.setdefault(field, value)
+        for seed, positions, label_flips in zip(other.seeds,
+                                                other.positions,
+                                                other.label_flips):
+            if positions_map is not None:
+                positions = {
+                    split: (positions_map[pos].astype(pos.dtype)
+                            if pos is not None else None)
+                    for split, pos in positions.items()
+                }
+            self.seeds.append(seed)
+            self.positions.append(positions)
+            self.label_flips.append(label_flips)
+
+    def get(self, i: int, field: str):
+        """Materializes a single field of a seed.
+
+        Args:
+            i (int): position of the seed.
+            field (str): field of subsampling, e.g. 'train' or 'idx_test'.
+
+        Returns:
+            the materialized field.
+        """
+        if self.data is None:
+            raise ValueError('No data bound to the splits, use bind(data).')
+        split = _split_of(field)
+        positions = self.positions[i][split]
+        if positions is None:
+            return None
+
+        if field == split:
+            columns = self.data.columns.get_indexer(self.columns)
+            return self.data.iloc[positions, columns]
+
+        index = self.data.index[positions]
+        if field.startswith('idx_'):
+            if self.types.get(field) == 'ndarray':
+                return index.to_numpy()
+            return index
+
+        labels = self.data[self.label_name].to_numpy()[positions]
+        if split in self.label_flips[i]:
+            flips, values = self.label_flips[i][split]
+            labels = labels.copy()
+            labels[flips] = values
+        if self.types.get(field) == 'ndarray':
+            return labels
+        return pd.Series(labels, index=index, name=self.label_name)
+
+    def __len__(self) -> int:
+        return len(self.seeds)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(len(self))[i]]
+        if i < 0:
+            i += len(self)
+        return self.seeds[i], _LazySplit(self, i)
@@ -0,0 +1,203 @@
+"""Generates synthetic feature tables in the layout of the data loader."""
+
+# Author: Christian Gerloff <christian.gerloff@rwth-aachen.de>
+# License: see repository LICENSE file
+
+
+import logging
+import argparse
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from pathlib import Path
+from typing import Iterator
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+FEATURES = ['sci',
+            'flatline',
+            'hr_power_od_wave1',
+            'hr_freq_od_wave1',
+            'diff_cov',
+            'mean_wave1',
+            'mean_wave2']
+
+
+def _features(rng: np.random.Generator, labels: np.ndarray) -> dict:
+    """Draws the features of original signals.
+
+    Badchannels (label 1) have a weak cardiac component, a lower scalp
+    coupling index and more flat segments than clean channels.
+
+    Args:
+        rng (np.random.Generator): random generator.
+        labels (np.ndarray): binary labels, 1 for badchannels.
+
+    Returns:
+        dict: feature name and values.
+    """
+    n = len(labels)
+    bad = labels == 1
+    return {
+        'sci': np.where(bad, rng.beta(2, 5, n), rng.beta(20, 2, n)),
+        'flatline': np.where(bad, rng.beta(2, 5, n), rng.beta(1, 50, n)),
+        'hr_power_od_wave1': np.where(bad, rng.lognormal(-2, 0.8, n),
+                                      rng.lognormal(0, 0.5, n)),
+        'hr_freq_od_wave1': np.where(bad, rng.uniform(0.5, 3, n),
+                                     rng.normal(1.2, 0.15, n)),
+        'diff_cov': np.where(bad, rng.normal(0.5, 0.3, n),
+                             rng.normal(0, 0.1, n)),
+        'mean_wave1': np.where(bad, rng.normal(0.3, 0.3, n),
+                               rng.normal(1, 0.1, n)),
+        'mean_wave2': np.where(bad, rng.normal(0.3, 0.3, n),
+                               rng.normal(1.1, 0.1, n))
+    }
+
+
+def _surrogate(rng: np.random.Generator, features: dict) -> dict:
+    """Features of AAFT surrogates of the original signals.
+
+    Surrogates keep the amplitude distribution but destroy the coupling
+    of the wavelengths and the cardiac component.
+
+    Args:
+        rng (np.random.Generator): random generator.
+        features (dict): features of the original signals.
+
+    Returns:
+        dict: feature name and values.
+    """
+    n = len(features['sci'])
+    return {
+        'sci': features['sci'] * rng.uniform(0.3, 0.8, n),
+        'flatline': features['flatline'],
+        'hr_power_od_wave1': features['hr_power_od_wave1'] * rng.uniform(0.2, 0.6, n),
+        'hr_freq_od_wave1': rng.uniform(0.5, 3, n),
+        'diff_cov': features['diff_cov'] + rng.normal(0, 0.2, n),
+        'mean_wave1': features['mean_wave1'],
+        'mean_wave2': features['mean_wave2']
+    }
+
+
+def synthetic_batches(n_signals: int,
+                      n_probes: int = 100,
+                      contamination: float = 0.1,
+                      augmentations: list = ('AAFT',),
+                      batch_size: int = 1_000_000,
+                      seed: int = 20211001) -> Iterator[pd.DataFrame]:
+    """Generates a synthetic feature table in batches of signals.
+
+    Each batch holds the original rows (augmentation 'None') followed by
+    one row per augmentation and signal with the same signal_id and
+    label. Signals are assigned to probes in contiguous blocks.
+
+    Args:
+        n_signals (int): number of original signals.
+        n_probes (int, optional): number of probes. Defaults to 100.
+        contamination (float, optional): ratio of badchannels.
+            Defaults to 0.1.
+        augmentations (list, optional): augmentations per signal.
+            Defaults to ('AAFT',).
+        batch_size (int, optional): number of signals per batch.
+            Defaults to 1_000_000.
+        seed (int, optional): random seed. Defaults to 20211001.
+
+    Yields:
+        pd.DataFrame: feature table of a batch of signals.
+    """
+    if not 0 <= contamination <= 1:
+        raise ValueError('contamination must be in [0, 1]')
+    if n_probes < 1 or n_probes > max(n_signals, 1):
+        raise ValueError('n_probes must be in [1, n_signals]')
+
+    starts = range(0, n_signals, batch_size)
+    children = np.random.SeedSequence(seed).spawn(len(starts))
+    for start, child in zip(starts, children):
+        rng = np.random.default_rng(child)
+        signal_id = np.arange(start, min(start + batch_size, n_signals))
+        labels = (rng.random(len(signal_id)) < contamination).astype(int)
+        probe = signal_id * n_probes // n_signals
+        features = _features(rng, labels)
+
+        batch = [pd.DataFrame({'signal_id': signal_id,
+                               'probe': probe,
+                               'augmentation': 'None',
+                               'labels': labels,
+                               **features})]
+        for augmentation in augmentations:
+            batch.append(pd.DataFrame({'signal_id': signal_id,
+                                       'probe': probe,
+                                       'augmentation': augmentation,
+                                       'labels': labels,
+                                       **_surrogate(rng, features)}))
+        yield pd.concat(batch, ignore_index=True)
+
+
+def synthetic_features(n_signals: int, **kwargs) -> pd.DataFrame:
+    """Generates a synthetic feature table in memory.
+
+    Args:
+        n_signals (int): number of original signals.
+        **kwargs: arguments of synthetic_batches.
+
+    Returns:
+        pd.DataFrame: feature table of all signals.
+    """
+    return pd.concat(synthetic_batches(n_signals, **kwargs),
+                     ignore_index=True)
+
+
+def write_synthetic_features(filename: str,
+                             n_signals: int,
+                             **kwargs) -> Path:
+    """Streams a synthetic feature table to parquet.
+
+    Every batch of signals is written as one row group, so memory is
+    bounded by the batch size.
+
+    Args:
+        filename (str): parquet file to write.
+        n_signals (int): number of original signals.
+        **kwargs: arguments of synthetic_batches.
+
+    Returns:
+        Path: the written file.
+    """
+    filename = Path(filename)
+    filename.parent.mkdir(parents=True, exist_ok=True)
+    writer = None
+    try:
+        for batch in synthetic_batches(n_signals, **kwargs):
+            table = pa.Table.from_pandas(batch, preserve_index=False)
+            if writer is None:
+                writer = pq.ParquetWriter(filename, table.schema)
+            writer.write_table(table)
+    finally:
+        if writer is not None:
+            writer.close()
+    logger.info(f'Wrote {n_signals} synthetic signals to {filename}')
+    return filename
+
+
+if __name__ == "__main__":
+    """Write synthetic feature table."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument('filename', type=str)
+    parser.add_argument('--n_signals', type=int, default=1_000_000)
+    parser.add_argument('--n_probes', type=int, default=100)
+    parser.add_argument('--contamination', type=float, default=0.1)
+    parser.add_argument('--augmentations', type=str, nargs='*',
+                        default=['AAFT'])
+    parser.add_argument('--batch_size', type=int, default=1_000_000)
+    parser.add_argument('--seed', type=int, default=20211001)
+    args = parser.parse_args()
+
+    write_synthetic_features(args.filename, args.n_signals,
+                             n_probes=args.n_probes,
+                             contamination=args.contamination,
+                             augmentations=args.augmentations,
+                             batch_size=args.batch_size,
+                             seed=args.seed)